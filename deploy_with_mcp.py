@@ -59,7 +59,8 @@ remote_agent = agent_engines.create(
         "mcp",
         "python-dotenv",
         "google-cloud-aiplatform",
-        "firecrawl-py",
+        "requests",
+        "numpy",
     ],
     extra_packages=[
         "study_guide_agent",  # Include entire agent directory with tools
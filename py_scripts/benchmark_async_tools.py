@@ -0,0 +1,84 @@
+"""
+Load test: event-loop latency while Firecrawl tool calls are in flight.
+
+Issues N concurrent firecrawl_search calls against a fake Firecrawl client
+that blocks for a fixed latency, while a probe coroutine measures how late
+the event loop wakes it up. Compares calling the synchronous tool on the
+event loop with the async tool, which runs on a bounded thread pool.
+
+Usage:
+    python3 py_scripts/benchmark_async_tools.py [--calls 16] [--latency 0.2]
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+os.environ["FIRECRAWL_CACHE_DISABLED"] = "1"
+
+from study_guide_agent.tools import firecrawl_async_tool, firecrawl_function_tool
+from study_guide_agent.tools.firecrawl_client import set_firecrawl_client
+
+
+class BlockingFakeClient:
+    """Fake Firecrawl client whose calls block the calling thread"""
+
+    def __init__(self, latency):
+        self.latency = latency
+
+    def search(self, query, params=None):
+        time.sleep(self.latency)
+        return {"data": [{"title": query, "url": "https://example.com", "markdown": "Fake result"}]}
+
+
+async def probe_loop_lag(stop, lags, interval=0.005):
+    """Record how late the event loop resumes a coroutine sleeping `interval`"""
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(interval)
+        lags.append(time.perf_counter() - start - interval)
+
+
+async def run(label, calls, call):
+    stop = asyncio.Event()
+    lags = []
+    probe = asyncio.create_task(probe_loop_lag(stop, lags))
+    await asyncio.sleep(0.05)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(call(f"query {i}") for i in range(calls)))
+    elapsed = time.perf_counter() - start
+
+    stop.set()
+    await probe
+    lags_ms = sorted(lag * 1000 for lag in lags) or [0.0]
+    p95 = lags_ms[int(0.95 * (len(lags_ms) - 1))]
+    print(f"{label}: {elapsed:.2f}s wall, event-loop lag "
+          f"median {statistics.median(lags_ms):.1f} ms / p95 {p95:.1f} ms / max {lags_ms[-1]:.1f} ms")
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--calls", type=int, default=16, help="Concurrent tool calls")
+    parser.add_argument("--latency", type=float, default=0.2, help="Seconds each fake call blocks")
+    args = parser.parse_args()
+
+    set_firecrawl_client(BlockingFakeClient(args.latency))
+
+    async def sync_tool(query):
+        return firecrawl_function_tool.firecrawl_search(query)
+
+    print(f"{args.calls} concurrent calls, {args.latency:.2f}s each, "
+          f"{firecrawl_async_tool.DEFAULT_MAX_WORKERS} worker threads")
+    await run("Sync tool on the event loop", args.calls, sync_tool)
+    await run("Async tool (thread pool)", args.calls, firecrawl_async_tool.firecrawl_search)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,82 @@
+"""
+Benchmark the persistent Firecrawl cache against a local fake FirecrawlApp.
+
+Installs a fake Firecrawl client whose search/scrape calls sleep for a fixed
+latency, then times repeated firecrawl_search/firecrawl_scrape calls
+with a cold and a warm cache. No network access or API key is needed.
+
+Usage:
+    python3 py_scripts/benchmark_firecrawl_cache.py [--latency 0.5] [--calls 20]
+"""
+
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+
+class FakeFirecrawlApp:
+    """Local stand-in for FirecrawlApp/FirecrawlClient with injected latency"""
+    latency = 0.5
+    calls = 0
+
+    def search(self, query, params=None):
+        FakeFirecrawlApp.calls += 1
+        time.sleep(self.latency)
+        limit = (params or {}).get("limit", 5)
+        return {"data": [
+            {"title": f"{query} result {i}", "url": f"https://example.com/{i}", "markdown": f"About {query}. " * 50}
+            for i in range(limit)
+        ]}
+
+    def scrape_url(self, url, params=None):
+        FakeFirecrawlApp.calls += 1
+        time.sleep(self.latency)
+        return {"markdown": f"# {url}\n\n" + "Scraped content. " * 200}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--latency", type=float, default=0.5, help="Seconds per fake Firecrawl call")
+    parser.add_argument("--calls", type=int, default=20, help="Tool calls per pass")
+    args = parser.parse_args()
+
+    from study_guide_agent.tools.firecrawl_cache import FirecrawlCache, set_firecrawl_cache
+    from study_guide_agent.tools.firecrawl_client import set_firecrawl_client
+    from study_guide_agent.tools.firecrawl_function_tool import firecrawl_scrape, firecrawl_search
+
+    FakeFirecrawlApp.latency = args.latency
+    set_firecrawl_client(FakeFirecrawlApp())
+
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = FirecrawlCache(path=Path(tmp) / "firecrawl.sqlite3")
+        set_firecrawl_cache(cache)
+
+        # The warm pass repeats the cold pass with different casing,
+        # whitespace and a URL fragment to exercise key normalisation
+        passes = {"Cold cache": [], "Warm cache": []}
+        for i in range(args.calls):
+            if i % 2:
+                passes["Cold cache"].append((firecrawl_scrape, f"https://example.com/page/{i}"))
+                passes["Warm cache"].append((firecrawl_scrape, f"https://Example.com/page/{i}/#top"))
+            else:
+                passes["Cold cache"].append((firecrawl_search, f"photosynthesis topic {i}"))
+                passes["Warm cache"].append((firecrawl_search, f"Photosynthesis  TOPIC {i}"))
+
+        for label, requests in passes.items():
+            FakeFirecrawlApp.calls = 0
+            start = time.perf_counter()
+            for tool, arg in requests:
+                tool(arg)
+            elapsed = time.perf_counter() - start
+            print(f"{label}: {elapsed:.3f}s for {len(requests)} calls "
+                  f"({elapsed / len(requests) * 1000:.2f} ms/call, {FakeFirecrawlApp.calls} Firecrawl requests)")
+
+        print(f"Cache stats: {cache.stats()}")
+
+
+if __name__ == "__main__":
+    main()
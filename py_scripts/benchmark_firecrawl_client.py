@@ -0,0 +1,108 @@
+"""
+Micro-benchmark the pooled Firecrawl client against a local HTTP stub server.
+
+Starts a keep-alive HTTP/1.1 server on localhost that mimics the Firecrawl
+/v1/search and /v1/scrape endpoints, and charges a fixed delay for every new
+connection to stand in for TCP/TLS handshake cost. It then compares a fresh
+client per call (the old behaviour) with the shared pooled client, both
+called from a thread pool.
+
+Usage:
+    python3 py_scripts/benchmark_firecrawl_client.py [--calls 200] [--threads 8] [--handshake 0.02]
+"""
+
+import argparse
+import json
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from study_guide_agent.tools.firecrawl_client import FirecrawlClient
+
+
+class StubFirecrawlHandler(BaseHTTPRequestHandler):
+    """Serves canned Firecrawl responses over keep-alive connections"""
+    protocol_version = "HTTP/1.1"
+    # Headers and body are written separately; without this, Nagle plus
+    # delayed ACKs stall every request on a reused connection
+    disable_nagle_algorithm = True
+    handshake_delay = 0.02
+    connections = 0
+    lock = threading.Lock()
+
+    def setup(self):
+        super().setup()
+        with StubFirecrawlHandler.lock:
+            StubFirecrawlHandler.connections += 1
+        time.sleep(self.handshake_delay)
+
+    def do_POST(self):
+        payload = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        if self.path == "/v1/search":
+            body = {"success": True, "data": [
+                {"title": payload["query"], "url": "https://example.com", "markdown": "Stub result"}
+            ]}
+        else:
+            body = {"success": True, "data": {"markdown": f"Stub page for {payload['url']}"}}
+
+        data = json.dumps(body).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def run(label, calls, threads, make_client):
+    StubFirecrawlHandler.connections = 0
+
+    def call(i):
+        client = make_client()
+        client.search(f"query {i}", params={"limit": 1})
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        list(pool.map(call, range(calls)))
+    elapsed = time.perf_counter() - start
+
+    print(f"{label}: {elapsed:.3f}s for {calls} calls "
+          f"({elapsed / calls * 1000:.2f} ms/call, {StubFirecrawlHandler.connections} connections opened)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--calls", type=int, default=200)
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--handshake", type=float, default=0.02, help="Seconds charged per new connection")
+    args = parser.parse_args()
+
+    StubFirecrawlHandler.handshake_delay = args.handshake
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubFirecrawlHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    api_url = f"http://127.0.0.1:{server.server_address[1]}"
+
+    run(
+        "Fresh client per call",
+        args.calls,
+        args.threads,
+        lambda: FirecrawlClient(api_key="stub", api_url=api_url),
+    )
+
+    pooled = FirecrawlClient(api_key="stub", api_url=api_url, pool_size=args.threads)
+    run("Shared pooled client", args.calls, args.threads, lambda: pooled)
+
+    pooled.close()
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""
+Benchmark the whole-guide cache: a cold pipeline run against cache replays.
+
+Attaches the guide cache callbacks to a stand-in pipeline whose only stage
+is a stubbed model that takes a fixed latency to "write" the guide, then
+submits the same material again verbatim, reformatted, and with a small
+edit, and finally unrelated material. Uses a throwaway cache file.
+
+Usage:
+    python3 py_scripts/benchmark_guide_cache.py [--latency 2.0] [--words 3000]
+"""
+
+import argparse
+import asyncio
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from google.adk.agents import Agent, SequentialAgent
+from google.adk.runners import InMemoryRunner
+from google.genai import types
+
+from benchmark_parallel_elaboration import LatencyStubLlm
+from study_guide_agent.cache import GuideCache, create_guide_cache_callbacks, set_guide_cache
+
+
+def make_material(words, seed):
+    rng = random.Random(seed)
+    vocabulary = [f"term{i}" for i in range(2000)]
+    sentences = [" ".join(rng.choice(vocabulary) for _ in range(12)) + "." for _ in range(words // 12)]
+    return "Create a study guide from this material:\n\n" + "\n\n".join(
+        " ".join(sentences[i:i + 5]) for i in range(0, len(sentences), 5)
+    )
+
+
+async def run(runner, label, material):
+    session = await runner.session_service.create_session(app_name="benchmark", user_id="bench")
+    start = time.perf_counter()
+    async for _ in runner.run_async(
+        user_id="bench",
+        session_id=session.id,
+        new_message=types.Content(role="user", parts=[types.Part(text=material)]),
+    ):
+        pass
+    elapsed = time.perf_counter() - start
+    session = await runner.session_service.get_session(
+        app_name="benchmark", user_id="bench", session_id=session.id
+    )
+    print(f"  {label:<28} {elapsed * 1000:9.1f} ms  {session.state.get('guide_cache')}")
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--latency", type=float, default=2.0, help="Seconds the stand-in pipeline takes")
+    parser.add_argument("--words", type=int, default=3000, help="Words of source material")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as cache_dir:
+        cache = GuideCache(path=Path(cache_dir) / "guides.sqlite3")
+        set_guide_cache(cache)
+
+        before, after = create_guide_cache_callbacks("benchmark")
+        pipeline = SequentialAgent(
+            name="study_guide_agent",
+            sub_agents=[Agent(
+                name="PipelineStandIn",
+                model=LatencyStubLlm(model="stub-model", latency=args.latency),
+                instruction="Write the study guide.",
+                output_key="final_guide",
+            )],
+            before_agent_callback=before,
+            after_agent_callback=after,
+        )
+        runner = InMemoryRunner(agent=pipeline, app_name="benchmark")
+
+        material = make_material(args.words, seed=1)
+        paragraphs = material.split("\n\n")
+        edited = "\n\n".join(paragraphs[:-1] + ["An extra closing remark from the teacher."])
+
+        print(f"Stand-in pipeline latency: {args.latency:.2f}s, material: {args.words} words")
+        await run(runner, "Cold run (miss)", material)
+        await run(runner, "Same material (exact hit)", material)
+        await run(runner, "Reformatted (exact hit)", material.upper().replace("\n\n", "\n"))
+        await run(runner, "Last paragraph edited", edited)
+        await run(runner, "Unrelated material (miss)", make_material(args.words, seed=2))
+        print(f"  {cache.stats()}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
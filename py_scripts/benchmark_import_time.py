@@ -0,0 +1,106 @@
+"""
+Benchmark package import and agent construction time (worker cold start).
+
+Each scenario runs in a fresh interpreter under `python -X importtime`. The
+script reports the median wall time and the slowest imports, grouped by top-level
+package, and which heavy dependencies (vertexai, mcp, google.adk, the MCP
+toolset) each scenario pulled in. Dummy GOOGLE_CLOUD_* values are set, so
+scenarios that reach setup_environment() do not fail on a missing .env.
+
+Usage:
+    python3 py_scripts/benchmark_import_time.py [--repeat 3] [--top 8]
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+from collections import defaultdict
+from pathlib import Path
+
+ROOT = Path(__file__).parent.parent
+
+SCENARIOS = {
+    "import agent module": "import study_guide_agent.agent",
+    "import tools package": "import study_guide_agent.tools",
+    "import function tools": "from study_guide_agent.tools import firecrawl_function_tool",
+    "import events": "import study_guide_agent.events",
+    "import runner module": "import study_guide_agent.runner",
+    "build pipeline": (
+        "from study_guide_agent.agents import create_main_study_guide_agent; "
+        "create_main_study_guide_agent()"
+    ),
+}
+
+# Modules whose presence after a scenario marks work that may be deferrable
+WATCHED = ["vertexai", "mcp", "google.adk", "study_guide_agent.tools.firecrawl_mcp", "numpy"]
+
+
+def run_scenario(statement):
+    """Run `statement` in a fresh interpreter; returns (seconds, importtime lines, error)"""
+    env = dict(os.environ)
+    env.setdefault("GOOGLE_CLOUD_PROJECT", "benchmark-project")
+    env.setdefault("GOOGLE_CLOUD_LOCATION", "us-central1")
+    env["PYTHONPATH"] = str(ROOT) + os.pathsep + env.get("PYTHONPATH", "")
+    start = time.perf_counter()
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", statement],
+        cwd=ROOT, env=env, capture_output=True, text=True,
+    )
+    elapsed = time.perf_counter() - start
+    lines = [line for line in proc.stderr.splitlines() if line.startswith("import time:")]
+    error = None
+    if proc.returncode:
+        error = [line for line in proc.stderr.splitlines() if not line.startswith("import time:")][-1:]
+        error = error[0] if error else f"exit code {proc.returncode}"
+    return elapsed, lines, error
+
+
+def parse_importtime(lines):
+    """{module: self microseconds} from `-X importtime` output"""
+    modules = {}
+    for line in lines[1:]:  # skip the header
+        self_us, _, name = line.split(":", 1)[1].split("|")
+        modules[name.strip()] = int(self_us)
+    return modules
+
+
+def group_by_package(modules):
+    totals = defaultdict(int)
+    for name, self_us in modules.items():
+        parts = name.split(".")
+        key = ".".join(parts[:2]) if parts[0] == "google" else parts[0]
+        totals[key] += self_us
+    return sorted(totals.items(), key=lambda item: item[1], reverse=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=3, help="Fresh interpreters per scenario")
+    parser.add_argument("--top", type=int, default=8, help="Packages listed per scenario")
+    parser.add_argument("--scenario", action="append", choices=list(SCENARIOS), help="Run only these scenarios")
+    args = parser.parse_args()
+
+    baseline, _, _ = run_scenario("pass")
+    print(f"Bare interpreter: {baseline:.2f}s")
+
+    for label in args.scenario or SCENARIOS:
+        runs = [run_scenario(SCENARIOS[label]) for _ in range(args.repeat)]
+        wall = statistics.median(elapsed for elapsed, _, _ in runs)
+        _, lines, error = runs[-1]
+        modules = parse_importtime(lines)
+        loaded = [name for name in WATCHED if name in modules]
+
+        print(f"\n{label}: {wall:.2f}s wall (median of {args.repeat}), "
+              f"{len(modules)} modules, {sum(modules.values()) / 1e6:.2f}s importing")
+        if error:
+            print(f"  failed: {error}")
+        print(f"  heavy modules loaded: {', '.join(loaded) or 'none'}")
+        for package, self_us in group_by_package(modules)[:args.top]:
+            print(f"    {package:<28} {self_us / 1e3:8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,174 @@
+"""
+Offline benchmark of the guide generation JobQueue under a burst.
+
+Runs the pipeline against the stub model and fake Firecrawl client from
+benchmark_pipeline.py. The stub shares a fixed number of concurrent model
+calls between all guides (--quota), like a Vertex AI quota. The same burst
+of guide requests is run twice:
+
+    direct: every request runs its pipeline at once, as when each caller
+        runs its own guide
+    queue: requests are submitted to a JobQueue with --workers workers;
+        submissions over --max-queued (or --max-per-tenant) are rejected
+        with a Retry-After
+
+One "bulk" tenant sends most of the burst, and --tenants - 1 others send one
+request each. The benchmark reports guide latency (from submission to
+final guide), how many pipelines were in flight at once, rejections, and
+latency per tenant, which shows whether the light tenants wait behind the
+bulk one.
+
+Usage:
+    python3 py_scripts/benchmark_job_queue.py [--guides 24] [--tenants 4] [--workers 3]
+        [--quota 6] [--max-queued 16] [--max-per-tenant 12] [--latency 0.2] [--sqlite]
+"""
+
+import argparse
+import asyncio
+import statistics
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from pathlib import Path
+from typing import ClassVar
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from google.adk.models import LLMRegistry
+from google.adk.runners import InMemoryRunner
+
+from benchmark_pipeline import FakeFirecrawlClient, StubStudyGuideLlm, make_source, percentile, run_guide
+from study_guide_agent.agents import create_main_study_guide_agent
+from study_guide_agent.jobs import JobQueue, QueueFull, SqliteJobStore
+from study_guide_agent.tools.firecrawl_client import set_firecrawl_client
+
+
+class QuotaStubLlm(StubStudyGuideLlm):
+    """StubStudyGuideLlm that shares `slots` concurrent calls between all guides"""
+    slots: ClassVar[asyncio.Semaphore] = None
+
+    async def generate_content_async(self, llm_request, stream=False):
+        async with self.slots:
+            async for response in super().generate_content_async(llm_request, stream):
+                yield response
+
+
+def burst(guides, tenants):
+    """Tenant of each request: the bulk tenant's, with the light tenants' spread among them"""
+    light = [f"tenant_{i}" for i in range(1, tenants)]
+    order = ["bulk"] * (guides - len(light))
+    for i, tenant in enumerate(light):
+        order.insert((i + 1) * len(order) // (len(light) + 1), tenant)
+    return order
+
+
+def tracked(runner, in_flight):
+    """Wrap runner.run_async to count the pipelines running at once"""
+    run_async = runner.run_async
+
+    async def counted(**kwargs):
+        in_flight["now"] += 1
+        in_flight["peak"] = max(in_flight["peak"], in_flight["now"])
+        try:
+            async for event in run_async(**kwargs):
+                yield event
+        finally:
+            in_flight["now"] -= 1
+
+    runner.run_async = counted
+    return runner
+
+
+async def run_direct(runner, source, tenants):
+    latencies = defaultdict(list)
+
+    async def one(tenant):
+        latencies[tenant].append(await run_guide(runner, source))
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one(tenant) for tenant in tenants))
+    return latencies, 0, [], time.perf_counter() - start
+
+
+async def run_queued(runner, source, tenants, args, store):
+    queue = JobQueue(
+        runner,
+        store=store,
+        workers=args.workers,
+        max_queued=args.max_queued,
+        max_queued_per_tenant=args.max_per_tenant,
+    )
+    submitted, rejected, retry_after = [], 0, []
+    start = time.perf_counter()
+    for tenant in tenants:
+        try:
+            submitted.append(queue.submit(source, tenant=tenant))
+        except QueueFull as e:
+            rejected += 1
+            retry_after.append(e.retry_after)
+    jobs = await asyncio.gather(*(queue.wait(job_id) for job_id in submitted))
+    wall = time.perf_counter() - start
+    await queue.close()
+
+    latencies = defaultdict(list)
+    for job in jobs:
+        if job.status != "succeeded":
+            raise RuntimeError(f"Job {job.id} {job.status}: {job.error}")
+        latencies[job.tenant].append(job.finished_at - job.created_at)
+    return latencies, rejected, retry_after, wall
+
+
+def report(label, latencies, rejected, retry_after, wall, in_flight):
+    every = sorted(value for values in latencies.values() for value in values)
+    print(f"\n{label}: {len(every)} guides in {wall:.2f}s, peak {in_flight['peak']} pipelines in flight")
+    print(f"  Latency p50: {percentile(every, 0.5):.2f}s  p95: {percentile(every, 0.95):.2f}s  "
+          f"first: {every[0]:.2f}s  max: {every[-1]:.2f}s")
+    if rejected:
+        print(f"  Rejected: {rejected} (Retry-After {min(retry_after)}-{max(retry_after)}s)")
+    for tenant in sorted(latencies):
+        values = latencies[tenant]
+        print(f"    {tenant:<10} {len(values):>3} guides, mean latency {statistics.mean(values):.2f}s")
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--guides", type=int, default=24, help="Requests in the burst")
+    parser.add_argument("--tenants", type=int, default=4, help="Tenants: one bulk tenant plus single-request ones")
+    parser.add_argument("--workers", type=int, default=3, help="JobQueue workers")
+    parser.add_argument("--quota", type=int, default=6, help="Concurrent model calls shared by all guides")
+    parser.add_argument("--max-queued", type=int, default=16, help="JobQueue max_queued")
+    parser.add_argument("--max-per-tenant", type=int, default=12, help="JobQueue max_queued_per_tenant")
+    parser.add_argument("--objectives", type=int, default=4, help="Learning objectives per guide")
+    parser.add_argument("--latency", type=float, default=0.2, help="Seconds per model call")
+    parser.add_argument("--sqlite", action="store_true", help="Keep jobs in a SQLite store")
+    args = parser.parse_args()
+
+    QuotaStubLlm.slots = asyncio.Semaphore(args.quota)
+    LLMRegistry.register(QuotaStubLlm)
+    QuotaStubLlm.settings.update(latency=args.latency, objectives=args.objectives)
+    set_firecrawl_client(FakeFirecrawlClient(0.05))
+
+    agent = create_main_study_guide_agent(guide_cache=False, overview_cache=False)
+    source = make_source(2000)
+    tenants = burst(args.guides, args.tenants)
+    print(f"Burst of {args.guides} guides from {args.tenants} tenants, {args.quota} concurrent model calls, "
+          f"{args.latency:.2f}s per call")
+
+    in_flight = {"now": 0, "peak": 0}
+    runner = tracked(InMemoryRunner(agent=agent, app_name="benchmark"), in_flight)
+    report("direct", *await run_direct(runner, source, tenants), in_flight)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        store = SqliteJobStore(Path(tmp) / "jobs.sqlite3") if args.sqlite else None
+        in_flight = {"now": 0, "peak": 0}
+        runner = tracked(InMemoryRunner(agent=agent, app_name="benchmark"), in_flight)
+        report(
+            f"queue ({args.workers} workers, {'SQLite' if args.sqlite else 'in-memory'} store)",
+            *await run_queued(runner, source, tenants, args, store),
+            in_flight,
+        )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
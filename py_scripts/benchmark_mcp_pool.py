@@ -0,0 +1,113 @@
+"""
+Benchmark the MCP session pool against one MCP server per session.
+
+Runs against the local stand-in server (fake_mcp_server.py) with an
+injected start-up delay, so no Node, npx or Firecrawl key is needed:
+
+1. One server per session: each session starts its own server, as every
+   McpToolset instance does, and makes one tool call
+2. Pooled: the pool is warmed up once, then every session's first tool call
+   goes to an already running server
+3. Multiplexing: many concurrent calls over the pool's sessions
+4. Restart: a server is crashed mid-run; the failed call is retried on
+   another server and the crashed one is restarted
+
+Usage:
+    python3 py_scripts/benchmark_mcp_pool.py [--startup-delay 3] [--sessions 4] [--pool-size 2]
+"""
+
+import argparse
+import asyncio
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from mcp import ClientSession, StdioServerParameters
+from mcp.client.stdio import stdio_client
+
+from study_guide_agent.tools.mcp_pool import McpSessionPool, PooledMcpToolset
+
+
+def server_params(args):
+    return StdioServerParameters(
+        command=sys.executable,
+        args=[
+            str(Path(__file__).parent / "fake_mcp_server.py"),
+            "--startup-delay", str(args.startup_delay),
+            "--latency", str(args.latency),
+        ],
+    )
+
+
+async def unpooled_session(params):
+    start = time.perf_counter()
+    async with stdio_client(params) as (read, write):
+        async with ClientSession(read, write) as session:
+            await session.initialize()
+            await session.call_tool("firecrawl_search", {"query": "photosynthesis"})
+    return time.perf_counter() - start
+
+
+async def pooled_session(toolset):
+    start = time.perf_counter()
+    tools = {tool.name: tool for tool in await toolset.get_tools()}
+    await tools["firecrawl_search"].run_async(args={"query": "photosynthesis"}, tool_context=None)
+    return time.perf_counter() - start
+
+
+def describe(latencies):
+    return f"mean {statistics.mean(latencies):.2f}s, max {max(latencies):.2f}s"
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--startup-delay", type=float, default=3.0, help="Seconds each server takes to start")
+    parser.add_argument("--latency", type=float, default=0.1, help="Seconds per tool call")
+    parser.add_argument("--sessions", type=int, default=4, help="Sessions, each making a first tool call")
+    parser.add_argument("--pool-size", type=int, default=2)
+    parser.add_argument("--calls", type=int, default=50, help="Concurrent calls for the multiplexing run")
+    args = parser.parse_args()
+    params = server_params(args)
+
+    print(f"Stand-in server: {args.startup_delay:.1f}s start-up, {args.latency:.2f}s/call")
+
+    latencies = await asyncio.gather(*(unpooled_session(params) for _ in range(args.sessions)))
+    print(f"  One server per session, first call ({args.sessions} sessions): {describe(latencies)}")
+
+    pool = McpSessionPool(params, size=args.pool_size, health_interval=1.0)
+    start = time.perf_counter()
+    await pool.start()
+    print(f"  Pool warm-up ({args.pool_size} servers, once per process): {time.perf_counter() - start:.2f}s")
+
+    latencies = await asyncio.gather(*(pooled_session(PooledMcpToolset(pool)) for _ in range(args.sessions)))
+    print(f"  Pooled, first call ({args.sessions} sessions): {describe(latencies)}")
+
+    start = time.perf_counter()
+    await asyncio.gather(*(pool.call_tool("firecrawl_search", {"query": f"q{i}"}) for i in range(args.calls)))
+    elapsed = time.perf_counter() - start
+    print(f"  Multiplexed: {args.calls} concurrent calls in {elapsed:.2f}s "
+          f"({args.calls * args.latency / elapsed:.1f}x a sequential run)")
+
+    # Kill server 0 behind the pool's back; the pool notices on its next call
+    try:
+        await pool.servers[0].session.call_tool("crash", {})
+    except Exception as e:
+        print(f"  Crashed server 0 ({type(e).__name__}: {e})")
+    start = time.perf_counter()
+    results = await asyncio.gather(
+        *(pool.call_tool("firecrawl_search", {"query": f"after crash {i}"}) for i in range(args.sessions)),
+        return_exceptions=True,
+    )
+    failed = sum(isinstance(result, Exception) for result in results)
+    print(f"  {args.sessions} calls after the crash: {failed} failed, {time.perf_counter() - start:.2f}s")
+    await asyncio.sleep(args.startup_delay + 2)
+    print(f"  Servers after restart: {pool.stats()}")
+
+    await pool.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
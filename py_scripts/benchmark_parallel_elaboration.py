@@ -0,0 +1,84 @@
+"""
+Benchmark the parallel elaboration stage against sequential elaboration.
+
+Runs ParallelElaborationAgent offline against a stubbed model that sleeps for
+a fixed latency per call, once with max_concurrency=1 (one objective at a
+time, like the ElaborationLoop) and once with every objective in flight.
+
+Usage:
+    python3 py_scripts/benchmark_parallel_elaboration.py [--objectives 5] [--latency 0.5]
+"""
+
+import argparse
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from google.adk.models import BaseLlm
+from google.adk.models.llm_response import LlmResponse
+from google.adk.runners import InMemoryRunner
+from google.genai import types
+
+from study_guide_agent.agents import create_parallel_elaboration_agent
+
+
+class LatencyStubLlm(BaseLlm):
+    """Model stub that answers every request after a fixed delay"""
+    latency: float = 0.5
+
+    async def generate_content_async(self, llm_request, stream=False):
+        await asyncio.sleep(self.latency)
+        yield LlmResponse(
+            content=types.Content(
+                role="model",
+                parts=[types.Part(text="## Stub Section\n\nStub content.")],
+            )
+        )
+
+
+async def run_once(num_objectives, latency, max_concurrency):
+    agent = create_parallel_elaboration_agent(
+        max_concurrency=max_concurrency,
+        model=LatencyStubLlm(model="stub-model", latency=latency),
+    )
+    runner = InMemoryRunner(agent=agent, app_name="benchmark")
+    overview = {
+        "main_topic": "Benchmark",
+        "key_sections": [f"Section {i + 1}" for i in range(num_objectives)],
+        "learning_objectives": [f"Objective {i + 1}" for i in range(num_objectives)],
+        "difficulty_level": "beginner",
+    }
+    session = await runner.session_service.create_session(
+        app_name="benchmark", user_id="bench", state={"overview": overview}
+    )
+
+    start = time.perf_counter()
+    async for _ in runner.run_async(
+        user_id="bench",
+        session_id=session.id,
+        new_message=types.Content(role="user", parts=[types.Part(text="Create a study guide")]),
+    ):
+        pass
+    return time.perf_counter() - start
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--objectives", type=int, default=5)
+    parser.add_argument("--latency", type=float, default=0.5, help="Seconds per model call")
+    args = parser.parse_args()
+
+    sequential = await run_once(args.objectives, args.latency, max_concurrency=1)
+    parallel = await run_once(args.objectives, args.latency, max_concurrency=args.objectives)
+
+    print(f"Objectives: {args.objectives}, model latency: {args.latency:.2f}s")
+    print(f"  Sequential (max_concurrency=1): {sequential:.2f}s")
+    print(f"  Parallel (max_concurrency={args.objectives}): {parallel:.2f}s")
+    print(f"  Speedup: {sequential / parallel:.1f}x")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
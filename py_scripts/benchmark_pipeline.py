@@ -0,0 +1,349 @@
+"""
+Offline end-to-end benchmark of create_main_study_guide_agent().
+
+Registers a deterministic stub model for every gemini-* model name and
+installs a local fake Firecrawl client, so the whole pipeline (overview with
+a Firecrawl tool call, elaboration, assembly and judge) runs without network
+access or credentials. The guide, overview and Firecrawl caches are
+disabled, so every guide pays for the full pipeline.
+
+Workloads are parameterised by number of learning objectives, source
+material size and how many guides run concurrently. Reports p50/p95 latency
+per guide, time until the first finished section is streamed, throughput in
+guides/min, model calls per tier and peak Python memory (measured on a
+separate run under tracemalloc so it doesn't skew the timings).
+
+The stub answers for whatever model name it is asked for, so the calls per
+model show the ModelRouter's decisions: --difficulty sets the overview's
+difficulty_level, --budget the request's "model_budget", and --weak-model
+makes one tier write sections too short to pass validation, so they are
+escalated.
+
+--speculative elaborates the objectives of a quick draft overview while the
+overview stage runs, and reports the speculation hit rate and wasted
+tokens; --draft-misses makes that many drafted objectives differ from the
+final ones.
+
+Stages after the overview share one prompt prefix (instructions, overview
+and source material), which PromptCache serves from an explicit context
+cache. The stub emulates the Gemini cache API, so the benchmark reports the
+prompt tokens processed per guide against those served from the cache;
+--no-prompt-cache sends every prefix uncached.
+
+Usage:
+    python3 py_scripts/benchmark_pipeline.py [--objectives 4] [--source-words 2000]
+        [--guides 8] [--concurrency 2] [--latency 0.2] [--output-tokens 400]
+        [--firecrawl-latency 0.1] [--loop] [--difficulty beginner] [--budget economy]
+        [--weak-model gemini-2.5-flash] [--no-routing] [--speculative] [--draft-misses 1]
+        [--no-prompt-cache]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import sys
+import time
+import tracemalloc
+from collections import Counter
+from pathlib import Path
+from types import SimpleNamespace
+from typing import ClassVar
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+os.environ["GUIDE_CACHE_DISABLED"] = "1"
+os.environ["OVERVIEW_CACHE_DISABLED"] = "1"
+os.environ["FIRECRAWL_CACHE_DISABLED"] = "1"
+
+from google.adk.models import BaseLlm, LLMRegistry
+from google.adk.models.llm_response import LlmResponse
+from google.adk.runners import InMemoryRunner
+from google.genai import types
+
+from study_guide_agent.agents import create_main_study_guide_agent
+from study_guide_agent.events import GuideReassembler
+from study_guide_agent.tools.firecrawl_client import set_firecrawl_client
+
+
+CHARS_PER_TOKEN = 4
+
+
+class FakeFirecrawlClient:
+    """Local stand-in for the Firecrawl client that blocks for a fixed latency"""
+
+    def __init__(self, latency=0.1):
+        self.latency = latency
+        self.calls = 0
+
+    def search(self, query, params=None):
+        self.calls += 1
+        time.sleep(self.latency)
+        limit = (params or {}).get("limit", 5)
+        return {"data": [
+            {"title": f"{query} result {i}", "url": f"https://example.com/{i}", "markdown": f"About {query}. " * 100}
+            for i in range(limit)
+        ]}
+
+    def scrape_url(self, url, params=None):
+        self.calls += 1
+        time.sleep(self.latency)
+        return {"markdown": f"# {url}\n\n" + "Scraped content. " * 300}
+
+
+def count_tokens(system_instruction, contents):
+    chars = len(str(system_instruction or "")) + sum(
+        len(part.text or "") for content in contents for part in content.parts or []
+    )
+    return chars // CHARS_PER_TOKEN
+
+
+class FakeContextCaches:
+    """Stand-in for the genai `client.aio.caches` API
+
+    Remembers how many tokens each cache holds; creating a cache processes
+    its prefix once.
+    """
+
+    def __init__(self):
+        self.tokens = {}
+
+    async def create(self, model, config):
+        name = f"cachedContents/{len(self.tokens)}"
+        self.tokens[name] = count_tokens(config.system_instruction, config.contents or [])
+        StubStudyGuideLlm.prompt_tokens += self.tokens[name]
+        return types.CachedContent(name=name, model=model)
+
+
+class StubStudyGuideLlm(BaseLlm):
+    """Deterministic stand-in for every gemini-* model
+
+    Answers each request after a fixed latency with a response shaped by the
+    request's output schema, and reports token usage estimated from the
+    request and response sizes. Agents that have the firecrawl_search tool
+    call it once before answering. Calls are counted per model name, and
+    prompt tokens are split into those processed and those read from a
+    context cache (see FakeContextCaches).
+    """
+    settings: ClassVar[dict] = {
+        "latency": 0.2,
+        "output_tokens": 400,
+        "objectives": 4,
+        "difficulty": "intermediate",
+        "weak_models": (),
+        "draft_misses": 0,
+    }
+    calls: ClassVar[int] = 0
+    calls_by_model: ClassVar[Counter] = Counter()
+    prompt_tokens: ClassVar[int] = 0
+    cached_tokens: ClassVar[int] = 0
+    caches: ClassVar[FakeContextCaches] = FakeContextCaches()
+    api_client: ClassVar[SimpleNamespace] = SimpleNamespace(aio=SimpleNamespace(caches=caches))
+
+    @classmethod
+    def supported_models(cls):
+        return [r"gemini-.*"]
+
+    async def generate_content_async(self, llm_request, stream=False):
+        StubStudyGuideLlm.calls += 1
+        StubStudyGuideLlm.calls_by_model[self.model] += 1
+        await asyncio.sleep(self.settings["latency"])
+
+        parts = [part for content in llm_request.contents for part in content.parts or []]
+        if "firecrawl_search" in llm_request.tools_dict and not any(p.function_response for p in parts):
+            part = types.Part(function_call=types.FunctionCall(
+                name="firecrawl_search", args={"query": "study guide background", "limit": 3}
+            ))
+        else:
+            part = types.Part(text=self._answer(llm_request))
+
+        processed = count_tokens(llm_request.config.system_instruction, llm_request.contents)
+        cached = self.caches.tokens.get(llm_request.config.cached_content, 0)
+        StubStudyGuideLlm.prompt_tokens += processed
+        StubStudyGuideLlm.cached_tokens += cached
+        yield LlmResponse(
+            content=types.Content(role="model", parts=[part]),
+            usage_metadata=types.GenerateContentResponseUsageMetadata(
+                prompt_token_count=processed + cached,
+                cached_content_token_count=cached or None,
+                candidates_token_count=len(part.text or "") // CHARS_PER_TOKEN,
+            ),
+        )
+
+    def _answer(self, llm_request):
+        schema = llm_request.config.response_schema
+        if schema is None and "set_model_response" in llm_request.tools_dict:
+            schema = llm_request.tools_dict["set_model_response"].output_schema
+        name = getattr(schema, "__name__", None)
+        objectives = [f"Objective {i + 1}" for i in range(self.settings["objectives"])]
+
+        if name == "StudyGuideOverview":
+            if "firecrawl_search" not in llm_request.tools_dict:
+                # The speculative draft: no research tools
+                misses = self.settings["draft_misses"]
+                objectives = objectives[:len(objectives) - misses] + [
+                    f"Unrelated draft goal {i + 1}" for i in range(misses)
+                ]
+            return json.dumps({
+                "main_topic": "Benchmark Topic",
+                "key_sections": objectives,
+                "learning_objectives": objectives,
+                "difficulty_level": self.settings["difficulty"],
+            })
+        if name == "PartialOutline":
+            return json.dumps({"topics": ["Topic"], "key_points": ["Point"], "candidate_objectives": objectives})
+        if name == "SectionReview":
+            return json.dumps({"verdict": "approved", "patch": ""})
+        if name == "GuideFraming":
+            return json.dumps({"introduction": "Welcome to this study guide.", "study_tips": ["Review daily."]})
+        if name == "SectionTransitions":
+            return json.dumps({"transitions": ["Next, we build on this."] * (len(objectives) - 1)})
+
+        if self.model in self.settings["weak_models"]:
+            return "## Stub Section"
+        body = "Stub explanation of the objective. " * (self.settings["output_tokens"] * CHARS_PER_TOKEN // 35)
+        return f"## Stub Section\n\n{body.strip()}"
+
+
+def make_source(words):
+    sentence = "The quick study material covers photosynthesis, chlorophyll and the light reactions."
+    count = max(1, words // len(sentence.split()))
+    return "Create a study guide from this material:\n\n" + "\n\n".join([sentence] * count)
+
+
+async def run_guide(runner, source, state=None, speculation=None, first_sections=None, delta_bytes=None):
+    session = await runner.session_service.create_session(app_name="benchmark", user_id="bench", state=state)
+    guide = GuideReassembler()
+    start = time.perf_counter()
+    async for event in runner.run_async(
+        user_id="bench",
+        session_id=session.id,
+        new_message=types.Content(role="user", parts=[types.Part(text=source)]),
+    ):
+        if delta_bytes is not None and event.actions.state_delta:
+            delta_bytes.append(len(json.dumps(event.actions.state_delta, default=str)))
+        if guide.add(event) and first_sections is not None and len(guide.sections) == 1:
+            first_sections.append(time.perf_counter() - start)
+    elapsed = time.perf_counter() - start
+
+    session = await runner.session_service.get_session(
+        app_name="benchmark", user_id="bench", session_id=session.id
+    )
+    if not session.state.get("final_guide"):
+        raise RuntimeError("Pipeline finished without a final_guide")
+    if speculation is not None and session.state.get("speculation"):
+        speculation.append(session.state["speculation"])
+    return elapsed
+
+
+async def run_workload(
+    runner, source, guides, concurrency, state=None, speculation=None, first_sections=None, delta_bytes=None
+):
+    """Run `guides` pipelines, `concurrency` at a time; return latencies and wall time"""
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def bounded():
+        async with semaphore:
+            return await run_guide(runner, source, state, speculation, first_sections, delta_bytes)
+
+    start = time.perf_counter()
+    latencies = await asyncio.gather(*(bounded() for _ in range(guides)))
+    return sorted(latencies), time.perf_counter() - start
+
+
+def percentile(sorted_values, fraction):
+    return sorted_values[min(len(sorted_values) - 1, int(round(fraction * (len(sorted_values) - 1))))]
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--objectives", type=int, default=4, help="Learning objectives per guide")
+    parser.add_argument("--source-words", type=int, default=2000, help="Words of source material")
+    parser.add_argument("--guides", type=int, default=8, help="Guides to generate")
+    parser.add_argument("--concurrency", type=int, default=2, help="Guides generated at once")
+    parser.add_argument("--max-concurrency", type=int, default=4, help="Pipeline max_concurrency")
+    parser.add_argument("--latency", type=float, default=0.2, help="Seconds per model call")
+    parser.add_argument("--output-tokens", type=int, default=400, help="Tokens per generated section")
+    parser.add_argument("--firecrawl-latency", type=float, default=0.1, help="Seconds per Firecrawl call")
+    parser.add_argument("--loop", action="store_true", help="Use the ElaborationLoop instead of parallel elaboration")
+    parser.add_argument("--difficulty", default="intermediate", help="Overview difficulty_level")
+    parser.add_argument("--budget", default=None, help="Request model_budget: economy, balanced or quality")
+    parser.add_argument("--weak-model", action="append", default=[], help="Model that writes invalid sections")
+    parser.add_argument("--no-routing", action="store_true", help="Use fixed per-agent models")
+    parser.add_argument("--speculative", action="store_true", help="Elaborate drafted objectives during the overview")
+    parser.add_argument("--draft-misses", type=int, default=0, help="Drafted objectives that won't match the final ones")
+    parser.add_argument("--no-prompt-cache", action="store_true", help="Send the shared prompt prefix uncached")
+    args = parser.parse_args()
+    if args.no_prompt_cache:
+        os.environ["PROMPT_CACHE_DISABLED"] = "1"
+
+    LLMRegistry.register(StubStudyGuideLlm)
+    StubStudyGuideLlm.settings.update(
+        latency=args.latency,
+        output_tokens=args.output_tokens,
+        objectives=args.objectives,
+        difficulty=args.difficulty,
+        weak_models=tuple(args.weak_model),
+        draft_misses=args.draft_misses,
+    )
+    firecrawl = FakeFirecrawlClient(args.firecrawl_latency)
+    set_firecrawl_client(firecrawl)
+
+    agent = create_main_study_guide_agent(
+        parallel_elaboration=not args.loop,
+        max_concurrency=args.max_concurrency,
+        guide_cache=False,
+        overview_cache=False,
+        model_routing=not args.no_routing,
+        speculative_elaboration=args.speculative,
+    )
+    runner = InMemoryRunner(agent=agent, app_name="benchmark")
+    source = make_source(args.source_words)
+    state = {"model_budget": args.budget} if args.budget else None
+
+    speculation, first_sections, delta_bytes = [], [], []
+    latencies, wall = await run_workload(
+        runner, source, args.guides, args.concurrency, state, speculation, first_sections, delta_bytes
+    )
+    model_calls, firecrawl_calls = StubStudyGuideLlm.calls, firecrawl.calls
+    prompt_tokens, cached_tokens = StubStudyGuideLlm.prompt_tokens, StubStudyGuideLlm.cached_tokens
+    caches_created = len(StubStudyGuideLlm.caches.tokens)
+    calls_by_model = dict(StubStudyGuideLlm.calls_by_model)
+
+    tracemalloc.start()
+    await run_workload(runner, source, args.concurrency, args.concurrency)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    print(f"Workload: {args.guides} guides, {args.concurrency} concurrent, {args.objectives} objectives, "
+          f"{args.source_words} source words, {'loop' if args.loop else 'parallel'} elaboration")
+    print(f"Stubs: {args.latency:.2f}s/model call, {args.output_tokens} tokens/section, "
+          f"{args.firecrawl_latency:.2f}s/Firecrawl call")
+    print(f"  Latency p50: {percentile(latencies, 0.5):.2f}s  p95: {percentile(latencies, 0.95):.2f}s  "
+          f"max: {latencies[-1]:.2f}s  mean: {statistics.mean(latencies):.2f}s")
+    first_sections.sort()
+    print(f"  First section p50: {percentile(first_sections, 0.5):.2f}s  p95: {percentile(first_sections, 0.95):.2f}s")
+    print(f"  Throughput: {args.guides / wall * 60:.1f} guides/min ({wall:.2f}s wall)")
+    print(f"  Calls per guide: {model_calls / args.guides:.1f} model, {firecrawl_calls / args.guides:.1f} Firecrawl")
+    print(f"  Model calls per guide by model ({args.difficulty}, budget {args.budget or 'default'}): "
+          + ", ".join(f"{name}: {calls / args.guides:.1f}" for name, calls in sorted(calls_by_model.items())))
+    print(f"  Prompt tokens per guide: {prompt_tokens / args.guides:.0f} processed, "
+          f"{cached_tokens / args.guides:.0f} read from context caches "
+          f"({caches_created / args.guides:.1f} caches created per guide)")
+    print(f"  State deltas per guide: {len(delta_bytes) / args.guides:.0f} events, "
+          f"{sum(delta_bytes) / args.guides / 1024:.1f} KiB serialised")
+    if speculation:
+        print(f"  Speculation: hit rate {statistics.mean(m['hit_rate'] for m in speculation):.0%}, "
+              f"{sum(m['kept'] for m in speculation) / args.guides:.1f} sections kept, "
+              f"{sum(m['discarded'] + m['cancelled'] for m in speculation) / args.guides:.1f} discarded per guide; "
+              f"wasted tokens per guide: "
+              f"{sum(m['wasted_input_tokens'] for m in speculation) / args.guides:.0f} in, "
+              f"{sum(m['wasted_output_tokens'] for m in speculation) / args.guides:.0f} out; "
+              f"draft tokens per guide: "
+              f"{sum(m['draft_input_tokens'] + m['draft_output_tokens'] for m in speculation) / args.guides:.0f}")
+    print(f"  Peak Python memory ({args.concurrency} concurrent guides): {peak / 1024 / 1024:.1f} MiB")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
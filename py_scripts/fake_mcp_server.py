@@ -0,0 +1,51 @@
+"""
+Tiny local stdio MCP server standing in for firecrawl-mcp.
+
+Sleeps for a configurable start-up delay (standing in for `npx -y` package
+resolution and Node start-up), then serves firecrawl_search and
+firecrawl_scrape with a fixed latency. The crash tool exits the process, to
+exercise restarts.
+
+Usage (normally started by benchmark_mcp_pool.py):
+    python3 py_scripts/fake_mcp_server.py [--startup-delay 3] [--latency 0.1]
+"""
+
+import argparse
+import asyncio
+import os
+import time
+
+from mcp.server.mcpserver import MCPServer
+
+
+parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+parser.add_argument("--startup-delay", type=float, default=3.0)
+parser.add_argument("--latency", type=float, default=0.1)
+args = parser.parse_args()
+
+time.sleep(args.startup_delay)
+
+server = MCPServer("fake-firecrawl")
+
+
+@server.tool()
+async def firecrawl_search(query: str, limit: int = 5) -> str:
+    """Search the web and return page content for the results"""
+    await asyncio.sleep(args.latency)
+    return "\n\n".join(f"# {query} result {i}\n\nAbout {query}." for i in range(limit))
+
+
+@server.tool()
+async def firecrawl_scrape(url: str) -> str:
+    """Scrape one page as markdown"""
+    await asyncio.sleep(args.latency)
+    return f"# {url}\n\nScraped content."
+
+
+@server.tool()
+async def crash() -> str:
+    """Exit the server process immediately"""
+    os._exit(1)
+
+
+server.run()
@@ -0,0 +1,207 @@
+"""
+Concurrent multi-session load driver for the study guide Runner.
+
+Drives many sessions through one Runner in a single process and records
+per-session latency (percentiles and a histogram), error rates and
+event-loop lag, to find how many simultaneous guide generations a worker
+can sustain before latency collapses.
+
+Two arrival models:
+    closed loop (default): --users virtual users each start a new session as
+        soon as their previous one finishes
+    open loop (--rate R): sessions arrive as a Poisson process at R per
+        second, whether or not earlier ones have finished
+
+--users also accepts a comma-separated list (e.g. 1,2,4,8,16) to sweep
+closed-loop concurrency levels and print one summary row per level.
+
+By default the pipeline runs against the offline stub model and fake
+Firecrawl client from benchmark_pipeline.py. --backend vertex uses the real
+models and credentials from the environment instead.
+
+Usage:
+    python3 py_scripts/load_driver.py [--users 1,2,4,8] [--sessions 16]
+    python3 py_scripts/load_driver.py --rate 0.5 --sessions 30 [--timeout 120]
+"""
+
+import argparse
+import asyncio
+import random
+import sys
+import time
+from collections import Counter
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from google.adk.models import LLMRegistry
+from google.adk.runners import InMemoryRunner
+from google.genai import types
+
+from benchmark_pipeline import FakeFirecrawlClient, StubStudyGuideLlm, make_source, percentile
+from study_guide_agent.agents import create_main_study_guide_agent
+from study_guide_agent.tools.firecrawl_client import set_firecrawl_client
+
+
+HISTOGRAM_BUCKETS = [0.5, 1, 2, 5, 10, 20, 30, 60, 120, 300]
+
+
+class LoadStats:
+    """Latencies, errors and event-loop lag collected during one load run"""
+
+    def __init__(self):
+        self.latencies = []
+        self.errors = Counter()
+        self.lags = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    @property
+    def sessions(self):
+        return len(self.latencies) + sum(self.errors.values())
+
+    def histogram(self):
+        """Rows of (bucket label, count) for the successful session latencies"""
+        counts = Counter()
+        for latency in self.latencies:
+            bucket = next((b for b in HISTOGRAM_BUCKETS if latency <= b), None)
+            counts[bucket] += 1
+        rows = [(f"<= {b}s", counts[b]) for b in HISTOGRAM_BUCKETS if counts[b]]
+        if counts[None]:
+            rows.append((f"> {HISTOGRAM_BUCKETS[-1]}s", counts[None]))
+        return rows
+
+
+async def probe_loop_lag(stats, stop, interval=0.01):
+    """Record how late the event loop resumes a coroutine sleeping `interval`"""
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(interval)
+        stats.lags.append(time.perf_counter() - start - interval)
+
+
+async def run_session(runner, stats, index, source_words, timeout):
+    stats.in_flight += 1
+    stats.max_in_flight = max(stats.max_in_flight, stats.in_flight)
+    start = time.perf_counter()
+    try:
+        session = await runner.session_service.create_session(app_name=runner.app_name, user_id=f"user_{index}")
+        # Distinct material per session, so no session is served from another's work
+        source = f"Session {index}.\n\n" + make_source(source_words)
+
+        async def consume():
+            async for _ in runner.run_async(
+                user_id=f"user_{index}",
+                session_id=session.id,
+                new_message=types.Content(role="user", parts=[types.Part(text=source)]),
+            ):
+                pass
+
+        await asyncio.wait_for(consume(), timeout)
+        stats.latencies.append(time.perf_counter() - start)
+    except asyncio.TimeoutError:
+        stats.errors["Timeout"] += 1
+    except Exception as e:
+        stats.errors[type(e).__name__] += 1
+    finally:
+        stats.in_flight -= 1
+
+
+async def closed_loop(runner, stats, users, sessions, source_words, timeout):
+    counter = iter(range(sessions))
+
+    async def user():
+        for index in counter:
+            await run_session(runner, stats, index, source_words, timeout)
+
+    await asyncio.gather(*(user() for _ in range(users)))
+
+
+async def open_loop(runner, stats, rate, sessions, source_words, timeout, seed=0):
+    rng = random.Random(seed)
+    tasks = []
+    for index in range(sessions):
+        tasks.append(asyncio.create_task(run_session(runner, stats, index, source_words, timeout)))
+        await asyncio.sleep(rng.expovariate(rate))
+    await asyncio.gather(*tasks)
+
+
+async def drive(runner, args, users=None):
+    stats = LoadStats()
+    stop = asyncio.Event()
+    probe = asyncio.create_task(probe_loop_lag(stats, stop))
+    start = time.perf_counter()
+    if args.rate:
+        await open_loop(runner, stats, args.rate, args.sessions, args.source_words, args.timeout)
+    else:
+        await closed_loop(runner, stats, users, args.sessions, args.source_words, args.timeout)
+    wall = time.perf_counter() - start
+    stop.set()
+    await probe
+    return stats, wall
+
+
+def summary_row(label, stats, wall):
+    latencies = sorted(stats.latencies) or [float("nan")]
+    lags_ms = sorted(lag * 1000 for lag in stats.lags) or [0.0]
+    errors = sum(stats.errors.values())
+    return (
+        f"{label:>10} {stats.sessions:>8} {len(stats.latencies) / wall * 60:>10.1f} "
+        f"{percentile(latencies, 0.5):>8.2f} {percentile(latencies, 0.95):>8.2f} {latencies[-1]:>8.2f} "
+        f"{errors / max(1, stats.sessions):>7.1%} {percentile(lags_ms, 0.95):>10.1f} {lags_ms[-1]:>10.1f}"
+    )
+
+
+def create_runner(args):
+    if args.backend == "stub":
+        LLMRegistry.register(StubStudyGuideLlm)
+        StubStudyGuideLlm.settings.update(
+            latency=args.latency, output_tokens=args.output_tokens, objectives=args.objectives
+        )
+        set_firecrawl_client(FakeFirecrawlClient(args.firecrawl_latency))
+    else:
+        from study_guide_agent.setup import setup_environment
+        setup_environment()
+
+    agent = create_main_study_guide_agent(
+        max_concurrency=args.max_concurrency, guide_cache=False, overview_cache=False
+    )
+    return InMemoryRunner(agent=agent, app_name="load_driver")
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--users", default="4", help="Closed-loop concurrent users, or a comma-separated sweep")
+    parser.add_argument("--rate", type=float, default=None, help="Open-loop arrivals per second")
+    parser.add_argument("--sessions", type=int, default=16, help="Sessions per run")
+    parser.add_argument("--timeout", type=float, default=300, help="Seconds before a session counts as failed")
+    parser.add_argument("--source-words", type=int, default=2000)
+    parser.add_argument("--backend", choices=["stub", "vertex"], default="stub")
+    parser.add_argument("--max-concurrency", type=int, default=4, help="Pipeline max_concurrency")
+    parser.add_argument("--objectives", type=int, default=4, help="Stub: learning objectives per guide")
+    parser.add_argument("--latency", type=float, default=0.5, help="Stub: seconds per model call")
+    parser.add_argument("--output-tokens", type=int, default=400, help="Stub: tokens per section")
+    parser.add_argument("--firecrawl-latency", type=float, default=0.2, help="Stub: seconds per Firecrawl call")
+    parser.add_argument("--histogram", action="store_true", help="Print a latency histogram per run")
+    args = parser.parse_args()
+
+    runner = create_runner(args)
+    levels = [None] if args.rate else [int(u) for u in args.users.split(",")]
+
+    mode = f"open loop, {args.rate}/s arrivals" if args.rate else "closed loop"
+    print(f"{args.backend} backend, {mode}, {args.sessions} sessions per run")
+    print(f"{'users' if not args.rate else 'rate':>10} {'sessions':>8} {'guides/min':>10} "
+          f"{'p50 s':>8} {'p95 s':>8} {'max s':>8} {'errors':>7} {'lag p95 ms':>10} {'lag max ms':>10}")
+    for users in levels:
+        stats, wall = await drive(runner, args, users)
+        print(summary_row(str(users or args.rate), stats, wall))
+        if stats.errors:
+            print(f"{'':>10} errors: {dict(stats.errors)}")
+        if args.histogram:
+            for label, count in stats.histogram():
+                print(f"{'':>10} {label:>8} {'#' * count} {count}")
+            print(f"{'':>10} max in flight: {stats.max_in_flight}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
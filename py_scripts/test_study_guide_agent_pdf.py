@@ -16,6 +16,10 @@ load_dotenv()
 import vertexai
 from vertexai import agent_engines
 
+sys.path.insert(0, str(deployed_agent_dir))
+from study_guide_agent.events import GuideReassembler
+from study_guide_agent.ingest import read_pdf_text
+
 PROJECT_ID = os.getenv("GOOGLE_CLOUD_PROJECT")
 LOCATION = os.getenv("GOOGLE_CLOUD_LOCATION")
 
@@ -54,28 +58,6 @@ else:
     exit(1)
 
 
-def read_pdf_text(pdf_path):
-    """Extract text from PDF file"""
-    try:
-        import PyPDF2
-
-        with open(pdf_path, 'rb') as file:
-            pdf_reader = PyPDF2.PdfReader(file)
-            text = ""
-            for page_num in range(len(pdf_reader.pages)):
-                page = pdf_reader.pages[page_num]
-                text += page.extract_text() + "\n"
-            return text
-    except ImportError:
-        print("⚠️ PyPDF2 not installed. Installing...")
-        os.system("pip install PyPDF2")
-        import PyPDF2
-        return read_pdf_text(pdf_path)
-    except Exception as e:
-        print(f"❌ Error reading PDF: {e}")
-        return None
-
-
 async def main():
     # Check for PDF path argument
     if len(sys.argv) < 2:
@@ -94,7 +76,11 @@ async def main():
     print(f"📄 Reading PDF: {pdf_path}")
 
     # Extract text from PDF
-    pdf_text = read_pdf_text(pdf_path)
+    try:
+        pdf_text = read_pdf_text(pdf_path)
+    except Exception as e:
+        print(f"❌ Error reading PDF: {e}")
+        exit(1)
 
     if not pdf_text or not pdf_text.strip():
         print("❌ No text could be extracted from the PDF")
@@ -102,12 +88,6 @@ async def main():
 
     print(f"✅ Extracted {len(pdf_text)} characters from PDF")
 
-    # Truncate if too long (max ~30k characters to avoid context issues)
-    max_chars = 30000
-    if len(pdf_text) > max_chars:
-        print(f"⚠️ PDF text is long ({len(pdf_text)} chars), truncating to {max_chars} chars")
-        pdf_text = pdf_text[:max_chars] + "\n\n[Content truncated due to length]"
-
     print(f"📤 Sending to study guide agent...")
 
     # Create output filename based on PDF name
@@ -121,14 +101,24 @@ async def main():
     print("🚀 Starting study guide generation...")
     print("="*80 + "\n")
 
-    # Collect all events from the streaming query and print them in real-time
+    # Follow the streaming query: each finished section arrives as a typed
+    # event, so the guide is rebuilt as it streams rather than by scanning
+    # the events afterwards
+    guide = GuideReassembler()
+    event_count, last_event = 0, None
+
     # Use explicit wording that matches RouterAgent's instruction
-    events = []
     async for event in remote_agent.async_stream_query(
         message=f"Create a study guide from this material:\n\n{pdf_text}",
         user_id="user_42",
     ):
-        events.append(event)
+        event_count, last_event = event_count + 1, event
+
+        section = guide.add(event)
+        if section:
+            print(f"\n📄 Section {section.index + 1}/{section.total or '?'} {section.stage}: {section.title}")
+            print("-" * 80)
+            continue
 
         # Print intermediate agent outputs in real-time
         if "content" in event and "parts" in event["content"]:
@@ -147,31 +137,7 @@ async def main():
                     print(f"\n🔧 Function Called: {func_name}")
                     print("-" * 80)
 
-    # Extract the final study guide from the last text output
-    # The SequentialAgent returns multiple events (one per sub-agent)
-    # We want the final output from JudgeAgent (the last agent in the sequence)
-    final_output = None
-
-    # Search from the end to get the most recent text output
-    for event in reversed(events):
-        if "content" in event and "parts" in event["content"]:
-            for part in event["content"]["parts"]:
-                # Check for function_response containing the study guide
-                if "function_response" in part:
-                    response = part["function_response"].get("response", {})
-                    if "result" in response:
-                        final_output = response["result"]
-                        break
-                # Check for direct text responses (preferred - from SequentialAgent)
-                elif "text" in part:
-                    text = part["text"]
-                    # Only accept text that looks like a complete study guide
-                    # (has substantial content and quality seal)
-                    if len(text) > 500 and "✅ Quality Verified" in text:
-                        final_output = text
-                        break
-            if final_output:
-                break
+    final_output = guide.markdown() or None
 
     # Write the final output
     if final_output:
@@ -181,11 +147,11 @@ async def main():
         print(f"📊 Output length: {len(final_output)} characters")
     else:
         print("⚠️ No output received from agent")
-        print(f"Total events received: {len(events)}")
-        if events:
+        print(f"Total events received: {event_count}")
+        if last_event:
             import json
             print(f"\nLast event:")
-            print(json.dumps(events[-1], indent=2, default=str))
+            print(json.dumps(last_event, indent=2, default=str))
 
 
 if __name__ == "__main__":
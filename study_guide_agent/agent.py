@@ -1,11 +1,32 @@
-from .setup import setup_environment
-from .agents import create_main_study_guide_agent
+import threading
 
-# Initialize environment and Vertex AI
-setup_environment()
 
-# Study Guide Agent: Sequential flow through all stages
-# Note: Memory is configured via the Runner, not the Agent
-# When using `adk web`, memory will be handled automatically
-# For custom runners, configure memory_service on the Runner instance
-root_agent = create_main_study_guide_agent()
+# root_agent is built on first access (PEP 562), not at import time: the
+# environment setup and vertexai.init, google.adk and the agent tree all load
+# then, so importing this module is cheap for workers that have not yet
+# received a request. `from study_guide_agent.agent import root_agent` and
+# `adk web` both trigger it.
+_root_agent_lock = threading.Lock()
+
+
+def _create_root_agent():
+    from .setup import setup_environment
+    from .agents import create_main_study_guide_agent
+
+    # Initialize environment and Vertex AI
+    setup_environment()
+
+    # Study Guide Agent: Sequential flow through all stages
+    # Note: Memory is configured via the Runner, not the Agent
+    # When using `adk web`, memory will be handled automatically
+    # For custom runners, configure memory_service on the Runner instance
+    return create_main_study_guide_agent()
+
+
+def __getattr__(name):
+    if name != "root_agent":
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    with _root_agent_lock:
+        if "root_agent" not in globals():
+            globals()["root_agent"] = _create_root_agent()
+    return globals()["root_agent"]
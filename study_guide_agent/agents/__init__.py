@@ -1,15 +1,38 @@
-from .sub_agents.overview_agent import create_overview_agent
-from .sub_agents.objective_processor_agent import create_objective_processor_agent
-from .sub_agents.loop_controller_agent import create_loop_controller_agent
-from .sub_agents.assembler_agent import create_assembler_agent
-from .sub_agents.judge_agent import create_judge_agent
-from .main_study_guide_agent import create_main_study_guide_agent
+# Agent factories
+# Exports are imported on first access (see study_guide_agent.lazy), so
+# importing the package does not load google.adk until an agent is built
+from ..lazy import lazy_exports
 
 __all__ = [
     "create_overview_agent",
+    "create_map_reduce_overview_agent",
     "create_objective_processor_agent",
     "create_loop_controller_agent",
     "create_assembler_agent",
+    "create_transitions_agent",
     "create_judge_agent",
+    "create_streaming_judge_agent",
+    "create_parallel_elaboration_agent",
+    "create_speculative_elaboration_agent",
+    "ModelRouter",
+    "get_model_router",
+    "set_model_router",
     "create_main_study_guide_agent",
 ]
+
+__getattr__, __dir__ = lazy_exports(__name__, {
+    "create_overview_agent": ".sub_agents.overview_agent",
+    "create_map_reduce_overview_agent": ".sub_agents.map_reduce_overview_agent",
+    "create_objective_processor_agent": ".sub_agents.objective_processor_agent",
+    "create_loop_controller_agent": ".sub_agents.loop_controller_agent",
+    "create_assembler_agent": ".sub_agents.assembler_agent",
+    "create_transitions_agent": ".sub_agents.transitions_agent",
+    "create_judge_agent": ".sub_agents.judge_agent",
+    "create_streaming_judge_agent": ".sub_agents.judge_agent",
+    "create_parallel_elaboration_agent": ".sub_agents.parallel_elaboration_agent",
+    "create_speculative_elaboration_agent": ".sub_agents.speculative_elaboration_agent",
+    "ModelRouter": ".sub_agents.model_router",
+    "get_model_router": ".sub_agents.model_router",
+    "set_model_router": ".sub_agents.model_router",
+    "create_main_study_guide_agent": ".main_study_guide_agent",
+})
@@ -1,42 +1,138 @@
 from google.adk.agents import SequentialAgent, LoopAgent
-from .sub_agents.overview_agent import create_overview_agent
+from .sub_agents.map_reduce_overview_agent import create_map_reduce_overview_agent
 from .sub_agents.objective_processor_agent import create_objective_processor_agent
-from .sub_agents.loop_controller_agent import create_loop_controller_agent
+from .sub_agents.loop_controller_agent import (
+    MAX_LOOP_ITERATIONS,
+    create_loop_controller_agent,
+    reset_objective_index,
+)
 from .sub_agents.assembler_agent import create_assembler_agent
-from .sub_agents.judge_agent import create_judge_agent
+from .sub_agents.transitions_agent import create_transitions_agent
+from .sub_agents.judge_agent import create_judge_agent, create_streaming_judge_agent
+from .sub_agents.parallel_elaboration_agent import create_parallel_elaboration_agent
+from .sub_agents.speculative_elaboration_agent import create_speculative_elaboration_agent
+from ..cache import create_guide_cache_callbacks
 
 
-def create_main_study_guide_agent():
-    # Stage 1: Overview Agent - Creates high-level structure with Pydantic schema
-    overview_agent = create_overview_agent()
+def create_main_study_guide_agent(
+    parallel_elaboration=True,
+    max_concurrency=4,
+    section_transitions=False,
+    streaming_judge=True,
+    guide_cache=True,
+    overview_cache=True,
+    model_routing=True,
+    speculative_elaboration=False,
+):
+    """Creates the root study guide pipeline
 
-    # Stage 2: Elaboration Loop - Processes learning objectives iteratively
-    # The loop contains two sub-agents that work together:
-    #   - ObjectiveProcessorAgent: Processes one objective at a time
-    #   - LoopControllerAgent: Manages iteration and exit condition
-    elaboration_loop = LoopAgent(
-        name="ElaborationLoop",
-        description="Iteratively processes each learning objective from the overview",
-        sub_agents=[
-            create_objective_processor_agent(),
-            create_loop_controller_agent(),
-        ],
-        max_iterations=5,  # Safety limit to prevent infinite loops
+    Args:
+        parallel_elaboration: Elaborate all learning objectives concurrently
+            instead of one per ElaborationLoop iteration
+        max_concurrency: Maximum number of objectives elaborated at once
+            when parallel_elaboration is enabled
+        section_transitions: Run a short LLM pass that writes transitions
+            between sections before they are assembled
+        streaming_judge: Review sections individually (overlapping with
+            parallel elaboration) and compose the final guide in code,
+            instead of re-generating the whole guide in one judge call
+        guide_cache: Serve repeated or near-identical material from the
+            guide cache instead of running the pipeline
+        overview_cache: Reuse the memoised overview for the same material,
+            so regenerating a guide starts straight at elaboration
+        model_routing: Pick each call's model tier from the material's size,
+            the overview's difficulty_level and the request's "model_budget"
+            (see ModelRouter) instead of fixed per-agent models. The
+            ElaborationLoop keeps its fixed model
+        speculative_elaboration: Draft the learning objectives on a cheap
+            model while the overview stage runs and start elaborating them
+            straight away, keeping the sections whose objectives match the
+            final overview (parallel elaboration only)
+    """
+    # Stage 1: Overview Agent - Creates high-level structure with Pydantic schema.
+    # Material too long for one call is outlined chunk by chunk and merged
+    overview_agent = create_map_reduce_overview_agent(
+        max_concurrency=max_concurrency,
+        cache_overview=overview_cache,
+        model_routing=model_routing,
     )
 
-    # Stage 3: Assembler Agent - Combines all completed sections
-    assembler_agent = create_assembler_agent()
+    # Stage 2: Elaboration - Processes learning objectives
+    if parallel_elaboration:
+        # One ObjectiveProcessorAgent per objective, run concurrently and
+        # written to ordered per-objective state slots
+        elaboration_stage = create_parallel_elaboration_agent(
+            max_concurrency=max_concurrency,
+            review_sections=streaming_judge,
+            model_routing=model_routing,
+        )
+    else:
+        # The loop contains two sub-agents that work together:
+        #   - ObjectiveProcessorAgent: Processes one objective at a time
+        #   - LoopControllerAgent: Advances the objective index and exits
+        #     the loop once every objective is done (no model call)
+        elaboration_stage = LoopAgent(
+            name="ElaborationLoop",
+            description="Iteratively processes each learning objective from the overview",
+            sub_agents=[
+                create_objective_processor_agent(),
+                create_loop_controller_agent(),
+            ],
+            # The controller exits once every objective is done; this is
+            # only a ceiling, not a limit on the number of objectives
+            max_iterations=MAX_LOOP_ITERATIONS,
+            before_agent_callback=reset_objective_index,
+        )
+
+    # Stages 1 and 2 overlap: sections for drafted objectives are written
+    # while the overview is still being researched
+    stages = [overview_agent, elaboration_stage]
+    if speculative_elaboration and parallel_elaboration:
+        stages = [create_speculative_elaboration_agent(
+            overview_agent,
+            elaboration_stage,
+            max_concurrency=max_concurrency,
+            model_routing=model_routing,
+        )]
+
+    # Stage 3: Assembler Agent - Combines all completed sections in code,
+    # optionally preceded by a short LLM pass for transitions. The streaming
+    # judge assembles the final guide itself, so the assembled draft is only
+    # needed by the full-guide judge
+    assembly_agents = [] if streaming_judge else [create_assembler_agent(use_transitions=section_transitions)]
+    if section_transitions:
+        assembly_agents.insert(0, create_transitions_agent())
 
     # Stage 4: Final Judge - Adds final polish and quality seal
-    judge_agent = create_judge_agent()
+    if streaming_judge:
+        judge_agent = create_streaming_judge_agent(
+            max_concurrency=max_concurrency,
+            use_transitions=section_transitions,
+            model_routing=model_routing,
+        )
+    else:
+        judge_agent = create_judge_agent()
+
+    # Guide cache: a hit returns the stored final guide before any stage runs
+    callbacks = {}
+    if guide_cache:
+        variant = (
+            f"parallel_elaboration={parallel_elaboration};"
+            f"section_transitions={section_transitions};"
+            f"streaming_judge={streaming_judge};"
+            f"model_routing={model_routing};"
+            f"speculative_elaboration={speculative_elaboration}"
+        )
+        before, after = create_guide_cache_callbacks(variant)
+        callbacks = {"before_agent_callback": before, "after_agent_callback": after}
 
     return SequentialAgent(
         name="study_guide_agent",
         description="Creates comprehensive study guides with detailed content using iterative processing",
         sub_agents=[
-            overview_agent,
-            elaboration_loop,
-            assembler_agent,
+            *stages,
+            *assembly_agents,
             judge_agent,
         ],
+        **callbacks,
     )
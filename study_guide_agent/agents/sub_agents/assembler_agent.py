@@ -1,41 +1,126 @@
-from google.adk.agents import Agent
+import re
+from typing import AsyncGenerator
 
+from google.adk.agents import BaseAgent
+from google.adk.agents.invocation_context import InvocationContext
+from google.adk.events import Event, EventActions
+from google.genai import types
 
-def create_assembler_agent():
-    """Creates the agent that assembles all completed sections into final study guide
+from .guide_state import GuideState
+from .section_store import render_section, section_title
 
-    This agent takes all the individually processed sections and combines them
-    into a cohesive study guide with proper structure and table of contents.
+
+def _anchor(title, seen):
+    """GitHub-style heading anchor, de-duplicated against `seen`"""
+    slug = re.sub(r"[^\w\- ]", "", title.strip().lower()).replace(" ", "-")
+    anchor = slug
+    count = seen.get(slug, 0)
+    if count:
+        anchor = f"{slug}-{count}"
+    seen[slug] = count + 1
+    return anchor
+
+
+def assemble_guide(overview, records, transitions=None, introduction=None, study_tips=None):
+    """Assemble the study guide markdown from the overview and section records
+
+    Builds the title, table of contents and anchors from the structured state
+    and places the sections in objective order, without calling a model.
+
+    Args:
+        overview: StudyGuideOverview, or None
+        records: SectionRecord list, in objective order
+        transitions: Optional bridging sentences; transitions[i] is placed
+            before the (i + 2)th section
+        introduction: Optional paragraph placed under the title
+        study_tips: Optional list of tips added as a final section
+
+    Returns:
+        The assembled study guide as markdown
     """
-    return Agent(
-        name="AssemblerAgent",
-        model="gemini-2.5-flash-lite",
-        description="Assembles all completed sections into a cohesive study guide",
-        instruction="""You are assembling the final study guide from the loop processing results.
+    topic = overview.main_topic if overview else "Study Guide"
+    lines = [f"# {topic} Study Guide", ""]
+    if introduction:
+        lines += [introduction.strip(), ""]
+
+    if overview:
+        lines += [f"**Difficulty:** {overview.difficulty_level.capitalize()}", ""]
+        if overview.key_sections:
+            lines += [f"**Key sections:** {', '.join(overview.key_sections)}", ""]
 
-Based on this overview:
-{overview}
+    seen = {"table-of-contents": 1}
+    titles = [section_title(record) for record in records]
+    anchors = [_anchor(title, seen) for title in titles]
+    if study_tips:
+        titles_in_toc = titles + ["Study Tips"]
+        anchors_in_toc = anchors + [_anchor("Study Tips", seen)]
+    else:
+        titles_in_toc, anchors_in_toc = titles, anchors
 
-And the processing that has been completed through the loop:
-{section_content}
-{loop_status}
+    lines += ["## Table of Contents", ""]
+    lines += [
+        f"{i}. [{title}](#{anchor})"
+        for i, (title, anchor) in enumerate(zip(titles_in_toc, anchors_in_toc), 1)
+    ]
 
-Your tasks:
-1. Create a comprehensive study guide document
-2. Add a table of contents listing all major sections
-3. Ensure proper markdown formatting and flow
-4. Structure the content logically based on the learning objectives
+    for i, (record, title) in enumerate(zip(records, titles)):
+        lines.append("")
+        if i and transitions and i - 1 < len(transitions) and transitions[i - 1]:
+            lines += [f"*{transitions[i - 1].strip()}*", ""]
+        lines.append(render_section(record, title))
 
-Output a complete study guide in this format:
+    if study_tips:
+        lines += ["", "## Study Tips", ""]
+        lines += [f"- {tip.strip()}" for tip in study_tips]
 
-# [Topic] Study Guide
+    return "\n".join(lines).rstrip() + "\n"
 
-## Table of Contents
-[Generate numbered list of all main sections]
 
-[Main content organized by sections]
+class AssemblerAgent(BaseAgent):
+    """Assembles the section store into the final study guide in code
 
-The guide should be cohesive, well-organized, and ready for educational use.
-""",
-        output_key="elaborated_guide",
+    Replaces an LLM pass that re-emitted every section: the structure is
+    already known from the overview and the section store, so the table of
+    contents, anchors and ordering are built deterministically. When
+    `use_transitions` is set, bridging sentences written by TransitionsAgent
+    under "section_transitions" are placed between sections.
+    """
+
+    use_transitions: bool = False
+
+    async def _run_async_impl(
+        self, ctx: InvocationContext
+    ) -> AsyncGenerator[Event, None]:
+        state = ctx.session.state
+        transitions = None
+        if self.use_transitions and isinstance(state.get("section_transitions"), dict):
+            transitions = state["section_transitions"].get("transitions")
+
+        sections = GuideState(state)
+        guide = assemble_guide(
+            sections.overview.overview if sections.overview else None,
+            sections.sections,
+            transitions=transitions,
+        )
+        yield Event(
+            author=self.name,
+            invocation_id=ctx.invocation_id,
+            branch=ctx.branch,
+            content=types.Content(role="model", parts=[types.Part(text=guide)]),
+            actions=EventActions(state_delta={"elaborated_guide": guide}),
+        )
+
+
+def create_assembler_agent(use_transitions=False):
+    """Creates the agent that assembles all completed sections into final study guide
+
+    This agent takes all the individually processed sections and combines them
+    into a cohesive study guide with proper structure and table of contents.
+    No model is called; pair it with create_transitions_agent() and
+    use_transitions=True for LLM-written transitions between sections.
+    """
+    return AssemblerAgent(
+        name="AssemblerAgent",
+        description="Assembles all completed sections into a cohesive study guide",
+        use_transitions=use_transitions,
     )
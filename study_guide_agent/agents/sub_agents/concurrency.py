@@ -0,0 +1,71 @@
+import asyncio
+
+
+_DONE = object()
+
+
+def branch_context(ctx, name):
+    """Copy of the invocation context on its own child branch
+
+    Agents running on sibling branches don't see each other's conversation
+    history, so concurrent runs never interleave their prompts.
+    """
+    branch = f"{ctx.branch}.{name}" if ctx.branch else name
+    return ctx.model_copy(update={"branch": branch})
+
+
+async def merge_branches(ctx, branches, max_concurrency):
+    """Run event generators concurrently and yield their events as they arrive
+
+    Args:
+        ctx: Parent InvocationContext
+        branches: Iterable of (branch_name, run) pairs, where run(branch_ctx)
+            returns an async generator of events. It is consumed lazily: a
+            branch is only taken once a running one finishes, so generators
+            of large inputs are never materialised up front.
+        max_concurrency: Maximum number of branches running at once
+
+    Yields:
+        Events from every branch, in arrival order. The first exception
+        raised by a branch is re-raised here and the other branches are
+        cancelled.
+    """
+    pending = iter(branches)
+    queue = asyncio.Queue()
+    running = set()
+
+    async def run_branch(name, run):
+        try:
+            async for event in run(branch_context(ctx, name)):
+                await queue.put(event)
+        except Exception as e:
+            await queue.put(e)
+        finally:
+            await queue.put(_DONE)
+
+    def start_next():
+        for name, run in pending:
+            task = asyncio.create_task(run_branch(name, run))
+            running.add(task)
+            task.add_done_callback(running.discard)
+            return True
+        return False
+
+    active = 0
+    while active < max(1, max_concurrency) and start_next():
+        active += 1
+
+    try:
+        while active:
+            item = await queue.get()
+            if item is _DONE:
+                active -= 1
+                if start_next():
+                    active += 1
+                continue
+            if isinstance(item, Exception):
+                raise item
+            yield item
+    finally:
+        for task in list(running):
+            task.cancel()
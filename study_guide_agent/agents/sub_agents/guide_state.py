@@ -0,0 +1,102 @@
+"""
+Typed view of the study guide pipeline's session state.
+
+The pipeline keeps its working state compact and structured: the overview
+as a StudyGuideOverview dict under "overview", the ElaborationLoop's
+position under "objective_index", and one SectionRecord per objective in
+the section store (see section_store). GuideState reads all three from any
+state mapping (session state, a callback or readonly context's state, or a
+plain dict) and parses each value once per run (see schemas.memoised).
+
+OverviewView holds the renderings each consumer needs, computed once per
+overview rather than on every instruction or callback: the other
+objectives for a section writer, the topic line for reviewers, counts for
+the loop controller, and any consumer-specific rendering via rendered().
+
+Usage:
+    guide = GuideState(ctx.session.state)
+    if guide.overview:
+        print(guide.overview.total, guide.overview.objective_list(exclude=0))
+    for record in guide.sections:
+        ...
+"""
+
+from typing import Callable, Mapping, Optional
+
+from .schemas import StudyGuideOverview, memoised, overview_from_state
+from .section_store import SectionRecord, get_section, ordered_sections, section_indices
+
+
+OVERVIEW_KEY = "overview"
+OBJECTIVE_INDEX_KEY = "objective_index"
+
+
+class OverviewView:
+    """A parsed overview plus renderings computed once per overview"""
+
+    def __init__(self, overview: StudyGuideOverview):
+        self.overview = overview
+        self.objectives = overview.learning_objectives
+        self.total = len(self.objectives)
+        self.topic = f"{overview.main_topic} ({overview.difficulty_level})"
+        self._rendered = {}
+
+    def objective(self, index: int, default: str = "the next learning objective") -> str:
+        """Text of objective `index`, clamped to the objective list"""
+        if not self.objectives:
+            return default
+        return self.objectives[min(max(index, 0), self.total - 1)]
+
+    def objective_list(self, exclude: Optional[int] = None) -> str:
+        """The objectives as "- ..." lines, without objective `exclude`"""
+        key = ("objective_list", exclude)
+        if key not in self._rendered:
+            self._rendered[key] = "\n".join(f"- {o}" for i, o in enumerate(self.objectives) if i != exclude)
+        return self._rendered[key]
+
+    def rendered(self, render: Callable[[StudyGuideOverview], str]) -> str:
+        """render(overview), computed once per overview and `render`"""
+        if render not in self._rendered:
+            self._rendered[render] = render(self.overview)
+        return self._rendered[render]
+
+
+def _overview_view(value):
+    overview = overview_from_state(value)
+    return OverviewView(overview) if overview else None
+
+
+def overview_view(value) -> Optional[OverviewView]:
+    """OverviewView of an "overview" state value (or StudyGuideOverview), or None"""
+    return memoised(value, _overview_view)
+
+
+class GuideState:
+    """Typed access to the overview, objective index and sections in `state`
+
+    Args:
+        state: Session state or any mapping holding the pipeline's keys
+    """
+
+    def __init__(self, state: Mapping):
+        self.state = state
+
+    @property
+    def overview(self) -> Optional[OverviewView]:
+        return overview_view(self.state.get(OVERVIEW_KEY))
+
+    @property
+    def objective_index(self) -> int:
+        return self.state.get(OBJECTIVE_INDEX_KEY, 0)
+
+    @property
+    def section_count(self) -> int:
+        return len(section_indices(self.state))
+
+    @property
+    def sections(self) -> list[SectionRecord]:
+        """Stored sections in objective order"""
+        return ordered_sections(self.state)
+
+    def section(self, index: int) -> Optional[SectionRecord]:
+        return get_section(self.state, index)
@@ -1,11 +1,39 @@
-from google.adk.agents import Agent
+from typing import AsyncGenerator, Union
 
+from google.adk.agents import Agent, BaseAgent
+from google.adk.agents.invocation_context import InvocationContext
+from google.adk.events import Event, EventActions
+from google.adk.models import BaseLlm
+from google.genai import types
 
-def create_judge_agent():
-    """Creates the judge agent for final quality assessment"""
+from .assembler_agent import assemble_guide
+from .concurrency import merge_branches
+from .model_router import get_model_router, request_budget, run_with_escalation
+from .prompt_prefix import shared_prefix
+from .guide_state import GuideState
+from .schemas import GuideFraming, SectionReview
+from .section_store import (
+    ordered_sections,
+    review_section,
+    section_event_metadata,
+    section_indices,
+    section_store_snapshot,
+    section_title,
+)
+
+
+QUALITY_SEAL = "✅ Quality Verified - Ready for Study"
+
+
+def create_judge_agent(model="gemini-2.5-flash-lite"):
+    """Creates the judge agent for final quality assessment
+
+    Args:
+        model: Model name or BaseLlm instance
+    """
     return Agent(
         name="JudgeAgent",
-        model="gemini-2.5-flash-lite",
+        model=model,
         description="Makes final quality assessment and adds finishing touches",
         instruction="""You are the final educational quality judge.
 
@@ -19,4 +47,206 @@ def create_judge_agent():
 
     Present the final, polished study guide ready for students to use.
     Include your quality seal at the end: "✅ Quality Verified - Ready for Study" """,
+        before_model_callback=shared_prefix(model, include_source=False),
+        output_key="final_guide",
+    )
+
+
+def section_review_state_key(index):
+    """State key holding the judge review for objective `index` (0-based)"""
+    return f"section_review_{index}"
+
+
+def create_section_review_agent(index, markdown, model="gemini-2.5-flash-lite"):
+    """Creates an agent that reviews a single elaborated section
+
+    The section is reviewed on its own, so reviews can start as soon as a
+    section is finished. The output is a verdict plus an optional short
+    patch rather than a rewritten section.
+
+    Args:
+        index: 0-based objective index of the section
+        markdown: The section's markdown
+        model: Model name or BaseLlm instance
+    """
+    def instruction(context):
+        view = GuideState(context.state).overview
+        topic = f"Topic: {view.topic}\n\n" if view else ""
+        return (
+            "You are the educational quality judge reviewing one section of a study guide.\n\n"
+            + topic
+            + f"Section:\n{markdown}\n\n"
+            "Check that the section is accurate, complete and clearly formatted.\n"
+            '- If it is, set verdict to "approved" and leave patch empty.\n'
+            '- Otherwise set verdict to "patched" and write a patch: at most three sentences '
+            "correcting or clarifying the section. Do not rewrite the section."
+        )
+
+    return Agent(
+        name=f"SectionReviewAgent_{index}",
+        model=model,
+        description=f"Reviews the study guide section for learning objective {index + 1}",
+        instruction=instruction,
+        before_model_callback=shared_prefix(model, include_source=False),
+        output_schema=SectionReview,
+        output_key=section_review_state_key(index),
+    )
+
+
+def create_framing_agent(model="gemini-2.5-flash-lite"):
+    """Creates the agent that writes the introduction and study tips
+
+    Its task lists only the topic and section titles, never the sections'
+    text, so its cost does not grow with the length of the guide. The
+    request starts with the shared prefix (see prompt_prefix), without the
+    source material.
+    """
+    def instruction(context):
+        guide = GuideState(context.state)
+        titles = [section_title(r) for r in guide.sections]
+        topic = guide.overview.topic if guide.overview else "the material"
+        return (
+            f"You are the final educational quality judge for a study guide on {topic}.\n\n"
+            "Its sections are:\n"
+            + "\n".join(f"- {title}" for title in titles)
+            + "\n\nWrite:\n"
+            "- introduction: a brief paragraph welcoming the student\n"
+            "- study_tips: 3-5 short study tips or a recommended approach"
+        )
+
+    return Agent(
+        name="GuideFramingAgent",
+        model=model,
+        description="Writes the study guide introduction and study tips",
+        instruction=instruction,
+        before_model_callback=shared_prefix(model, include_source=False),
+        output_schema=GuideFraming,
+        output_key="guide_framing",
+    )
+
+
+class StreamingJudgeAgent(BaseAgent):
+    """Judge that reviews sections individually and composes the guide in code
+
+    Sections already reviewed during elaboration (see
+    ParallelElaborationAgent.review_sections) are not reviewed again; the
+    rest are reviewed concurrently alongside GuideFramingAgent. The final
+    guide is then assembled from the section store with the judge's
+    introduction, patches, study tips and quality seal, and written to
+    "final_guide". Each review is announced to clients with a
+    SectionFinalized event (see study_guide_agent.events).
+
+    When `model_routing` is set, the ModelRouter picks the review and
+    framing models instead of `model`, and a review the output schema
+    rejects is retried one tier up.
+    """
+
+    model: Union[str, BaseLlm] = "gemini-2.5-flash-lite"
+    max_concurrency: int = 4
+    use_transitions: bool = False
+    model_routing: bool = False
+
+    async def _run_async_impl(
+        self, ctx: InvocationContext
+    ) -> AsyncGenerator[Event, None]:
+        state = ctx.session.state
+        sections = section_store_snapshot(state)
+        total = len(section_indices(sections))
+        pending = [r for r in ordered_sections(sections) if r.verdict is None]
+
+        branches = [
+            (f"SectionReviewAgent_{r.index}", self._branch(
+                "review", lambda m, r=r: create_section_review_agent(r.index, r.markdown, m),
+                section_review_state_key(r.index),
+            ))
+            for r in pending
+        ]
+        branches.append(("GuideFramingAgent", self._branch("framing", create_framing_agent, "guide_framing")))
+
+        framing = None
+        async for event in merge_branches(ctx, branches, self.max_concurrency):
+            yield event
+            delta = event.actions.state_delta
+            for record in pending:
+                key = section_review_state_key(record.index)
+                if key in delta:
+                    reviewed = review_section(sections, record.index, delta[key])
+                    sections.update(reviewed)
+                    yield self._state_event(
+                        ctx,
+                        reviewed,
+                        custom_metadata=section_event_metadata(
+                            sections, record.index, "reviewed", total
+                        ),
+                    )
+            if "guide_framing" in delta:
+                framing = GuideFraming.model_validate(delta["guide_framing"])
+
+        transitions = None
+        if self.use_transitions and isinstance(state.get("section_transitions"), dict):
+            transitions = state["section_transitions"].get("transitions")
+
+        view = GuideState(state).overview
+        guide = assemble_guide(
+            view.overview if view else None,
+            ordered_sections(sections),
+            transitions=transitions,
+            introduction=framing.introduction if framing else None,
+            study_tips=framing.study_tips if framing else None,
+        )
+        guide += f"\n---\n\n{QUALITY_SEAL}\n"
+
+        yield self._state_event(
+            ctx,
+            {"final_guide": guide},
+            content=types.Content(role="model", parts=[types.Part(text=guide)]),
+        )
+
+    def _branch(self, stage, create_agent, output_key):
+        """Branch run of the agent `create_agent(model)` for `stage`"""
+        if not self.model_routing:
+            return create_agent(self.model).run_async
+
+        def run(branch_ctx):
+            router = get_model_router()
+            view = GuideState(branch_ctx.session.state).overview
+            model = router.route(
+                stage,
+                difficulty=view.overview.difficulty_level if view else None,
+                budget=request_budget(branch_ctx.session.state),
+            )
+            return run_with_escalation(branch_ctx, create_agent, model, output_key, router=router)
+
+        return run
+
+    def _state_event(self, ctx, state_delta, content=None, custom_metadata=None):
+        return Event(
+            author=self.name,
+            invocation_id=ctx.invocation_id,
+            branch=ctx.branch,
+            content=content,
+            custom_metadata=custom_metadata,
+            actions=EventActions(state_delta=state_delta),
+        )
+
+
+def create_streaming_judge_agent(
+    max_concurrency=4, use_transitions=False, model="gemini-2.5-flash-lite", model_routing=False
+):
+    """Creates the judge that reviews sections incrementally
+
+    Args:
+        max_concurrency: Maximum number of section reviews run at once
+        use_transitions: Keep the TransitionsAgent output in the final guide
+        model: Model name or BaseLlm instance for reviews and framing
+        model_routing: Let the ModelRouter pick the review and framing
+            models instead of using `model`
+    """
+    return StreamingJudgeAgent(
+        name="JudgeAgent",
+        description="Reviews each section and composes the final, polished study guide",
+        model=model,
+        max_concurrency=max_concurrency,
+        use_transitions=use_transitions,
+        model_routing=model_routing,
     )
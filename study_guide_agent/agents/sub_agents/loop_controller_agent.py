@@ -1,42 +1,90 @@
-from google.adk.agents import Agent
-from google.adk.tools import exit_loop
+from typing import AsyncGenerator
 
+from google.adk.agents import BaseAgent
+from google.adk.agents.invocation_context import InvocationContext
+from google.adk.events import Event, EventActions
 
-def create_loop_controller_agent():
-    """Creates the agent that manages loop iteration and exit conditions
+from .guide_state import OBJECTIVE_INDEX_KEY, GuideState
+from .section_store import SECTIONS_KEY, append_section, section_event_metadata, section_record_from_event
 
-    This agent decides whether to continue processing more objectives or exit the loop.
-    It uses the exit_loop() tool to signal completion.
+
+# Hard ceiling for the ElaborationLoop's iterations. The controller ends the
+# loop once every objective is done, so this only stops a runaway loop; it
+# is far above the number of objectives an overview has.
+MAX_LOOP_ITERATIONS = 100
+
+
+class LoopControllerAgent(BaseAgent):
+    """Deterministic loop controller for the ElaborationLoop
+
+    Runs after ObjectiveProcessorAgent in every iteration. It appends the
+    section just written to "section_content" to the section store, advances
+    the per-objective completion index stored under "objective_index" and
+    escalates (the same signal exit_loop() sends) once every objective in
+    overview.learning_objectives is done. No model is called.
     """
-    return Agent(
-        name="LoopControllerAgent",
-        model="gemini-2.5-pro",
-        description="Manages iteration through learning objectives and controls loop exit",
-        instruction="""You are the loop controller. Your job is to track progress and call exit_loop ONLY when ALL objectives are complete.
 
-COUNTING LOGIC:
-1. Look at {overview} - count how many "Learning Objectives" are listed (look for numbered list under "## Learning Objectives")
-2. Look at {section_content} - this accumulates ALL completed sections from previous iterations
-3. Count how many complete sections are in {section_content} (count ## headers that correspond to objectives)
-4. Compare: completed_sections vs total_objectives
+    async def _run_async_impl(
+        self, ctx: InvocationContext
+    ) -> AsyncGenerator[Event, None]:
+        guide = GuideState(ctx.session.state)
+        objectives = guide.overview.objectives if guide.overview else []
+        total = len(objectives)
+        index = guide.objective_index
+        completed = min(index + 1, total)
+
+        state_delta = {
+            OBJECTIVE_INDEX_KEY: completed,
+            "loop_status": f"{completed}/{total} objectives complete",
+        }
+        custom_metadata = None
+        processor_event = _last_section_event(ctx)
+        if processor_event is not None and index < total:
+            processor = ctx.agent.root_agent.find_agent(processor_event.author)
+            record = section_record_from_event(
+                index,
+                objectives[index],
+                processor_event.actions.state_delta["section_content"],
+                processor_event,
+                model=getattr(processor, "model", None),
+            )
+            sections = append_section(ctx.session.state, record)
+            state_delta.update(sections)
+            custom_metadata = section_event_metadata(sections, index, "elaborated", total)
 
-DECISION RULES:
-- If completed_sections < total_objectives: OUTPUT NOTHING
-- If completed_sections >= total_objectives: Call exit_loop() tool
+        yield Event(
+            author=self.name,
+            invocation_id=ctx.invocation_id,
+            branch=ctx.branch,
+            custom_metadata=custom_metadata,
+            actions=EventActions(state_delta=state_delta, escalate=completed >= total),
+        )
 
-CRITICAL: WHEN CONTINUING THE LOOP, OUTPUT ABSOLUTELY NOTHING.
-- Do not write any words at all
-- Do not write punctuation
-- Do not write empty strings
-- Just output nothing - end your turn immediately without any text
-- Your response must be completely empty (zero characters)
 
-When all objectives are complete: Call exit_loop() tool only (no text).
+def _last_section_event(ctx):
+    """Find the section_content event written since the previous iteration"""
+    for event in reversed(ctx.session.events):
+        if event.invocation_id != ctx.invocation_id or event.author == ctx.agent.name:
+            break
+        if "section_content" in event.actions.state_delta:
+            return event
+    return None
 
-DO NOT write anything ever except calling exit_loop when done.
 
-IMPORTANT: The loop will run multiple times. Each time, {section_content} will contain MORE sections than before. Only exit when you see ALL objectives completed in {section_content}.
-""",
-        tools=[exit_loop],
-        output_key="loop_status",
+def reset_objective_index(callback_context):
+    """before_agent_callback that restarts the ElaborationLoop at objective 1"""
+    callback_context.state[OBJECTIVE_INDEX_KEY] = 0
+    callback_context.state[SECTIONS_KEY] = []
+    return None
+
+
+def create_loop_controller_agent():
+    """Creates the agent that manages loop iteration and exit conditions
+
+    This agent decides whether to continue processing more objectives or exit the loop.
+    It escalates without calling a model once all objectives are complete.
+    """
+    return LoopControllerAgent(
+        name="LoopControllerAgent",
+        description="Manages iteration through learning objectives and controls loop exit",
     )
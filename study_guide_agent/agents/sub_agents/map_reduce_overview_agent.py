@@ -0,0 +1,270 @@
+import json
+from typing import AsyncGenerator, Union
+
+from google.adk.agents import Agent, BaseAgent
+from google.adk.agents.invocation_context import InvocationContext
+from google.adk.events import Event, EventActions
+from google.adk.models import BaseLlm
+from google.genai import types
+
+from .concurrency import merge_branches
+from .model_router import get_model_router, request_budget, run_with_escalation
+from .overview_agent import INSTRUCTION_OUTPUT, INSTRUCTION_TOOLS, create_overview_agent
+from .schemas import PartialOutline, StudyGuideOverview, overview_from_state
+from ...cache.overview_cache import get_overview_cache, instruction_version, overview_cache_key
+from ...ingest import is_long_source, iter_chunks
+from ...ingest.chunking import DEFAULT_CHUNK_TOKENS
+from ...tools.content_extraction import estimate_tokens
+from ...tools.firecrawl_function_tool import get_firecrawl_function_tools
+
+
+REQUEST_PREVIEW_CHARS = 500
+
+CHUNK_INSTRUCTION = """You are an educational content analyst.
+
+**Your Task:**
+The study material you are given is one part of a longer document. Outline
+only what this part covers:
+- topics: Subjects and subtopics covered (list of strings)
+- key_points: The most important facts, definitions and ideas (list of strings)
+- candidate_objectives: Learning objectives this part supports (list of strings)
+
+Be concise; the outlines of all parts are merged afterwards."""
+
+REDUCE_INSTRUCTION = """You are an educational overview specialist.
+
+**Your Task:**
+The user's study material was too long to read in one pass, so it was split
+into parts and each part was outlined. You are given the start of the user's
+request and the outlines in order. Merge them into one comprehensive
+high-level overview of the whole material: combine repeated topics and pick
+the objectives that best cover the material as a whole.
+""" + INSTRUCTION_TOOLS + INSTRUCTION_OUTPUT
+
+
+def chunk_outline_state_key(index):
+    """State key holding the PartialOutline of chunk `index`"""
+    return f"chunk_outline_{index}"
+
+
+def _user_text(ctx):
+    content = ctx.user_content
+    if not content or not content.parts:
+        return ""
+    return "\n".join(part.text for part in content.parts if part.text)
+
+
+def _model_name(model):
+    return model if isinstance(model, str) else model.model
+
+
+def replace_user_turn(text):
+    """before_model_callback that sends `text` in place of the user's message
+
+    ADK always sends the latest user message, even with include_contents set
+    to "none", so without this every map call would carry the whole source.
+    Tool calls and responses after the user turn are kept.
+    """
+    def callback(callback_context, llm_request):
+        message = types.Content(role="user", parts=[types.Part(text=text)])
+        if llm_request.contents and llm_request.contents[0].role == "user":
+            llm_request.contents[0] = message
+        else:
+            llm_request.contents.insert(0, message)
+        return None
+
+    return callback
+
+
+def create_chunk_outline_agent(index, chunk, model="gemini-2.5-flash"):
+    """Creates the map-step agent that outlines one chunk of the source
+
+    The chunk is sent in place of the user's message and no other history
+    is included, so each call only pays for its own chunk.
+    """
+    return Agent(
+        name=f"ChunkOutlineAgent_{index}",
+        model=model,
+        description="Outlines one chunk of long study material",
+        instruction=CHUNK_INSTRUCTION,
+        include_contents="none",
+        before_model_callback=replace_user_turn(f"Study material (part {index + 1}):\n\n{chunk}"),
+        output_schema=PartialOutline,
+        output_key=chunk_outline_state_key(index),
+    )
+
+
+def create_outline_reduce_agent(outlines, request, model="gemini-2.5-pro"):
+    """Creates the reduce-step agent that merges chunk outlines into the overview
+
+    Args:
+        outlines: PartialOutline dicts in source order
+        request: Opening of the user's message, for any instructions it holds
+        model: Model name or BaseLlm instance
+    """
+    parts = "\n\n".join(
+        f"Part {i + 1}:\n{json.dumps(outline, indent=2)}" for i, outline in enumerate(outlines)
+    )
+    message = f"""**Start of the user's request:**
+{request}
+
+**Outlines of the material ({len(outlines)} parts, in order):**
+{parts}"""
+
+    return Agent(
+        name="OutlineReduceAgent",
+        model=model,
+        description="Merges chunk outlines into a high-level study guide overview",
+        instruction=REDUCE_INSTRUCTION,
+        include_contents="none",
+        before_model_callback=replace_user_turn(message),
+        output_schema=StudyGuideOverview,
+        tools=get_firecrawl_function_tools(),
+        output_key="overview",
+    )
+
+
+class MapReduceOverviewAgent(BaseAgent):
+    """Creates the overview, map-reducing source material too long for one call
+
+    Short material goes straight to the OverviewAgent sub-agent. Longer
+    material is split into token-bounded chunks, each outlined concurrently
+    by a ChunkOutlineAgent_<i> on its own branch (at most `max_concurrency`
+    at a time), and an OutlineReduceAgent merges the outlines into the
+    "overview" state key. Either way, downstream stages see the same
+    StudyGuideOverview, and nothing is truncated.
+
+    When `cache_overview` is set, overviews are memoised in the overview
+    cache, keyed on the source material, the models and a hash of the
+    instructions, so regenerating a guide for the same material skips this
+    stage entirely.
+
+    When `model_routing` is set, the ModelRouter picks the overview, map and
+    reduce models from the size of the material and the request's budget,
+    and an overview the output schema rejects is regenerated one tier up.
+    """
+
+    chunk_tokens: int = DEFAULT_CHUNK_TOKENS
+    max_concurrency: int = 4
+    map_model: Union[str, BaseLlm] = "gemini-2.5-flash"
+    reduce_model: Union[str, BaseLlm] = "gemini-2.5-pro"
+    cache_overview: bool = True
+    model_routing: bool = False
+
+    async def _run_async_impl(
+        self, ctx: InvocationContext
+    ) -> AsyncGenerator[Event, None]:
+        source = _user_text(ctx)
+        models = self._models(ctx, source)
+        cache = get_overview_cache() if self.cache_overview and source.strip() else None
+        key = self._cache_key(source, models) if cache else None
+        cached = overview_from_state(cache.get(key)) if cache else None
+        if cached:
+            overview = cached.model_dump()
+            yield Event(
+                author=self.name,
+                invocation_id=ctx.invocation_id,
+                branch=ctx.branch,
+                content=types.Content(role="model", parts=[types.Part(text=json.dumps(overview))]),
+                actions=EventActions(state_delta={"overview": overview}),
+            )
+            return
+
+        overview = None
+        async for event in self._generate(ctx, source, models):
+            overview = event.actions.state_delta.get("overview", overview)
+            yield event
+
+        overview = overview_from_state(overview)
+        if cache and overview:
+            cache.put(key, overview.model_dump())
+
+    def _models(self, ctx, source):
+        """Overview, map and reduce models for this material"""
+        if not self.model_routing:
+            return self.sub_agents[0].model, self.map_model, self.reduce_model
+
+        router = get_model_router()
+        budget = request_budget(ctx.session.state)
+        tokens = estimate_tokens(source)
+        return (
+            router.route("overview", input_tokens=tokens, budget=budget),
+            router.route("chunk_outline", input_tokens=min(tokens, self.chunk_tokens), budget=budget),
+            router.route("outline_reduce", input_tokens=tokens, budget=budget),
+        )
+
+    def _cache_key(self, source, models):
+        version = instruction_version(
+            self.sub_agents[0].instruction,
+            CHUNK_INSTRUCTION,
+            REDUCE_INSTRUCTION,
+            json.dumps(StudyGuideOverview.model_json_schema(), sort_keys=True),
+            self.chunk_tokens,
+        )
+        return overview_cache_key(source, [_model_name(m) for m in models], version)
+
+    async def _generate(self, ctx, source, models):
+        """Run the overview stage: directly for short material, else map-reduce"""
+        overview_model, map_model, reduce_model = models
+        if not is_long_source(source, self.chunk_tokens):
+            async for event in self._run(ctx, self._overview_agent, overview_model):
+                yield event
+            return
+
+        # Chunks are produced lazily as branches start, so only the chunks
+        # in flight are held in memory
+        branches = (
+            (f"ChunkOutlineAgent_{index}", create_chunk_outline_agent(index, chunk, map_model).run_async)
+            for index, chunk in enumerate(iter_chunks(source, self.chunk_tokens))
+        )
+        outlines = {}
+        async for event in merge_branches(ctx, branches, self.max_concurrency):
+            yield event
+            for key, value in event.actions.state_delta.items():
+                if key.startswith(chunk_outline_state_key("")):
+                    outlines[int(key.rsplit("_", 1)[1])] = value
+
+        def create_reducer(model):
+            return create_outline_reduce_agent(
+                [outlines[i] for i in sorted(outlines)],
+                source[:REQUEST_PREVIEW_CHARS],
+                model=model,
+            )
+
+        async for event in self._run(ctx, create_reducer, reduce_model):
+            yield event
+
+    def _overview_agent(self, model):
+        """The OverviewAgent sub-agent, or a copy of it on a routed model"""
+        overview_agent = self.sub_agents[0]
+        return overview_agent if model == overview_agent.model else create_overview_agent(model)
+
+    def _run(self, ctx, create_agent, model):
+        if not self.model_routing:
+            return create_agent(model).run_async(ctx)
+        return run_with_escalation(ctx, create_agent, model, "overview")
+
+
+def create_map_reduce_overview_agent(
+    max_concurrency=4, chunk_tokens=DEFAULT_CHUNK_TOKENS, cache_overview=True, model_routing=False
+):
+    """Creates the overview stage, with map-reduce over long source material
+
+    Args:
+        max_concurrency: Maximum number of chunks outlined at once
+        chunk_tokens: Estimated tokens per chunk; material that fits in one
+            chunk is handled by the OverviewAgent directly
+        cache_overview: Reuse the memoised overview for the same material,
+            models and instructions
+        model_routing: Let the ModelRouter pick the overview, map and
+            reduce models instead of the fixed defaults
+    """
+    return MapReduceOverviewAgent(
+        name="MapReduceOverviewAgent",
+        description="Creates a high-level overview of study material of any length",
+        sub_agents=[create_overview_agent()],
+        max_concurrency=max_concurrency,
+        chunk_tokens=chunk_tokens,
+        cache_overview=cache_overview,
+        model_routing=model_routing,
+    )
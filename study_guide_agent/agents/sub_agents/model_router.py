@@ -0,0 +1,203 @@
+"""
+Per-call model routing across the Gemini tiers.
+
+Instead of a fixed model per agent, the stages that create their agents at
+run time (overview, sections, section reviews and framing) ask the
+ModelRouter for a model each call. The choice starts from a per-stage
+baseline tier and is moved down or up by:
+
+- difficulty_level from the StudyGuideOverview: beginner material drops a
+  tier, advanced material gains one
+- input size: short source material is outlined by a cheaper model, very
+  long input never goes to the lowest tier
+- the request's budget, read from the "model_budget" session state key:
+  "economy" drops a tier, "quality" gains one, "balanced" leaves it
+
+When a cheaper model's output fails validation (it does not match the output
+schema, or a section comes back nearly empty) the call is retried one tier
+up, until the top tier is reached.
+
+Routing only picks model names, so its decisions can be checked offline by
+registering a stub BaseLlm for the tier names in LLMRegistry (see
+py_scripts/benchmark_pipeline.py) or by installing a ModelRouter with custom
+tiers through set_model_router().
+
+Configuration (environment variables):
+    MODEL_TIER_LITE: Lowest tier (default: gemini-2.5-flash-lite)
+    MODEL_TIER_FLASH: Middle tier (default: gemini-2.5-flash)
+    MODEL_TIER_PRO: Top tier (default: gemini-2.5-pro)
+    MODEL_BUDGET: Budget for requests that don't set "model_budget"
+        (default: balanced)
+"""
+
+import os
+import threading
+from dataclasses import dataclass
+from typing import Optional
+
+from pydantic import ValidationError
+
+
+LITE, FLASH, PRO = 0, 1, 2
+
+DEFAULT_TIERS = ("gemini-2.5-flash-lite", "gemini-2.5-flash", "gemini-2.5-pro")
+
+BUDGET_STATE_KEY = "model_budget"
+
+# Tier each stage starts from before difficulty, size and budget are applied
+STAGE_TIERS = {
+    "overview": PRO,
+    "overview_draft": LITE,
+    "chunk_outline": FLASH,
+    "outline_reduce": PRO,
+    "section": PRO,
+    "review": LITE,
+    "framing": LITE,
+}
+
+DIFFICULTY_OFFSETS = {"beginner": -1, "intermediate": 0, "advanced": 1}
+
+BUDGET_OFFSETS = {"economy": -1, "balanced": 0, "quality": 1}
+
+# Stages whose input is the user's source material, so its size matters
+SIZE_ROUTED_STAGES = {"overview", "outline_reduce"}
+
+SMALL_INPUT_TOKENS = 2000
+LARGE_INPUT_TOKENS = 32000
+
+MIN_SECTION_CHARS = 200
+
+
+@dataclass(frozen=True)
+class ModelRouter:
+    """Picks a model tier per call from stage, difficulty, input size and budget
+
+    Args:
+        tiers: Model names from cheapest to most capable
+        default_budget: Budget used when the request doesn't name one
+        small_input_tokens: Source material below this is routed a tier lower
+        large_input_tokens: Input above this never goes to the lowest tier
+    """
+    tiers: tuple = DEFAULT_TIERS
+    default_budget: str = "balanced"
+    small_input_tokens: int = SMALL_INPUT_TOKENS
+    large_input_tokens: int = LARGE_INPUT_TOKENS
+
+    def route(self, stage, difficulty=None, input_tokens=0, budget=None) -> str:
+        """Model name for one call of `stage`"""
+        tier = STAGE_TIERS.get(stage, PRO)
+        tier += DIFFICULTY_OFFSETS.get((difficulty or "").lower(), 0)
+        if stage in SIZE_ROUTED_STAGES and 0 < input_tokens < self.small_input_tokens:
+            tier -= 1
+        tier += BUDGET_OFFSETS.get(budget or self.default_budget, 0)
+
+        tier = min(max(tier, LITE), len(self.tiers) - 1)
+        if input_tokens > self.large_input_tokens:
+            tier = max(tier, min(FLASH, len(self.tiers) - 1))
+        return self.tiers[tier]
+
+    def escalate(self, model) -> Optional[str]:
+        """Next tier above `model`, or None at the top tier or for unrouted models"""
+        if model not in self.tiers:
+            return None
+        index = self.tiers.index(model)
+        return self.tiers[index + 1] if index + 1 < len(self.tiers) else None
+
+
+def request_budget(state) -> Optional[str]:
+    """Budget named by the request's session state, if it's a known one"""
+    budget = state.get(BUDGET_STATE_KEY)
+    return budget if budget in BUDGET_OFFSETS else None
+
+
+def section_is_valid(markdown) -> bool:
+    """Whether an elaborated section is long enough to keep"""
+    return isinstance(markdown, str) and len(markdown.strip()) >= MIN_SECTION_CHARS
+
+
+def _attempt_context(ctx):
+    """Copy of `ctx` on a private copy of its session
+
+    An attempt run on it sees the session as it was before the attempt, and
+    its events are recorded only in the copy (see _record), so a rejected
+    attempt leaves no trace in the real session.
+    """
+    session = ctx.session.model_copy(update={"events": list(ctx.session.events), "state": dict(ctx.session.state)})
+    return ctx.model_copy(update={"session": session})
+
+
+def _record(attempt_ctx, event):
+    # What the session service does on append_event, for the private copy
+    if event.partial:
+        return
+    attempt_ctx.session.state.update(event.actions.state_delta)
+    attempt_ctx.session.events.append(event)
+
+
+async def run_with_escalation(ctx, create_agent, model, output_key, is_valid=None, router=None):
+    """Run `create_agent(model)`, retrying one tier up while its output is invalid
+
+    The output is invalid when the agent's output_schema rejects it (ADK
+    raises a pydantic ValidationError) or when `is_valid` returns False for
+    the value written to `output_key`. Each attempt runs on a private copy
+    of the session, so a retry does not see the rejected answer in its
+    history. Partial (streamed) events are forwarded as they arrive; the
+    complete events that reach the session are held back until the attempt
+    is accepted, and only while a higher tier is left to retry on. Once
+    there is no higher tier, events are forwarded live, a schema error is
+    re-raised and an output that fails `is_valid` is kept.
+    """
+    router = router or get_model_router()
+    while True:
+        attempt_ctx = _attempt_context(ctx)
+        escalated = router.escalate(model)
+        held, output = [], None
+        try:
+            async for event in create_agent(model).run_async(attempt_ctx):
+                _record(attempt_ctx, event)
+                output = event.actions.state_delta.get(output_key, output)
+                if event.partial or escalated is None:
+                    yield event
+                else:
+                    held.append(event)
+        except ValidationError:
+            if escalated is None:
+                raise
+            model = escalated
+            continue
+
+        if escalated is None or is_valid is None or is_valid(output):
+            for event in held:
+                yield event
+            return
+        model = escalated
+
+
+_router = None
+_router_lock = threading.Lock()
+
+
+def get_model_router():
+    """Return the process-wide ModelRouter
+
+    Created lazily from the MODEL_TIER_* and MODEL_BUDGET environment variables.
+    """
+    global _router
+    with _router_lock:
+        if _router is None:
+            _router = ModelRouter(
+                tiers=(
+                    os.getenv("MODEL_TIER_LITE", DEFAULT_TIERS[LITE]),
+                    os.getenv("MODEL_TIER_FLASH", DEFAULT_TIERS[FLASH]),
+                    os.getenv("MODEL_TIER_PRO", DEFAULT_TIERS[PRO]),
+                ),
+                default_budget=os.getenv("MODEL_BUDGET", "balanced"),
+            )
+    return _router
+
+
+def set_model_router(router):
+    """Replace the process-wide ModelRouter (e.g. with custom tiers)"""
+    global _router
+    with _router_lock:
+        _router = router
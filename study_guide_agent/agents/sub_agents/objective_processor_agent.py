@@ -1,23 +1,10 @@
 from google.adk.agents import Agent
 
+from .guide_state import GuideState, overview_view
+from .prompt_prefix import shared_prefix
 
-def create_objective_processor_agent():
-    """Creates the agent that processes ONE learning objective at a time
-
-    This agent reads the current index from state, processes the corresponding
-    learning objective, and appends the completed section to state.
-    """
-    return Agent(
-        name="ObjectiveProcessorAgent",
-        model="gemini-2.5-pro",
-        description="Processes a single learning objective from the overview",
-        instruction="""You are a detailed educational content creator processing one learning objective at a time.
-
-Given this overview: {overview}
 
-Based on current progress, identify the next unprocessed objective and create a study guide section for it.
-
-Include:
+SECTION_GUIDELINES = """Include:
 - Clear explanation of the objective
 - Key concepts and terminology
 - Real-world examples and applications
@@ -33,6 +20,86 @@ OUTPUT FORMAT (MANDATORY):
 - Output ONLY: [## Title\n\nContent...]
 
 Focus on depth and clarity in the educational content itself.
-""",
+"""
+
+
+def _section_instruction(view, index, objective):
+    # Only this objective plus a compact slice of the overview is sent, not
+    # the whole serialized overview or previously written sections. Built in
+    # code rather than as a template so that braces inside the objective text
+    # are never mistaken for state placeholders. The objective list comes
+    # precomputed from the OverviewView.
+    context = ""
+    if view:
+        context = (
+            f"Topic: {view.overview.main_topic}\n"
+            f"Difficulty: {view.overview.difficulty_level}\n\n"
+        )
+        others = view.objective_list(exclude=index)
+        if others:
+            context += f"Other sections of the guide cover (do not repeat them):\n{others}\n\n"
+    return (
+        "You are a detailed educational content creator processing one learning objective at a time.\n\n"
+        + context
+        + f"Create the study guide section for learning objective {index + 1}:\n"
+        f"{objective}\n\n"
+        + SECTION_GUIDELINES
+    )
+
+
+def section_state_key(index):
+    """State key holding the finished section for objective `index` (0-based)"""
+    return f"section_{index}"
+
+
+def create_objective_processor_agent(model="gemini-2.5-pro"):
+    """Creates the agent that processes ONE learning objective at a time
+
+    This agent reads the current index from state, processes the corresponding
+    learning objective, and writes the completed section to state. The
+    LoopControllerAgent then appends it to the section store.
+    """
+    def instruction(context):
+        guide = GuideState(context.state)
+        if guide.overview is None:
+            return _section_instruction(None, 0, "the next learning objective")
+        index = min(guide.objective_index, max(guide.overview.total - 1, 0))
+        return _section_instruction(guide.overview, index, guide.overview.objective(index))
+
+    return Agent(
+        name="ObjectiveProcessorAgent",
+        model=model,
+        description="Processes a single learning objective from the overview",
+        instruction=instruction,
+        before_model_callback=shared_prefix(model),
         output_key="section_content",
     )
+
+
+def create_objective_section_agent(index, objective, model="gemini-2.5-pro", overview=None):
+    """Creates an agent that elaborates one specific learning objective
+
+    Used by the parallel elaboration stage: one instance is created per
+    objective, and each writes its section to its own state slot
+    (see section_state_key) so instances can run concurrently. The parallel
+    stage then appends each finished slot to the section store.
+
+    Args:
+        index: 0-based position of the objective in the overview
+        objective: Text of the learning objective to elaborate
+        model: Model name or BaseLlm instance
+        overview: StudyGuideOverview to write the section against, instead
+            of the one in the "overview" state key (e.g. a speculative draft)
+    """
+    def instruction(context):
+        view = overview_view(overview) if overview else GuideState(context.state).overview
+        return _section_instruction(view, index, objective)
+
+    return Agent(
+        name=f"ObjectiveProcessorAgent_{index}",
+        model=model,
+        description=f"Elaborates learning objective {index + 1} from the overview",
+        instruction=instruction,
+        before_model_callback=shared_prefix(model, overview),
+        output_key=section_state_key(index),
+    )
@@ -3,33 +3,16 @@ from .schemas import StudyGuideOverview
 from ...tools.firecrawl_function_tool import get_firecrawl_function_tools
 
 
-def create_overview_agent():
-    """Creates the overview agent for generating high-level study guide structure
-
-    This agent analyzes provided study material to create learning objectives
-    and study guide structure using a structured Pydantic schema.
-
-    Uses Firecrawl FunctionTools which work in both local development and deployment.
-    """
-
-    # Use FunctionTools instead of MCP for deployment compatibility
-    tools = get_firecrawl_function_tools()
-
-    instruction_base = """You are an educational overview specialist.
-
-**Your Task:**
-Analyze the provided study material and create a comprehensive high-level overview.
-"""
-
-    instruction_tools = """
+INSTRUCTION_TOOLS = """
 **Available Tools:**
 You have access to Firecrawl tools for web research:
-- firecrawl_search(query, limit): Search the web for relevant educational content
-- firecrawl_scrape(url): Extract content from a specific URL
+- firecrawl_search(query, limit, token_budget): Search the web for relevant educational content
+- firecrawl_scrape(url, query, token_budget): Extract the passages of a specific URL most relevant to query
+- firecrawl_batch_scrape(urls, query, token_budget): Extract content from several URLs at once (prefer this over repeated firecrawl_scrape calls)
 - Use these tools when helpful to validate or enhance the overview
 """
 
-    instruction_output = """
+INSTRUCTION_OUTPUT = """
 **Output Structure:**
 You must provide a structured response with:
 - main_topic: Central theme or subject (string)
@@ -43,11 +26,33 @@ You must provide a structured response with:
 - Create comprehensive objectives based on the content
 - Output will be structured according to the StudyGuideOverview schema"""
 
+
+def create_overview_agent(model="gemini-2.5-pro"):
+    """Creates the overview agent for generating high-level study guide structure
+
+    This agent analyzes provided study material to create learning objectives
+    and study guide structure using a structured Pydantic schema.
+
+    Uses Firecrawl FunctionTools which work in both local development and deployment.
+
+    Args:
+        model: Model name or BaseLlm instance
+    """
+
+    # Use FunctionTools instead of MCP for deployment compatibility
+    tools = get_firecrawl_function_tools()
+
+    instruction_base = """You are an educational overview specialist.
+
+**Your Task:**
+Analyze the provided study material and create a comprehensive high-level overview.
+"""
+
     return Agent(
         name="OverviewAgent",
-        model="gemini-2.5-pro",
+        model=model,
         description="Creates a high-level overview and structure for study materials",
-        instruction=instruction_base + instruction_tools + instruction_output,
+        instruction=instruction_base + INSTRUCTION_TOOLS + INSTRUCTION_OUTPUT,
         output_schema=StudyGuideOverview,
         tools=tools,
         output_key="overview",
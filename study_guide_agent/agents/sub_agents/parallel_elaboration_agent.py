@@ -0,0 +1,195 @@
+from typing import AsyncGenerator, Union
+
+from google.adk.agents import BaseAgent
+from google.adk.agents.invocation_context import InvocationContext
+from google.adk.events import Event, EventActions
+from google.adk.models import BaseLlm
+
+from .concurrency import merge_branches
+from .judge_agent import create_section_review_agent, section_review_state_key
+from .model_router import get_model_router, request_budget, run_with_escalation, section_is_valid
+from .objective_processor_agent import create_objective_section_agent, section_state_key
+from .guide_state import GuideState
+from .section_store import (
+    SPECULATIVE_SECTIONS_KEY,
+    SectionRecord,
+    append_section,
+    clear_sections,
+    get_section,
+    review_section,
+    section_event_metadata,
+    section_record_from_event,
+)
+
+
+class ParallelElaborationAgent(BaseAgent):
+    """Elaborates every learning objective from the overview concurrently
+
+    Reads StudyGuideOverview.learning_objectives from the "overview" state key
+    and starts one ObjectiveProcessorAgent_<i> per objective, at most
+    `max_concurrency` at a time. Each processor runs on its own branch so the
+    conversations don't interleave, and writes its section to the ordered
+    state slot section_<i>.
+
+    Each finished slot is also appended to the section store (see
+    section_store), so downstream stages read the sections in objective order
+    regardless of the order in which they completed.
+
+    When `review_sections` is set, each section is handed to a
+    SectionReviewAgent on the same branch as soon as it is written, so the
+    judge's per-section reviews overlap with the remaining elaboration.
+
+    When `model_routing` is set, `model` and `review_model` are ignored: the
+    ModelRouter picks each section's and review's model from the overview's
+    difficulty_level and the request's budget, and a section that fails
+    validation is regenerated one tier up.
+
+    Every section appended or reviewed is also announced to clients with a
+    SectionFinalized in the store event's custom_metadata (see
+    study_guide_agent.events).
+
+    Sections already written by the speculative stage (see
+    SpeculativeElaborationAgent) are taken from "speculative_sections"
+    instead of being elaborated again; they are still reviewed when
+    `review_sections` is set.
+    """
+
+    model: Union[str, BaseLlm] = "gemini-2.5-pro"
+    max_concurrency: int = 4
+    review_sections: bool = False
+    review_model: Union[str, BaseLlm] = "gemini-2.5-flash-lite"
+    model_routing: bool = False
+
+    async def _run_async_impl(
+        self, ctx: InvocationContext
+    ) -> AsyncGenerator[Event, None]:
+        view = GuideState(ctx.session.state).overview
+        overview = view.overview if view else None
+        objectives = view.objectives if view else []
+
+        # Local copy of the section store; events carry only what changed
+        sections = clear_sections()
+        speculative = ctx.session.state.get(SPECULATIVE_SECTIONS_KEY) or {}
+        yield self._store_event(ctx, {**sections, **({SPECULATIVE_SECTIONS_KEY: None} if speculative else {})})
+        for index, objective in enumerate(objectives):
+            value = speculative.get(str(index))
+            if value and value.get("objective") == objective:
+                delta = append_section(sections, SectionRecord.model_validate(value))
+                sections.update(delta)
+                yield self._store_event(ctx, delta, section_event_metadata(sections, index, "elaborated", len(objectives)))
+
+        models = {}
+        branches = [
+            (f"ObjectiveProcessorAgent_{index}", self._elaborate(index, objective, overview, models, sections))
+            for index, objective in enumerate(objectives)
+            if get_section(sections, index) is None or self.review_sections
+        ]
+        async for event in merge_branches(ctx, branches, self.max_concurrency):
+            yield event
+            event_delta = event.actions.state_delta
+            for index, objective in enumerate(objectives):
+                if section_state_key(index) in event_delta:
+                    record = section_record_from_event(
+                        index, objective, event_delta[section_state_key(index)], event,
+                        model=models.get(index, self.model),
+                    )
+                    delta = append_section(sections, record)
+                    sections.update(delta)
+                    yield self._store_event(
+                        ctx, delta, section_event_metadata(sections, index, "elaborated", len(objectives))
+                    )
+                if section_review_state_key(index) in event_delta:
+                    delta = review_section(sections, index, event_delta[section_review_state_key(index)])
+                    sections.update(delta)
+                    yield self._store_event(
+                        ctx, delta, section_event_metadata(sections, index, "reviewed", len(objectives))
+                    )
+
+    def _elaborate(self, index, objective, overview, models, sections):
+        """Branch run: elaborate one objective, then optionally review it
+
+        A section already in `sections` is only reviewed. The model that
+        wrote each section is recorded in `models`.
+        """
+        async def run(branch_ctx):
+            record = get_section(sections, index)
+            markdown = record.markdown if record else ""
+            if not markdown:
+                async for event in self._write(branch_ctx, index, objective, overview, models):
+                    markdown = event.actions.state_delta.get(section_state_key(index), markdown)
+                    yield event
+
+            if self.review_sections and markdown:
+                async for event in self._review(branch_ctx, index, markdown, overview):
+                    yield event
+
+        return run
+
+    def _write(self, ctx, index, objective, overview, models):
+        if not self.model_routing:
+            models[index] = self.model
+            return create_objective_section_agent(index, objective, model=self.model).run_async(ctx)
+
+        def create_processor(model):
+            models[index] = model
+            return create_objective_section_agent(index, objective, model=model)
+
+        router = get_model_router()
+        model = router.route(
+            "section",
+            difficulty=overview.difficulty_level if overview else None,
+            budget=request_budget(ctx.session.state),
+        )
+        return run_with_escalation(
+            ctx, create_processor, model, section_state_key(index), is_valid=section_is_valid, router=router
+        )
+
+    def _review(self, ctx, index, markdown, overview):
+        if not self.model_routing:
+            return create_section_review_agent(index, markdown, model=self.review_model).run_async(ctx)
+
+        router = get_model_router()
+        model = router.route(
+            "review",
+            difficulty=overview.difficulty_level if overview else None,
+            budget=request_budget(ctx.session.state),
+        )
+        return run_with_escalation(
+            ctx,
+            lambda m: create_section_review_agent(index, markdown, model=m),
+            model,
+            section_review_state_key(index),
+            router=router,
+        )
+
+    def _store_event(self, ctx, delta, custom_metadata=None):
+        return Event(
+            author=self.name,
+            invocation_id=ctx.invocation_id,
+            branch=ctx.branch,
+            custom_metadata=custom_metadata,
+            actions=EventActions(state_delta=delta),
+        )
+
+
+def create_parallel_elaboration_agent(
+    max_concurrency=4, model="gemini-2.5-pro", review_sections=False, model_routing=False
+):
+    """Creates the stage that elaborates all learning objectives in parallel
+
+    Args:
+        max_concurrency: Maximum number of objectives elaborated at once
+        model: Model name or BaseLlm instance used by every processor
+        review_sections: Review each section as soon as it is elaborated
+            (for the streaming judge)
+        model_routing: Let the ModelRouter pick each section's and review's
+            model instead of using `model` throughout
+    """
+    return ParallelElaborationAgent(
+        name="ParallelElaborationAgent",
+        description="Elaborates every learning objective from the overview concurrently",
+        model=model,
+        max_concurrency=max_concurrency,
+        review_sections=review_sections,
+        model_routing=model_routing,
+    )
@@ -0,0 +1,111 @@
+"""
+Shared, cache-friendly prompt prefix for every stage after the overview.
+
+By default ADK sends each agent's own instruction as the system instruction,
+followed by the whole session history. The section, review and framing
+agents therefore started every call with a different instruction and
+re-sent the same source material and overview behind it, so no two calls
+shared a prefix. shared_prefix() rewrites their requests as:
+
+    system instruction: PREFIX_INSTRUCTION + the overview   (stable)
+    user:               the source material                 (stable)
+    user:               the agent's own instruction         (per call)
+
+The stable part is identical for every call in a run, which lets Gemini's
+implicit caching reuse it and lets PromptCache (see
+study_guide_agent.cache.prompt_cache) serve it from one explicit cache.
+Only the overview and the source are carried over from the history: stage
+agents have no tools, and the overview already distils the research.
+
+The source is only worth sending whole when PromptCache actually serves
+it. Otherwise (caching disabled or failing, a model without a genai client,
+a prefix below the minimum cache size) each call gets the passages most
+relevant to its task, packed into one ingestion chunk's token budget, so a
+long source is never re-sent in full on every call. Stages that judge the
+guide rather than write it (reviews, framing) get no source at all.
+"""
+
+from google.adk.models import BaseLlm, LLMRegistry
+from google.genai import types
+
+from .guide_state import GuideState, overview_view
+from ...cache.prompt_cache import get_prompt_cache
+from ...ingest.chunking import DEFAULT_CHUNK_TOKENS
+from ...tools.content_extraction import extract_relevant
+
+
+PREFIX_INSTRUCTION = """You are part of a team of educational specialists writing a study guide.
+The study guide overview and the source material are below. They are the
+same for every member of the team; your own task is given in the final
+message. Follow that task exactly and base your work on the source material.
+"""
+
+
+def prefix_instruction(overview) -> str:
+    """The stable system instruction: team instructions plus the overview"""
+    objectives = "\n".join(f"{i + 1}. {o}" for i, o in enumerate(overview.learning_objectives))
+    sections = "\n".join(f"- {s}" for s in overview.key_sections)
+    return (
+        PREFIX_INSTRUCTION
+        + "\nSTUDY GUIDE OVERVIEW\n"
+        + f"Topic: {overview.main_topic}\n"
+        + f"Difficulty: {overview.difficulty_level}\n\n"
+        + f"Key sections:\n{sections}\n\n"
+        + f"Learning objectives:\n{objectives}\n"
+    )
+
+
+def source_excerpt(source, task, token_budget=DEFAULT_CHUNK_TOKENS):
+    """The text of `source` most relevant to `task`, within `token_budget`
+
+    Sent in place of the whole source when the prefix is not cached.
+    """
+    text = "\n\n".join(part.text for part in source.parts if part.text)
+    return types.Content(role="user", parts=[types.Part(text=extract_relevant(text, task, token_budget))])
+
+
+def shared_prefix(model, overview=None, include_source=True):
+    """before_model_callback that moves a stage's request onto the shared prefix
+
+    The agent's instruction becomes the final user turn, and the system
+    instruction plus source material are served from the PromptCache when
+    one is available. When the cache does not apply, the source is cut to
+    the excerpt most relevant to the task (see source_excerpt). Requests
+    with tools, or made before there is an overview or a user message, are
+    left as they are.
+
+    Args:
+        model: The agent's model name or BaseLlm instance; the cache is
+            created through its genai client
+        overview: StudyGuideOverview to build the prefix from, instead of
+            the one in the "overview" state key (e.g. a speculative draft)
+        include_source: Whether the stage needs the source material at all;
+            when False the prefix is the system instruction alone
+    """
+    resolved = []
+
+    def llm():
+        # Resolved on first use, so models registered after the agent is
+        # built (e.g. offline stubs) are picked up
+        if not resolved:
+            resolved.append(model if isinstance(model, BaseLlm) else LLMRegistry.new_llm(model))
+        return resolved[0]
+
+    async def callback(callback_context, llm_request):
+        view = overview_view(overview) if overview else GuideState(callback_context.state).overview
+        source = callback_context.user_content
+        if view is None or source is None or not source.parts or llm_request.config.tools:
+            return None
+
+        task = str(llm_request.config.system_instruction or "")
+        llm_request.config.system_instruction = view.rendered(prefix_instruction)
+        prefix = [types.Content(role="user", parts=list(source.parts))] if include_source else []
+        llm_request.contents = prefix + [types.Content(role="user", parts=[types.Part(text=task)])]
+
+        cache = get_prompt_cache()
+        cached = cache is not None and await cache.apply(llm(), llm_request, prefix_count=len(prefix))
+        if prefix and not cached:
+            llm_request.contents[0] = source_excerpt(source, task)
+        return None
+
+    return callback
@@ -1,9 +1,98 @@
+import json
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Optional
+
 from pydantic import BaseModel
 
 
+MEMO_SIZE = 1024
+
+_memo = OrderedDict()
+_memo_lock = threading.Lock()
+
+
+def memoised(value: Any, build: Callable[[Any], Any]) -> Any:
+    """build(value), computed once per state value object
+
+    Within a run every reader gets the same object back from session state,
+    so parsing and rendering are memoised on the object's identity. The
+    memo keeps a reference to each value, so identities are never reused
+    while an entry is live. State values are replaced, never mutated in
+    place, so a hit is always current; a reloaded session hands back new
+    objects, which are parsed once more.
+    """
+    if value is None:
+        return build(value)
+    key = (id(value), build)
+    with _memo_lock:
+        entry = _memo.get(key)
+        if entry is not None and entry[0] is value:
+            _memo.move_to_end(key)
+            return entry[1]
+    result = build(value)
+    with _memo_lock:
+        _memo[key] = (value, result)
+        while len(_memo) > MEMO_SIZE:
+            _memo.popitem(last=False)
+    return result
+
+
 class StudyGuideOverview(BaseModel):
     """Structured overview of study material"""
     main_topic: str
     key_sections: list[str]
     learning_objectives: list[str]
     difficulty_level: str  # "beginner", "intermediate", or "advanced"
+
+
+def overview_from_state(value: Any) -> Optional[StudyGuideOverview]:
+    """Load the overview stored under the "overview" state key
+
+    OverviewAgent writes its structured output to state as a dict, but the
+    value may also arrive as a JSON string (e.g. from a persisted session)
+    or already as a StudyGuideOverview instance.
+
+    Parsed once per value object (see memoised).
+
+    Returns:
+        StudyGuideOverview, or None if the value is missing or malformed
+    """
+    if isinstance(value, StudyGuideOverview):
+        return value
+    return memoised(value, _parse_overview)
+
+
+def _parse_overview(value):
+    if value is None:
+        return None
+    try:
+        if isinstance(value, str):
+            value = json.loads(value)
+        return StudyGuideOverview.model_validate(value)
+    except (ValueError, TypeError):
+        return None
+
+
+class SectionTransitions(BaseModel):
+    """Short bridging sentences placed before each section after the first"""
+    transitions: list[str]
+
+
+class SectionReview(BaseModel):
+    """Judge verdict for one study guide section"""
+    verdict: str  # "approved" or "patched"
+    patch: str = ""  # Short correction or clarification appended to the section
+
+
+class GuideFraming(BaseModel):
+    """Judge-written text that frames the assembled study guide"""
+    introduction: str
+    study_tips: list[str]
+
+
+class PartialOutline(BaseModel):
+    """Outline extracted from one chunk of long source material"""
+    topics: list[str]
+    key_points: list[str]
+    candidate_objectives: list[str]
@@ -0,0 +1,181 @@
+import time
+from typing import Any, Mapping, Optional
+
+from pydantic import BaseModel
+
+from .schemas import memoised
+from ...events import SECTION_EVENT_KEY, SectionFinalized
+
+
+# The section store keeps one record dict per state key (see
+# section_record_key) and, under SECTIONS_KEY, the sorted list of stored
+# objective indices. Appending or reviewing a section therefore puts only
+# that record (and the short index list) in the event's state_delta, rather
+# than every section written so far.
+SECTIONS_KEY = "sections"
+
+# Sections written ahead of the final overview by the speculative stage,
+# as str(index) -> record dict for the final overview's objectives
+SPECULATIVE_SECTIONS_KEY = "speculative_sections"
+
+
+class SectionRecord(BaseModel):
+    """One elaborated learning objective, as kept in the section store"""
+    index: int
+    objective: str
+    markdown: str
+    model: Optional[str] = None
+    input_tokens: Optional[int] = None
+    output_tokens: Optional[int] = None
+    created_at: float
+    verdict: Optional[str] = None
+    patch: Optional[str] = None
+
+
+def section_record_from_event(index, objective, markdown, event, model=None):
+    """Build a SectionRecord from the processor event that produced `markdown`
+
+    Token counts, model version and timestamp are taken from the event's
+    LLM response metadata when present.
+    """
+    usage = getattr(event, "usage_metadata", None)
+    model_version = getattr(event, "model_version", None)
+    return SectionRecord(
+        index=index,
+        objective=objective,
+        markdown=(markdown or "").strip(),
+        model=model_version or (model if isinstance(model, str) else getattr(model, "model", None)),
+        input_tokens=getattr(usage, "prompt_token_count", None),
+        output_tokens=getattr(usage, "candidates_token_count", None),
+        created_at=getattr(event, "timestamp", None) or time.time(),
+    )
+
+
+def section_record_key(index: int) -> str:
+    """State key holding the stored record for objective `index` (0-based)"""
+    return f"{SECTIONS_KEY}.{index}"
+
+
+def section_indices(state: Mapping) -> list[int]:
+    """Objective indices in the section store, in order"""
+    return list(state.get(SECTIONS_KEY) or [])
+
+
+def _parse_record(value):
+    return SectionRecord.model_validate(value) if value else None
+
+
+def get_section(state: Mapping, index: int) -> Optional[SectionRecord]:
+    """The stored record for objective `index`, or None (parsed once per value)"""
+    return memoised(state.get(section_record_key(index)), _parse_record)
+
+
+def append_section(state: Mapping, record: SectionRecord) -> dict:
+    """State delta that adds `record` to the section store of `state`
+
+    A record for the same index replaces the previous one. Records are
+    stored as JSON-serialisable dicts so they survive persisted sessions.
+    """
+    return {
+        SECTIONS_KEY: sorted(set(section_indices(state)) | {record.index}),
+        section_record_key(record.index): record.model_dump(),
+    }
+
+
+def review_section(state: Mapping, index: int, review) -> dict:
+    """State delta that attaches a judge review to section `index`
+
+    Args:
+        state: State (or mapping) holding the section store
+        index: Objective index of the reviewed section
+        review: SectionReview, or its dict form as written to state
+    """
+    record = get_section(state, index)
+    if record is None:
+        return {}
+    review = review if isinstance(review, dict) else review.model_dump()
+    reviewed = record.model_copy(update={"verdict": review.get("verdict"), "patch": review.get("patch") or None})
+    return append_section(state, reviewed)
+
+
+def section_store_snapshot(state: Mapping) -> dict:
+    """Plain-dict copy of the section store in `state`
+
+    Stages that write several sections keep the snapshot current with each
+    delta they yield (snapshot.update(delta)), so they never depend on when
+    the session applies it.
+    """
+    indices = section_indices(state)
+    snapshot = {SECTIONS_KEY: indices}
+    snapshot.update({section_record_key(i): state.get(section_record_key(i)) for i in indices})
+    return snapshot
+
+
+def clear_sections() -> dict:
+    """State delta that empties the section store"""
+    return {SECTIONS_KEY: []}
+
+
+def ordered_sections(state: Any) -> list[SectionRecord]:
+    """Return the records in the section store ordered by objective index"""
+    if state is None:
+        return []
+    records = (get_section(state, index) for index in section_indices(state))
+    return [record for record in records if record is not None]
+
+
+def concatenate_sections(state: Any) -> str:
+    """Join every stored section's markdown in objective order"""
+    return "\n\n".join(
+        record.markdown for record in ordered_sections(state) if record.markdown
+    )
+
+
+def _split_heading(markdown):
+    """Split a section into its leading heading text (if any) and body"""
+    lines = markdown.strip().splitlines()
+    if lines and lines[0].startswith("#"):
+        return lines[0].lstrip("#").strip(), "\n".join(lines[1:]).strip()
+    return None, markdown.strip()
+
+
+def section_title(record: SectionRecord) -> str:
+    """Title of a stored section: its leading heading, else the objective"""
+    title, _ = _split_heading(record.markdown)
+    return title or record.objective
+
+
+def section_body(record: SectionRecord) -> str:
+    """Markdown of a stored section without its leading heading"""
+    _, body = _split_heading(record.markdown)
+    return body
+
+
+def render_section(record: SectionRecord, title: Optional[str] = None) -> str:
+    """Markdown of a section as it appears in the guide, with any judge patch"""
+    lines = [f"## {title or section_title(record)}", ""]
+    body = section_body(record)
+    if body:
+        lines.append(body)
+    if record.patch:
+        lines += ["", f"> **Note:** {record.patch.strip()}"]
+    return "\n".join(lines)
+
+
+def section_event_metadata(state: Mapping, index: int, stage: str, total: Optional[int] = None) -> dict:
+    """custom_metadata announcing that section `index` of the store is final
+
+    See study_guide_agent.events for the client side.
+    """
+    record = get_section(state, index)
+    section = SectionFinalized(
+        index=record.index,
+        total=total,
+        title=section_title(record),
+        objective=record.objective,
+        markdown=render_section(record),
+        stage=stage,
+        verdict=record.verdict,
+        patch=record.patch,
+    )
+    return {SECTION_EVENT_KEY: section.model_dump()}
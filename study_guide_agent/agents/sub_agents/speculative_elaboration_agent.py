@@ -0,0 +1,288 @@
+import asyncio
+import re
+from typing import AsyncGenerator, Union
+
+from google.adk.agents import Agent, BaseAgent
+from google.adk.agents.invocation_context import InvocationContext
+from google.adk.events import Event, EventActions
+from google.adk.models import BaseLlm
+
+from .concurrency import branch_context
+from .map_reduce_overview_agent import _user_text, replace_user_turn
+from .model_router import get_model_router, request_budget, run_with_escalation, section_is_valid
+from .objective_processor_agent import create_objective_section_agent, section_state_key
+from .overview_agent import INSTRUCTION_OUTPUT
+from .schemas import StudyGuideOverview, overview_from_state
+from .section_store import SPECULATIVE_SECTIONS_KEY, section_record_from_event
+
+
+SPECULATION_STATE_KEY = "speculation"
+
+DRAFT_STATE_KEY = "overview_draft"
+
+# Characters of source material sent to the draft model (about 32k tokens)
+DRAFT_PREVIEW_CHARS = 32000 * 4
+
+DEFAULT_MATCH_THRESHOLD = 0.6
+
+DRAFT_INSTRUCTION = """You are an educational overview specialist writing a quick first draft.
+
+**Your Task:**
+Skim the provided study material and draft a high-level overview. Do not
+research; a fuller overview is written separately and your draft is only
+used to start work early.
+""" + INSTRUCTION_OUTPUT
+
+_WORD = re.compile(r"\w+")
+
+
+def objective_similarity(a, b):
+    """Jaccard similarity of the lower-cased word sets of two objectives"""
+    words_a, words_b = set(_WORD.findall(a.lower())), set(_WORD.findall(b.lower()))
+    if not words_a or not words_b:
+        return 0.0
+    return len(words_a & words_b) / len(words_a | words_b)
+
+
+def match_objectives(drafted, final, threshold=DEFAULT_MATCH_THRESHOLD):
+    """Pair final objectives with the most similar drafted ones
+
+    Returns:
+        Mapping of final index -> drafted index; each drafted objective is
+        used at most once and only pairs at or above `threshold` are kept.
+        Ties go to the earlier final, then drafted, objective.
+    """
+    pairs = sorted(
+        (-objective_similarity(d, f), final_index, draft_index)
+        for final_index, f in enumerate(final)
+        for draft_index, d in enumerate(drafted)
+    )
+    matches, used = {}, set()
+    for negated_similarity, final_index, draft_index in pairs:
+        if -negated_similarity < threshold:
+            break
+        if final_index not in matches and draft_index not in used:
+            matches[final_index] = draft_index
+            used.add(draft_index)
+    return matches
+
+
+def _usage(event):
+    usage = getattr(event, "usage_metadata", None)
+    return (
+        (getattr(usage, "prompt_token_count", None) or 0),
+        (getattr(usage, "candidates_token_count", None) or 0),
+    )
+
+
+def create_overview_draft_agent(preview, model="gemini-2.5-flash-lite"):
+    """Creates the agent that drafts the overview for speculative elaboration
+
+    It has no tools and only sees the opening of the material, so its
+    learning objectives arrive well before the OverviewAgent's.
+    """
+    return Agent(
+        name="OverviewDraftAgent",
+        model=model,
+        description="Drafts a quick overview so sections can be elaborated speculatively",
+        instruction=DRAFT_INSTRUCTION,
+        include_contents="none",
+        before_model_callback=replace_user_turn(preview),
+        output_schema=StudyGuideOverview,
+        output_key=DRAFT_STATE_KEY,
+    )
+
+
+class _Speculation:
+    """Background draft and speculative sections for one invocation
+
+    Speculative events are not yielded, so nothing they write reaches the
+    session unless a section is kept.
+    """
+
+    def __init__(self, agent, ctx):
+        self.agent = agent
+        self.ctx = ctx
+        self.semaphore = asyncio.Semaphore(max(1, agent.max_concurrency))
+        self.draft = None
+        self.draft_tokens = (0, 0)
+        self.sections = {}
+        self.started = set()
+        self.tasks = {}
+        self.task = asyncio.create_task(self._run())
+
+    async def _run(self):
+        ctx = branch_context(self.ctx, "OverviewDraftAgent")
+        budget = request_budget(ctx.session.state)
+        model = self.agent.draft_model
+        if self.agent.model_routing:
+            model = get_model_router().route("overview_draft", budget=budget)
+        preview = _user_text(ctx)[:DRAFT_PREVIEW_CHARS]
+
+        draft, tokens = None, (0, 0)
+        async for event in create_overview_draft_agent(preview, model).run_async(ctx):
+            draft = event.actions.state_delta.get(DRAFT_STATE_KEY, draft)
+            tokens = tuple(a + b for a, b in zip(tokens, _usage(event)))
+        self.draft_tokens = tokens
+        self.draft = overview_from_state(draft)
+        if not self.draft:
+            return
+
+        for index, objective in enumerate(self.draft.learning_objectives):
+            self.tasks[index] = asyncio.create_task(self._section(index, objective))
+        await asyncio.gather(*self.tasks.values(), return_exceptions=True)
+
+    async def _section(self, index, objective):
+        async with self.semaphore:
+            self.started.add(index)
+            ctx = branch_context(self.ctx, f"SpeculativeSection_{index}")
+
+            def create_processor(model):
+                return create_objective_section_agent(index, objective, model=model, overview=self.draft)
+
+            if self.agent.model_routing:
+                router = get_model_router()
+                model = router.route(
+                    "section", difficulty=self.draft.difficulty_level, budget=request_budget(ctx.session.state)
+                )
+                events = run_with_escalation(
+                    ctx, create_processor, model, section_state_key(index), is_valid=section_is_valid, router=router
+                )
+            else:
+                model = self.agent.section_model
+                events = create_processor(model).run_async(ctx)
+
+            markdown, last, tokens = None, None, (0, 0)
+            async for event in events:
+                if section_state_key(index) in event.actions.state_delta:
+                    markdown, last = event.actions.state_delta[section_state_key(index)], event
+                tokens = tuple(a + b for a, b in zip(tokens, _usage(event)))
+            self.sections[index] = (markdown, last, tokens, model)
+
+    async def settle(self, final):
+        """Keep the speculative sections that match the final overview
+
+        Sections for matched objectives that are already being written are
+        awaited; everything else is cancelled.
+
+        Returns:
+            (speculative_sections, metrics) for the state delta
+        """
+        objectives = final.learning_objectives if final else []
+        if self.draft is None:
+            # The final overview beat the draft (e.g. an overview cache hit)
+            self.task.cancel()
+            await asyncio.gather(self.task, return_exceptions=True)
+            return {}, self._metrics(objectives, {}, cancelled=0)
+
+        matches = match_objectives(self.draft.learning_objectives, objectives, self.agent.match_threshold)
+        wanted = {draft_index for draft_index in matches.values() if draft_index in self.started}
+        cancelled = 0
+        for draft_index, task in self.tasks.items():
+            if draft_index not in wanted and not task.done():
+                task.cancel()
+                cancelled += 1
+        await asyncio.gather(*(self.tasks[i] for i in wanted), return_exceptions=True)
+        self.task.cancel()
+        await asyncio.gather(self.task, return_exceptions=True)
+
+        kept = {}
+        for final_index, draft_index in matches.items():
+            markdown, event, _, model = self.sections.get(draft_index, (None,) * 4)
+            if section_is_valid(markdown):
+                record = section_record_from_event(final_index, objectives[final_index], markdown, event, model=model)
+                kept[str(final_index)] = record.model_dump()
+        return kept, self._metrics(objectives, {int(k): matches[int(k)] for k in kept}, cancelled)
+
+    def _metrics(self, objectives, kept, cancelled):
+        kept_drafts = set(kept.values())
+        wasted = [tokens for i, (_, _, tokens, _) in self.sections.items() if i not in kept_drafts]
+        return {
+            "draft_objectives": len(self.draft.learning_objectives) if self.draft else 0,
+            "final_objectives": len(objectives),
+            "kept": len(kept),
+            "discarded": len(wasted),
+            "cancelled": cancelled,
+            "hit_rate": round(len(kept) / len(objectives), 4) if objectives else 0.0,
+            "draft_input_tokens": self.draft_tokens[0],
+            "draft_output_tokens": self.draft_tokens[1],
+            "wasted_input_tokens": sum(tokens[0] for tokens in wasted),
+            "wasted_output_tokens": sum(tokens[1] for tokens in wasted),
+        }
+
+
+class SpeculativeElaborationAgent(BaseAgent):
+    """Runs the overview and elaboration stages with speculative overlap
+
+    Its sub-agents are the overview stage and the parallel elaboration
+    stage. While the overview stage runs (including any Firecrawl research),
+    an OverviewDraftAgent drafts the learning objectives on a cheap model
+    from the opening of the material, and a section is speculatively
+    elaborated for each drafted objective, at most `max_concurrency` at a
+    time.
+
+    Once the final overview is written, each final objective is paired with
+    the most similar drafted one (word-set Jaccard similarity of at least
+    `match_threshold`). Sections for paired objectives are kept and handed
+    to the elaboration stage under "speculative_sections", so only the
+    remaining objectives are elaborated there; unpaired speculative work is
+    cancelled or discarded.
+
+    Hit rate and draft and wasted token counts are written to the
+    "speculation" state key after each run.
+    """
+
+    draft_model: Union[str, BaseLlm] = "gemini-2.5-flash-lite"
+    section_model: Union[str, BaseLlm] = "gemini-2.5-pro"
+    max_concurrency: int = 4
+    match_threshold: float = DEFAULT_MATCH_THRESHOLD
+    model_routing: bool = False
+
+    async def _run_async_impl(
+        self, ctx: InvocationContext
+    ) -> AsyncGenerator[Event, None]:
+        overview_stage, elaboration_stage = self.sub_agents
+        speculation = _Speculation(self, ctx)
+        try:
+            async for event in overview_stage.run_async(ctx):
+                yield event
+        except BaseException:
+            speculation.task.cancel()
+            raise
+
+        final = overview_from_state(ctx.session.state.get("overview"))
+        kept, metrics = await speculation.settle(final)
+        yield Event(
+            author=self.name,
+            invocation_id=ctx.invocation_id,
+            branch=ctx.branch,
+            actions=EventActions(state_delta={SPECULATIVE_SECTIONS_KEY: kept, SPECULATION_STATE_KEY: metrics}),
+        )
+
+        async for event in elaboration_stage.run_async(ctx):
+            yield event
+
+
+def create_speculative_elaboration_agent(
+    overview_stage, elaboration_stage, max_concurrency=4, match_threshold=DEFAULT_MATCH_THRESHOLD, model_routing=False
+):
+    """Creates the stage that elaborates drafted objectives while the overview runs
+
+    Args:
+        overview_stage: Agent that writes the final "overview"
+        elaboration_stage: ParallelElaborationAgent for the final objectives
+        max_concurrency: Maximum number of speculative sections written at once
+        match_threshold: Minimum similarity between a drafted and a final
+            objective for the speculative section to be kept
+        model_routing: Let the ModelRouter pick the draft and speculative
+            section models
+    """
+    return SpeculativeElaborationAgent(
+        name="SpeculativeElaborationAgent",
+        description="Creates the overview while speculatively elaborating drafted objectives",
+        sub_agents=[overview_stage, elaboration_stage],
+        section_model=elaboration_stage.model,
+        max_concurrency=max_concurrency,
+        match_threshold=match_threshold,
+        model_routing=model_routing,
+    )
@@ -0,0 +1,39 @@
+from google.adk.agents import Agent
+
+from .prompt_prefix import shared_prefix
+from .schemas import SectionTransitions
+from .section_store import ordered_sections, section_title
+
+
+def create_transitions_agent(model="gemini-2.5-flash-lite"):
+    """Creates the optional agent that writes transitions between sections
+
+    Its task lists only the section headings, never their text, and the
+    output is a short list of bridging sentences, so its cost does not grow
+    with the length of the guide. Like every stage after the overview, the
+    request starts with the shared prefix (overview and source material,
+    see prompt_prefix), which is served from the prompt cache.
+    AssemblerAgent places the transitions between sections.
+    """
+    def instruction(context):
+        titles = [
+            section_title(record) for record in ordered_sections(context.state)
+        ]
+        numbered = "\n".join(f"{i}. {title}" for i, title in enumerate(titles, 1))
+        return (
+            "You are writing transitions for a study guide with these sections, in order:\n"
+            f"{numbered}\n\n"
+            f"Write exactly {max(len(titles) - 1, 0)} transitions, one for each section after the first. "
+            "Each transition is one or two sentences that connect the previous section to the next one.\n"
+            "Do not repeat section content and do not use headers."
+        )
+
+    return Agent(
+        name="TransitionsAgent",
+        model=model,
+        description="Writes short transitions between study guide sections",
+        instruction=instruction,
+        before_model_callback=shared_prefix(model),
+        output_schema=SectionTransitions,
+        output_key="section_transitions",
+    )
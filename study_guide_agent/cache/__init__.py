@@ -0,0 +1,29 @@
+# Caches in front of the study guide pipeline and its stages
+# Exports are imported on first access (see study_guide_agent.lazy)
+from ..lazy import lazy_exports
+
+__all__ = [
+    "GuideCache",
+    "create_guide_cache_callbacks",
+    "get_guide_cache",
+    "set_guide_cache",
+    "OverviewCache",
+    "get_overview_cache",
+    "set_overview_cache",
+    "PromptCache",
+    "get_prompt_cache",
+    "set_prompt_cache",
+]
+
+__getattr__, __dir__ = lazy_exports(__name__, {
+    "GuideCache": ".guide_cache",
+    "create_guide_cache_callbacks": ".guide_cache",
+    "get_guide_cache": ".guide_cache",
+    "set_guide_cache": ".guide_cache",
+    "OverviewCache": ".overview_cache",
+    "get_overview_cache": ".overview_cache",
+    "set_overview_cache": ".overview_cache",
+    "PromptCache": ".prompt_cache",
+    "get_prompt_cache": ".prompt_cache",
+    "set_prompt_cache": ".prompt_cache",
+})
@@ -0,0 +1,278 @@
+"""
+Whole-guide response cache keyed on the normalised input material.
+
+Requests are fingerprinted twice: a SHA-256 of the normalised text for exact
+repeats, and a MinHash signature of its word shingles, indexed with
+locality-sensitive hashing (LSH) bands, for near-duplicates such as the same
+handout pasted with different whitespace or a changed heading. A hit returns
+the stored final guide, so the pipeline is skipped entirely.
+
+Guides are stored by SqliteCache, zlib-compressed with a TTL and size-bounded
+LRU eviction, like the Firecrawl cache; the MinHash signatures and LSH
+buckets sit in extra tables that are deleted along with their entry.
+
+Configuration (environment variables):
+    GUIDE_CACHE_PATH: SQLite file (default: ~/.cache/study_guide_agent/guides.sqlite3)
+    GUIDE_CACHE_TTL: Entry lifetime in seconds (default: 86400, one day)
+    GUIDE_CACHE_MAX_BYTES: Maximum total compressed size (default: 67108864)
+    GUIDE_CACHE_SIMILARITY: Minimum estimated Jaccard similarity for a
+        near-duplicate hit (default: 0.9); set to 1 for exact matches only
+    GUIDE_CACHE_DISABLED: Set to "1" to bypass the cache
+"""
+
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+import zlib
+from pathlib import Path
+
+import numpy as np
+from google.genai import types
+
+from .sqlite_cache import SqliteCache
+
+
+DEFAULT_CACHE_PATH = Path.home() / ".cache" / "study_guide_agent" / "guides.sqlite3"
+DEFAULT_TTL_SECONDS = 24 * 60 * 60
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+DEFAULT_SIMILARITY = 0.9
+
+NUM_PERMUTATIONS = 128
+LSH_BANDS = 16  # 8 rows per band: candidates from a Jaccard similarity of about 0.7
+SHINGLE_WORDS = 5
+
+_MERSENNE_PRIME = np.uint64((1 << 61) - 1)
+_MAX_HASH = np.uint64((1 << 32) - 1)
+_rng = np.random.RandomState(2024)
+_PERM_A = _rng.randint(1, 1 << 31, size=NUM_PERMUTATIONS).astype(np.uint64)
+_PERM_B = _rng.randint(0, 1 << 31, size=NUM_PERMUTATIONS).astype(np.uint64)
+
+_WORD_RE = re.compile(r"\w+")
+
+GUIDE_CACHE_STATE_KEY = "guide_cache"
+
+
+def normalize_material(text: str) -> str:
+    """Lower-cased words of `text`, ignoring punctuation and whitespace"""
+    return " ".join(_WORD_RE.findall(text.lower()))
+
+
+def material_fingerprint(normalized: str, variant: str = "") -> str:
+    """Exact-match key: SHA-256 of the pipeline variant and normalised text"""
+    return hashlib.sha256(f"{variant}\0{normalized}".encode("utf-8")).hexdigest()
+
+
+def minhash_signature(normalized: str) -> np.ndarray:
+    """MinHash signature of the word shingles of normalised text"""
+    words = normalized.split()
+    shingles = {
+        " ".join(words[i:i + SHINGLE_WORDS])
+        for i in range(max(1, len(words) - SHINGLE_WORDS + 1))
+    }
+    hashes = np.fromiter(
+        (zlib.crc32(s.encode("utf-8")) for s in shingles), dtype=np.uint64, count=len(shingles)
+    )
+    signature = np.full(NUM_PERMUTATIONS, _MAX_HASH, dtype=np.uint64)
+    # Blocks keep the (shingles x permutations) matrix small for long material
+    for start in range(0, len(hashes), 4096):
+        block = hashes[start:start + 4096, None]
+        permuted = ((block * _PERM_A + _PERM_B) % _MERSENNE_PRIME) & _MAX_HASH
+        signature = np.minimum(signature, permuted.min(axis=0))
+    return signature
+
+
+def lsh_buckets(signature: np.ndarray) -> list[int]:
+    """One bucket id per LSH band of a signature"""
+    rows = len(signature) // LSH_BANDS
+    return [
+        int.from_bytes(hashlib.blake2b(band.tobytes(), digest_size=7).digest(), "big")
+        for band in signature.reshape(LSH_BANDS, rows)
+    ]
+
+
+class GuideCache(SqliteCache):
+    """Cache of final guides with exact and near-duplicate lookup
+
+    Safe to share between threads. Entries are scoped by a `variant` string
+    describing the pipeline configuration, so guides built with different
+    options never answer for each other. Storage, TTL and eviction are
+    SqliteCache's; each entry's MinHash signature and LSH buckets live in
+    tables that are cleaned up with it.
+    """
+
+    EXTRA_SCHEMA = (
+        "CREATE TABLE IF NOT EXISTS guide_signatures ("
+        " key TEXT PRIMARY KEY REFERENCES entries (key) ON DELETE CASCADE,"
+        " variant TEXT NOT NULL,"
+        " signature BLOB NOT NULL)",
+        "CREATE TABLE IF NOT EXISTS guide_lsh ("
+        " band INTEGER NOT NULL,"
+        " bucket INTEGER NOT NULL,"
+        " key TEXT NOT NULL REFERENCES entries (key) ON DELETE CASCADE)",
+        "CREATE INDEX IF NOT EXISTS guide_lsh_bucket ON guide_lsh (band, bucket)",
+        "CREATE INDEX IF NOT EXISTS guide_lsh_key ON guide_lsh (key)",
+    )
+
+    def __init__(
+        self,
+        path=DEFAULT_CACHE_PATH,
+        ttl_seconds=DEFAULT_TTL_SECONDS,
+        max_bytes=DEFAULT_MAX_BYTES,
+        similarity=DEFAULT_SIMILARITY,
+    ):
+        super().__init__(path, ttl_seconds, max_bytes)
+        self.similarity = similarity
+        self.exact_hits = 0
+        self.near_hits = 0
+
+    def get(self, material, variant=""):
+        """Look up the guide for `material`
+
+        Returns:
+            (guide, similarity) on a hit, where similarity is 1.0 for an exact
+            match and the estimated Jaccard similarity for a near-duplicate;
+            None on a miss
+        """
+        normalized = normalize_material(material)
+        key = material_fingerprint(normalized, variant)
+        now = time.time()
+        with self._lock:
+            blob = self._read(key, now)
+            if blob is not None:
+                self.exact_hits += 1
+                return json.loads(zlib.decompress(blob)), 1.0
+
+        if self.similarity >= 1:
+            with self._lock:
+                self.misses += 1
+            return None
+
+        signature = minhash_signature(normalized)
+        with self._lock:
+            best_key, best_similarity, best_guide = None, 0.0, None
+            for key, guide, stored in self._candidates(signature, variant, now):
+                similarity = float(np.mean(np.frombuffer(stored, dtype=np.uint64) == signature))
+                if similarity >= self.similarity and similarity > best_similarity:
+                    best_key, best_similarity, best_guide = key, similarity, guide
+            if best_key is None:
+                self.misses += 1
+                return None
+            self._touch(best_key, now)
+            self.near_hits += 1
+        return json.loads(zlib.decompress(best_guide)), best_similarity
+
+    def put(self, material, guide, variant=""):
+        """Store the final guide for `material`, evicting LRU entries if over size"""
+        normalized = normalize_material(material)
+        key = material_fingerprint(normalized, variant)
+        signature = minhash_signature(normalized)
+
+        def index(conn):
+            conn.execute(
+                "INSERT INTO guide_signatures (key, variant, signature) VALUES (?, ?, ?)",
+                (key, variant, signature.tobytes()),
+            )
+            conn.executemany(
+                "INSERT INTO guide_lsh (band, bucket, key) VALUES (?, ?, ?)",
+                [(band, bucket, key) for band, bucket in enumerate(lsh_buckets(signature))],
+            )
+
+        self._write(key, guide, index)
+
+    def stats(self):
+        """Return hit/miss/eviction counters and current size"""
+        stats = super().stats()
+        del stats["hits"]
+        return {"exact_hits": self.exact_hits, "near_hits": self.near_hits, **stats}
+
+    def _candidates(self, signature, variant, now):
+        # Caller holds the lock
+        clauses = " OR ".join("(band = ? AND bucket = ?)" for _ in range(LSH_BANDS))
+        params = [value for pair in enumerate(lsh_buckets(signature)) for value in pair]
+        return self._conn.execute(
+            "SELECT entries.key, entries.value, guide_signatures.signature"
+            " FROM entries JOIN guide_signatures ON guide_signatures.key = entries.key"
+            " WHERE guide_signatures.variant = ? AND entries.created_at >= ?"
+            f" AND entries.key IN (SELECT key FROM guide_lsh WHERE {clauses})",
+            [variant, now - self.ttl_seconds, *params],
+        ).fetchall()
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_guide_cache():
+    """Return the process-wide GuideCache, or None if disabled
+
+    Created lazily from the GUIDE_CACHE_* environment variables.
+    """
+    global _cache
+    if os.getenv("GUIDE_CACHE_DISABLED") == "1":
+        return None
+    with _cache_lock:
+        if _cache is None:
+            _cache = GuideCache(
+                path=os.getenv("GUIDE_CACHE_PATH", DEFAULT_CACHE_PATH),
+                ttl_seconds=float(os.getenv("GUIDE_CACHE_TTL", DEFAULT_TTL_SECONDS)),
+                max_bytes=int(os.getenv("GUIDE_CACHE_MAX_BYTES", DEFAULT_MAX_BYTES)),
+                similarity=float(os.getenv("GUIDE_CACHE_SIMILARITY", DEFAULT_SIMILARITY)),
+            )
+    return _cache
+
+
+def set_guide_cache(cache):
+    """Replace the process-wide GuideCache (e.g. with an in-memory one)"""
+    global _cache
+    with _cache_lock:
+        _cache = cache
+
+
+def _user_text(callback_context):
+    content = callback_context.user_content
+    if not content or not content.parts:
+        return ""
+    return "\n".join(part.text for part in content.parts if part.text)
+
+
+def create_guide_cache_callbacks(variant=""):
+    """Callbacks that put the guide cache in front of the root agent
+
+    Args:
+        variant: Description of the pipeline configuration; guides are only
+            reused between pipelines with the same variant
+
+    Returns:
+        (before_agent_callback, after_agent_callback). On a hit the before
+        callback writes the stored guide to "final_guide" and returns it, so
+        ADK skips the whole pipeline. The after callback stores the
+        "final_guide" of every completed run.
+    """
+    def serve_cached_guide(callback_context):
+        cache = get_guide_cache()
+        material = _user_text(callback_context)
+        if cache is None or not material.strip():
+            return None
+
+        hit = cache.get(material, variant)
+        if hit is None:
+            callback_context.state[GUIDE_CACHE_STATE_KEY] = {"hit": False}
+            return None
+
+        guide, similarity = hit
+        callback_context.state["final_guide"] = guide
+        callback_context.state[GUIDE_CACHE_STATE_KEY] = {"hit": True, "similarity": round(similarity, 3)}
+        return types.Content(role="model", parts=[types.Part(text=guide)])
+
+    def store_guide(callback_context):
+        cache = get_guide_cache()
+        material = _user_text(callback_context)
+        guide = callback_context.state.get("final_guide")
+        if cache is not None and material.strip() and guide:
+            cache.put(material, guide, variant)
+        return None
+
+    return serve_cached_guide, store_guide
@@ -0,0 +1,93 @@
+"""
+Memoised StudyGuideOverview results for the overview stage.
+
+The overview stage (gemini-2.5-pro plus Firecrawl research) is the most
+expensive single call in the pipeline, and its output only depends on the
+source material, the models and the instructions. Overviews are stored as
+StudyGuideOverview dicts keyed on all three, so regenerating a guide for the
+same material skips straight to elaboration, while any prompt or model change
+misses the old entries.
+
+Configuration (environment variables):
+    OVERVIEW_CACHE_PATH: SQLite file (default: ~/.cache/study_guide_agent/overviews.sqlite3)
+    OVERVIEW_CACHE_TTL: Entry lifetime in seconds (default: 604800, one week)
+    OVERVIEW_CACHE_MAX_BYTES: Maximum total compressed size (default: 16777216)
+    OVERVIEW_CACHE_DISABLED: Set to "1" to bypass the cache
+"""
+
+import hashlib
+import json
+import os
+import threading
+from pathlib import Path
+
+from .sqlite_cache import SqliteCache
+
+
+DEFAULT_CACHE_PATH = Path.home() / ".cache" / "study_guide_agent" / "overviews.sqlite3"
+DEFAULT_TTL_SECONDS = 7 * 24 * 60 * 60
+DEFAULT_MAX_BYTES = 16 * 1024 * 1024
+
+
+def instruction_version(*parts) -> str:
+    """Short hash of everything that shapes the overview besides the input
+
+    Pass the instructions, output schema and any settings such as chunk size;
+    editing any of them changes the version, so stale overviews are never
+    served after a prompt change.
+    """
+    digest = hashlib.sha256()
+    for part in parts:
+        digest.update(str(part).encode("utf-8"))
+        digest.update(b"\0")
+    return digest.hexdigest()[:16]
+
+
+def overview_cache_key(material: str, models, version: str) -> str:
+    """SHA-256 of the material's content hash, model names and instruction version"""
+    canonical = json.dumps(
+        {
+            "content": hashlib.sha256(material.strip().encode("utf-8")).hexdigest(),
+            "models": list(models),
+            "version": version,
+        },
+        sort_keys=True,
+        separators=(",", ":"),
+    )
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+class OverviewCache(SqliteCache):
+    """Overview cache with TTL and size-based LRU eviction"""
+
+    def __init__(self, path=DEFAULT_CACHE_PATH, ttl_seconds=DEFAULT_TTL_SECONDS, max_bytes=DEFAULT_MAX_BYTES):
+        super().__init__(path, ttl_seconds, max_bytes)
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_overview_cache():
+    """Return the process-wide OverviewCache, or None if disabled
+
+    Created lazily from the OVERVIEW_CACHE_* environment variables.
+    """
+    global _cache
+    if os.getenv("OVERVIEW_CACHE_DISABLED") == "1":
+        return None
+    with _cache_lock:
+        if _cache is None:
+            _cache = OverviewCache(
+                path=os.getenv("OVERVIEW_CACHE_PATH", DEFAULT_CACHE_PATH),
+                ttl_seconds=float(os.getenv("OVERVIEW_CACHE_TTL", DEFAULT_TTL_SECONDS)),
+                max_bytes=int(os.getenv("OVERVIEW_CACHE_MAX_BYTES", DEFAULT_MAX_BYTES)),
+            )
+    return _cache
+
+
+def set_overview_cache(cache):
+    """Replace the process-wide OverviewCache (e.g. with an in-memory one)"""
+    global _cache
+    with _cache_lock:
+        _cache = cache
@@ -0,0 +1,218 @@
+"""
+Explicit Gemini context caches for the prompt prefix shared by pipeline stages.
+
+After the overview stage, every section and transitions call starts with
+the same prefix: static instructions, the overview and the source material
+(see agents/sub_agents/prompt_prefix.py). PromptCache stores that prefix
+once per run as a CachedContent and points each call at it, so the prefix
+is processed (and billed at the full input rate) once instead of on every
+call.
+
+Entries are keyed on a fingerprint of the model, system instruction and
+cached contents, so any change to the prefix (another overview, other
+source material, an edited instruction) misses the old cache and creates a
+new one; old caches simply expire. Prefixes below the model's minimum
+cache size, and models without a genai client, are sent uncached.
+
+Configuration (environment variables):
+    PROMPT_CACHE_TTL: Cache lifetime in seconds (default: 900)
+    PROMPT_CACHE_MIN_TOKENS: Smallest prefix worth caching (default: 2048,
+        Gemini 2.5's minimum)
+    PROMPT_CACHE_DISABLED: Set to "1" to send every prefix uncached
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from collections import Counter, OrderedDict
+
+from google.genai import types
+
+from ..tools.content_extraction import estimate_tokens
+
+
+DEFAULT_TTL_SECONDS = 15 * 60
+DEFAULT_MIN_TOKENS = 2048
+# A cache this close to expiry is replaced rather than used
+EXPIRY_MARGIN_SECONDS = 60
+# How long a prefix whose cache could not be created is sent uncached
+FAILURE_BACKOFF_SECONDS = 60
+# Cache handles kept at most; the oldest are dropped first
+MAX_ENTRIES = 256
+
+logger = logging.getLogger(__name__)
+
+
+def prefix_fingerprint(model: str, system_instruction, contents) -> str:
+    """SHA-256 of everything stored in the cache for a request prefix"""
+    canonical = json.dumps(
+        {
+            "model": model,
+            "system_instruction": str(system_instruction or ""),
+            "contents": [content.model_dump(mode="json", exclude_none=True) for content in contents],
+        },
+        sort_keys=True,
+        separators=(",", ":"),
+        ensure_ascii=False,
+        default=str,
+    )
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+def prefix_tokens(system_instruction, contents) -> int:
+    """Estimated tokens of a request prefix (text parts only)"""
+    text = str(system_instruction or "") + "".join(
+        part.text or "" for content in contents for part in content.parts or []
+    )
+    return estimate_tokens(text)
+
+
+class PromptCache:
+    """Process-wide CachedContent handles keyed on prefix fingerprints
+
+    Args:
+        ttl_seconds: Lifetime of each cache
+        min_tokens: Prefixes with fewer (estimated) tokens are not cached
+        max_entries: Cache handles kept; expired handles are dropped, and
+            the oldest once there are more
+    """
+
+    def __init__(self, ttl_seconds=DEFAULT_TTL_SECONDS, min_tokens=DEFAULT_MIN_TOKENS, max_entries=MAX_ENTRIES):
+        self.ttl_seconds = ttl_seconds
+        self.min_tokens = min_tokens
+        self.max_entries = max_entries
+        self.counts = Counter()
+        self._entries = OrderedDict()
+        self._pending = {}
+        self._lock = threading.Lock()
+
+    async def apply(self, llm, llm_request, prefix_count: int) -> bool:
+        """Serve the system instruction and first `prefix_count` contents from a cache
+
+        Creates the cache on the first call with a new prefix; concurrent
+        calls with the same prefix wait for that one creation. On success
+        the request is rewritten to reference the cache and send only the
+        remaining contents.
+
+        Args:
+            llm: The BaseLlm the request is for; needs a genai `api_client`
+            llm_request: LlmRequest to rewrite in place
+            prefix_count: Number of leading contents in the shared prefix
+
+        Returns:
+            bool: Whether the request now uses a cache
+        """
+        config = llm_request.config
+        contents = llm_request.contents[:prefix_count]
+        try:
+            client = getattr(llm, "api_client", None)
+        except Exception as e:
+            logger.warning("No genai client for %s, sending the prefix uncached: %s", llm.model, e)
+            client = None
+        if client is None or config.tools or prefix_count >= len(llm_request.contents):
+            return False
+        if prefix_tokens(config.system_instruction, contents) < self.min_tokens:
+            self.counts["too_small"] += 1
+            return False
+
+        model = llm_request.model or llm.model
+        key = prefix_fingerprint(model, config.system_instruction, contents)
+        name = await self._cache_name(key, client, model, config.system_instruction, contents)
+        if name is None:
+            self.counts["uncached"] += 1
+            return False
+
+        config.system_instruction = None
+        config.cached_content = name
+        llm_request.contents = llm_request.contents[prefix_count:]
+        self.counts["hits"] += 1
+        return True
+
+    def stats(self):
+        """Cache creations, hits and uncached calls so far"""
+        return dict(self.counts)
+
+    async def _cache_name(self, key, client, model, system_instruction, contents):
+        while True:
+            with self._lock:
+                name, expires = self._entries.get(key, (None, 0.0))
+                if time.time() < expires:
+                    return name
+                self._entries.pop(key, None)
+                pending = self._pending.get(key)
+                if pending is None:
+                    pending = self._pending[key] = asyncio.get_running_loop().create_future()
+                    break
+            # Another call is creating this cache; a creation on another
+            # event loop can't be awaited here, so send this call uncached
+            if pending.get_loop() is not asyncio.get_running_loop():
+                return None
+            await asyncio.shield(pending)
+
+        name, expires = None, time.time() + FAILURE_BACKOFF_SECONDS
+        try:
+            name = await self._create(client, model, system_instruction, contents)
+            expires = time.time() + self.ttl_seconds - EXPIRY_MARGIN_SECONDS
+        except Exception as e:
+            logger.warning("Could not create a context cache, sending the prefix uncached: %s", e)
+        finally:
+            # Also reached on cancellation, so waiting calls never hang
+            with self._lock:
+                self._store(key, name, expires)
+                del self._pending[key]
+            pending.set_result(None)
+        return name
+
+    def _store(self, key, name, expires):
+        # Caller holds the lock
+        now = time.time()
+        for expired in [k for k, (_, until) in self._entries.items() if until <= now]:
+            del self._entries[expired]
+        self._entries[key] = (name, expires)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    async def _create(self, client, model, system_instruction, contents):
+        cached = await client.aio.caches.create(
+            model=model,
+            config=types.CreateCachedContentConfig(
+                system_instruction=system_instruction,
+                contents=contents,
+                ttl=f"{int(self.ttl_seconds)}s",
+                display_name="study-guide-prompt-prefix",
+            ),
+        )
+        self.counts["created"] += 1
+        return cached.name
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_prompt_cache():
+    """Return the process-wide PromptCache, or None if disabled
+
+    Created lazily from the PROMPT_CACHE_* environment variables.
+    """
+    global _cache
+    if os.getenv("PROMPT_CACHE_DISABLED") == "1":
+        return None
+    with _cache_lock:
+        if _cache is None:
+            _cache = PromptCache(
+                ttl_seconds=float(os.getenv("PROMPT_CACHE_TTL", DEFAULT_TTL_SECONDS)),
+                min_tokens=int(os.getenv("PROMPT_CACHE_MIN_TOKENS", DEFAULT_MIN_TOKENS)),
+            )
+    return _cache
+
+
+def set_prompt_cache(cache):
+    """Replace the process-wide PromptCache (None restores the default)"""
+    global _cache
+    with _cache_lock:
+        _cache = cache
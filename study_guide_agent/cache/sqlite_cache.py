@@ -0,0 +1,155 @@
+"""
+Persistent key-value cache shared by the per-stage caches.
+
+JSON values are stored zlib-compressed in a SQLite file. Entries expire
+after a TTL, and the least recently used entries are evicted once the cache
+grows past its size limit.
+
+Subclasses that index entries in tables of their own (e.g. GuideCache's
+near-duplicate index) declare them in EXTRA_SCHEMA, keyed on
+entries (key) with ON DELETE CASCADE, so their rows go whenever an entry
+expires, is evicted, replaced or cleared.
+"""
+
+import json
+import sqlite3
+import threading
+import time
+import zlib
+from pathlib import Path
+
+
+class SqliteCache:
+    """SQLite-backed JSON cache with TTL and size-based LRU eviction
+
+    Safe to share between threads. Hit/miss/eviction counters are kept per
+    instance and exposed through stats().
+    """
+
+    # CREATE statements for subclass tables indexing the entries
+    EXTRA_SCHEMA = ()
+
+    def __init__(self, path, ttl_seconds, max_bytes):
+        self.path = str(path)
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+
+        if self.path != ":memory:":
+            Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        # WAL without a sync on every commit keeps hits sub-millisecond
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        # Removes the rows of EXTRA_SCHEMA tables together with their entry
+        self._conn.execute("PRAGMA foreign_keys=ON")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS entries ("
+            " key TEXT PRIMARY KEY,"
+            " value BLOB NOT NULL,"
+            " size INTEGER NOT NULL,"
+            " created_at REAL NOT NULL,"
+            " accessed_at REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS entries_accessed_at ON entries (accessed_at)")
+        for statement in self.EXTRA_SCHEMA:
+            self._conn.execute(statement)
+        self._conn.commit()
+
+    def get(self, key):
+        """Return the cached value for `key`, or None on a miss"""
+        with self._lock:
+            blob = self._read(key, time.time())
+            if blob is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+        return json.loads(zlib.decompress(blob))
+
+    def put(self, key, value):
+        """Store a JSON-serialisable value, evicting LRU entries if over size"""
+        self._write(key, value)
+
+    def _read(self, key, now):
+        # Caller holds the lock. The compressed value of a live entry, which
+        # is marked as used; an expired entry is deleted
+        row = self._conn.execute(
+            "SELECT value, created_at FROM entries WHERE key = ?", (key,)
+        ).fetchone()
+        if row is None or now - row[1] > self.ttl_seconds:
+            if row is not None:
+                self._conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+                self._conn.commit()
+            return None
+        self._touch(key, now)
+        return row[0]
+
+    def _touch(self, key, now):
+        # Caller holds the lock
+        self._conn.execute("UPDATE entries SET accessed_at = ? WHERE key = ?", (now, key))
+        self._conn.commit()
+
+    def _write(self, key, value, index=None):
+        """Store `value` under `key`; returns False if it isn't JSON-serialisable
+
+        `index(conn)` is called after the entry is written, in the same
+        transaction, to add the subclass's EXTRA_SCHEMA rows for `key`.
+        """
+        try:
+            blob = zlib.compress(json.dumps(value).encode("utf-8"))
+        except (TypeError, ValueError):
+            return False  # Not JSON-serialisable; leave it uncached
+
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO entries (key, value, size, created_at, accessed_at)"
+                " VALUES (?, ?, ?, ?, ?)",
+                (key, blob, len(blob), now, now),
+            )
+            if index is not None:
+                index(self._conn)
+            self._evict()
+            self._conn.commit()
+        return True
+
+    def stats(self):
+        """Return hit/miss/eviction counters and current size"""
+        with self._lock:
+            entries, size = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM entries"
+            ).fetchone()
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "entries": entries,
+            "bytes": size,
+        }
+
+    def clear(self):
+        """Remove every entry"""
+        with self._lock:
+            self._conn.execute("DELETE FROM entries")
+            self._conn.commit()
+
+    def _evict(self):
+        # Caller holds the lock
+        self._conn.execute(
+            "DELETE FROM entries WHERE created_at < ?", (time.time() - self.ttl_seconds,)
+        )
+        total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+
+        for key, size in self._conn.execute(
+            "SELECT key, size FROM entries ORDER BY accessed_at ASC"
+        ).fetchall():
+            if total <= self.max_bytes:
+                break
+            self._conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+            total -= size
+            self.evictions += 1
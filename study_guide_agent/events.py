@@ -0,0 +1,86 @@
+"""
+Typed section events streamed by the study guide pipeline, and a client
+helper that rebuilds the guide from them.
+
+Whenever a section is finalised, the pipeline emits an event whose
+custom_metadata holds a SectionFinalized under SECTION_EVENT_KEY: once when
+the section is elaborated and again, for the streaming judge, when its
+review (and any patch) is attached. A later event for the same index
+replaces the earlier one. Clients can render each section as it arrives
+instead of waiting for the judge.
+
+Usage:
+    guide = GuideReassembler()
+    async for event in remote_agent.async_stream_query(message=..., user_id=...):
+        section = guide.add(event)
+        if section:
+            print(f"Section {section.index + 1}/{section.total} {section.stage}: {section.title}")
+    print(guide.markdown())
+
+Events may be ADK Event objects (Runner.run_async) or their dict form
+(Agent Engine async_stream_query).
+"""
+
+from typing import Literal, Optional
+
+from pydantic import BaseModel
+
+
+SECTION_EVENT_KEY = "study_guide_section"
+
+
+class SectionFinalized(BaseModel):
+    """One finished section of the guide, as streamed to clients"""
+    index: int
+    total: Optional[int] = None
+    title: str
+    objective: str
+    markdown: str
+    stage: Literal["elaborated", "reviewed"]
+    verdict: Optional[str] = None
+    patch: Optional[str] = None
+
+
+def _get(obj, name):
+    if obj is None:
+        return None
+    return obj.get(name) if isinstance(obj, dict) else getattr(obj, name, None)
+
+
+def section_from_event(event) -> Optional[SectionFinalized]:
+    """The SectionFinalized carried by `event`, or None"""
+    value = (_get(event, "custom_metadata") or {}).get(SECTION_EVENT_KEY)
+    return SectionFinalized.model_validate(value) if value else None
+
+
+class GuideReassembler:
+    """Rebuilds the study guide incrementally from streamed pipeline events
+
+    Each event is inspected once, so following a whole stream is O(n) in the
+    number of events, with no re-scanning of earlier ones.
+    """
+
+    def __init__(self):
+        self.sections = {}
+        self.final_guide = None
+
+    def add(self, event) -> Optional[SectionFinalized]:
+        """Record one event; returns the section it finalised, if any"""
+        state_delta = _get(_get(event, "actions"), "state_delta") or {}
+        if state_delta.get("final_guide"):
+            self.final_guide = state_delta["final_guide"]
+
+        section = section_from_event(event)
+        if section:
+            self.sections[section.index] = section
+        return section
+
+    def ordered_sections(self) -> list[SectionFinalized]:
+        """Sections received so far, in objective order"""
+        return [self.sections[index] for index in sorted(self.sections)]
+
+    def markdown(self) -> str:
+        """The final guide once the judge has written it, else the sections so far"""
+        if self.final_guide:
+            return self.final_guide
+        return "\n\n".join(section.markdown for section in self.ordered_sections())
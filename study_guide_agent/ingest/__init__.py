@@ -0,0 +1,10 @@
+# Ingestion of long source material
+from .chunking import iter_chunks, is_long_source
+from .pdf import iter_pdf_pages, read_pdf_text
+
+__all__ = [
+    "iter_chunks",
+    "is_long_source",
+    "iter_pdf_pages",
+    "read_pdf_text",
+]
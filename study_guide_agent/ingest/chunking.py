@@ -0,0 +1,76 @@
+import re
+from typing import Iterable, Iterator
+
+from ..tools.content_extraction import CHARS_PER_TOKEN, estimate_tokens
+
+
+DEFAULT_CHUNK_TOKENS = 8000
+DEFAULT_OVERLAP_TOKENS = 200
+
+_PARAGRAPH_BREAK = re.compile(r"\n\s*\n")
+
+
+def iter_paragraphs(text: str) -> Iterator[str]:
+    """Yield the non-empty paragraphs of `text` without splitting it all at once"""
+    start = 0
+    for match in _PARAGRAPH_BREAK.finditer(text):
+        paragraph = text[start:match.start()].strip()
+        if paragraph:
+            yield paragraph
+        start = match.end()
+    paragraph = text[start:].strip()
+    if paragraph:
+        yield paragraph
+
+
+def _split_long(paragraph: str, max_chars: int) -> Iterator[str]:
+    """Split an oversized paragraph at whitespace into pieces of max_chars"""
+    while len(paragraph) > max_chars:
+        cut = paragraph.rfind(" ", 0, max_chars)
+        cut = cut if cut > 0 else max_chars
+        yield paragraph[:cut].strip()
+        paragraph = paragraph[cut:].strip()
+    if paragraph:
+        yield paragraph
+
+
+def iter_chunks(
+    source: "str | Iterable[str]",
+    max_tokens: int = DEFAULT_CHUNK_TOKENS,
+    overlap_tokens: int = DEFAULT_OVERLAP_TOKENS,
+) -> Iterator[str]:
+    """Split source material into token-bounded, paragraph-aligned chunks
+
+    Args:
+        source: The full text, or an iterable of text pieces (e.g. PDF pages)
+            consumed lazily so only one chunk is held at a time
+        max_tokens: Estimated token limit per chunk
+        overlap_tokens: Trailing context from the previous chunk repeated at
+            the start of the next, so ideas spanning a boundary aren't lost
+
+    Yields:
+        Chunks in source order
+    """
+    pieces = [source] if isinstance(source, str) else source
+    max_chars = max_tokens * CHARS_PER_TOKEN
+    overlap_chars = overlap_tokens * CHARS_PER_TOKEN
+
+    current, size = [], 0
+    for piece in pieces:
+        for paragraph in iter_paragraphs(piece):
+            for part in _split_long(paragraph, max_chars):
+                if current and size + len(part) + 2 > max_chars:
+                    chunk = "\n\n".join(current)
+                    yield chunk
+                    tail = chunk[-overlap_chars:] if overlap_chars else ""
+                    tail = tail[tail.find(" ") + 1:].strip()  # Start on a word boundary
+                    current, size = ([tail], len(tail)) if tail and len(tail) + len(part) + 2 <= max_chars else ([], 0)
+                current.append(part)
+                size += len(part) + 2
+    if current:
+        yield "\n\n".join(current)
+
+
+def is_long_source(text: str, max_tokens: int = DEFAULT_CHUNK_TOKENS) -> bool:
+    """Whether `text` needs more than one chunk"""
+    return estimate_tokens(text) > max_tokens
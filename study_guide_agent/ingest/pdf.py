@@ -0,0 +1,160 @@
+"""
+Streaming, page-parallel PDF text extraction with an on-disk text cache.
+
+Pages are extracted in batches on a process pool (PDF parsing is CPU-bound,
+so threads wouldn't help) and yielded in page order, with only a bounded
+number of batches in flight. Extracted pages are cached gzip-compressed,
+one JSON string per line, keyed by the SHA-256 of the file's content, so
+re-running the same PDF skips extraction entirely.
+
+Requires PyPDF2, imported lazily so the agents never depend on it; it is
+listed in requirements-pdf.txt rather than the deployed requirements.
+
+Configuration (environment variables):
+    PDF_TEXT_CACHE_DIR: Cache directory (default: ~/.cache/study_guide_agent/pdf_text)
+    PDF_TEXT_CACHE_DISABLED: Set to "1" to bypass the cache
+"""
+
+import gzip
+import hashlib
+import json
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Iterator
+
+
+DEFAULT_CACHE_DIR = Path.home() / ".cache" / "study_guide_agent" / "pdf_text"
+DEFAULT_BATCH_PAGES = 8
+HASH_BLOCK_SIZE = 1024 * 1024
+
+# Reader opened once per worker process by _init_worker
+_worker_path = None
+_worker_reader = None
+
+
+def _open_reader(path):
+    try:
+        from PyPDF2 import PdfReader
+    except ImportError as e:
+        raise ImportError("PDF extraction requires PyPDF2: pip install PyPDF2") from e
+    return PdfReader(path)
+
+
+def file_sha256(path) -> str:
+    """SHA-256 of a file's content, read in blocks"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as file:
+        for block in iter(lambda: file.read(HASH_BLOCK_SIZE), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def count_pages(path) -> int:
+    """Number of pages in a PDF"""
+    return len(_open_reader(path).pages)
+
+
+def _init_worker(path):
+    global _worker_path, _worker_reader
+    _worker_path = path
+    _worker_reader = _open_reader(path)
+
+
+def extract_page_range(path, start: int, stop: int) -> list[str]:
+    """Text of pages [start, stop); runs in a worker process
+
+    Reuses the reader the worker opened at startup, so each worker parses
+    the file once rather than once per batch.
+    """
+    reader = _worker_reader if path == _worker_path else _open_reader(path)
+    return [(reader.pages[i].extract_text() or "") for i in range(start, stop)]
+
+
+def _cache_path(digest, cache_dir):
+    return Path(cache_dir) / f"{digest}.jsonl.gz"
+
+
+def _cache_enabled():
+    return os.getenv("PDF_TEXT_CACHE_DISABLED") != "1"
+
+
+def _iter_cached(cache_file) -> Iterator[str]:
+    with gzip.open(cache_file, "rt", encoding="utf-8") as file:
+        for line in file:
+            yield json.loads(line)
+
+
+def _iter_extracted(path, max_workers, batch_pages) -> Iterator[str]:
+    page_count = count_pages(path)
+    ranges = [(start, min(start + batch_pages, page_count)) for start in range(0, page_count, batch_pages)]
+    max_workers = min(max_workers or os.cpu_count() or 1, len(ranges))
+    if max_workers <= 1:
+        # Not worth starting a process pool for a single batch or CPU;
+        # reuse one reader rather than re-parsing the file per batch
+        reader = _open_reader(path)
+        for page in reader.pages:
+            yield page.extract_text() or ""
+        return
+
+    with ProcessPoolExecutor(max_workers=max_workers, initializer=_init_worker, initargs=(str(path),)) as pool:
+        in_flight = deque()
+        pending = iter(ranges)
+        for start, stop in pending:
+            in_flight.append(pool.submit(extract_page_range, str(path), start, stop))
+            if len(in_flight) >= 2 * max_workers:
+                break
+        while in_flight:
+            pages = in_flight.popleft().result()
+            for start, stop in pending:
+                in_flight.append(pool.submit(extract_page_range, str(path), start, stop))
+                break
+            yield from pages
+
+
+def iter_pdf_pages(path, max_workers=None, batch_pages=DEFAULT_BATCH_PAGES, cache_dir=None) -> Iterator[str]:
+    """Yield the text of each page of a PDF, in page order
+
+    Args:
+        path: PDF file
+        max_workers: Worker processes (default: CPU count)
+        batch_pages: Pages extracted per worker task
+        cache_dir: Text cache directory (default: PDF_TEXT_CACHE_DIR)
+
+    Yields:
+        One string per page (empty for pages without extractable text).
+        Pages come from the cache when the file's content has been
+        extracted before; otherwise they are extracted in parallel and
+        written to the cache once every page has been read.
+    """
+    if not _cache_enabled():
+        yield from _iter_extracted(path, max_workers, batch_pages)
+        return
+
+    cache_dir = cache_dir or os.getenv("PDF_TEXT_CACHE_DIR", DEFAULT_CACHE_DIR)
+    cache_file = _cache_path(file_sha256(path), cache_dir)
+    if cache_file.exists():
+        yield from _iter_cached(cache_file)
+        return
+
+    cache_file.parent.mkdir(parents=True, exist_ok=True)
+    partial = cache_file.with_name(f"{cache_file.name}.{os.getpid()}.tmp")
+    try:
+        with gzip.open(partial, "wt", encoding="utf-8") as file:
+            for page in _iter_extracted(path, max_workers, batch_pages):
+                file.write(json.dumps(page) + "\n")
+                yield page
+        os.replace(partial, cache_file)
+    finally:
+        # Abandoned or failed extractions leave no partial cache entry
+        if partial.exists():
+            partial.unlink()
+
+
+def read_pdf_text(path, **kwargs) -> str:
+    """Full text of a PDF, pages separated by newlines
+
+    Accepts the same keyword arguments as iter_pdf_pages.
+    """
+    return "\n".join(iter_pdf_pages(path, **kwargs))
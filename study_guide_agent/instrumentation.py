@@ -0,0 +1,391 @@
+"""
+Per-stage latency, token and cost instrumentation for the study guide pipeline.
+
+StageInstrumentation is an ADK plugin: its agent, model and tool callbacks
+run for every agent in the invocation, including the agents that the
+parallel elaboration, map-reduce overview and streaming judge stages create
+at run time. For each run it records:
+
+- wall time of every agent run (each loop iteration is a separate record)
+- time to first token, input/output tokens (and how many input tokens were
+  served from a context cache) and estimated cost of every model call
+- latency of every tool call
+
+Records are exported as OpenTelemetry spans (agent spans parented to the
+enclosing stage, model and tool spans to their agent) through the globally
+configured tracer provider, and summarised as JSON.
+
+Usage:
+    instrumentation = StageInstrumentation()
+    app = App(name="study_guide_agent", root_agent=root_agent, plugins=[instrumentation])
+    ...
+    print(json.dumps(instrumentation.last_summary(), indent=2))
+
+Configuration (environment variables):
+    STUDY_GUIDE_METRICS_DIR: If set, each run's summary is also written to
+        <dir>/<invocation_id>.json
+"""
+
+import json
+import os
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Optional
+
+from google.adk.plugins.base_plugin import BasePlugin
+from opentelemetry import trace
+
+
+# Estimated list prices in USD per million (input, output) tokens, used for
+# the cost estimate only; pass `pricing` to override
+MODEL_PRICING = {
+    "gemini-2.5-pro": (1.25, 10.00),
+    "gemini-2.5-flash": (0.30, 2.50),
+    "gemini-2.5-flash-lite": (0.10, 0.40),
+}
+
+# Input tokens served from a context cache are billed at this fraction of the
+# input price
+CACHED_INPUT_RATE = 0.25
+
+MAX_SUMMARIES = 100
+
+_tracer = trace.get_tracer("study_guide_agent")
+
+
+@dataclass
+class StageRecord:
+    """Timings and usage of one agent run"""
+    agent: str
+    branch: Optional[str]
+    iteration: int
+    start: float
+    wall_time: float = 0.0
+    model_calls: int = 0
+    time_to_first_token: Optional[float] = None
+    input_tokens: int = 0
+    cached_tokens: int = 0
+    output_tokens: int = 0
+    cost_usd: float = 0.0
+    tool_calls: int = 0
+    tool_time: float = 0.0
+
+
+@dataclass
+class _RunState:
+    start: float
+    span: object
+    stages: list = field(default_factory=list)
+    open_stages: dict = field(default_factory=dict)
+    open_models: dict = field(default_factory=dict)
+    open_tools: dict = field(default_factory=dict)
+    tools: dict = field(default_factory=dict)
+
+
+def _on_branch(parent_branch, branch):
+    """Whether an agent on `parent_branch` encloses one on `branch`"""
+    return not parent_branch or parent_branch == branch or (branch or "").startswith(parent_branch + ".")
+
+
+class StageInstrumentation(BasePlugin):
+    """Records per-stage timings, tokens and tool latency for each run
+
+    Summaries of the most recent runs are kept in memory and returned by
+    summary() and last_summary().
+    """
+
+    def __init__(self, name="stage_instrumentation", pricing=None, metrics_dir=None):
+        super().__init__(name=name)
+        self.pricing = MODEL_PRICING if pricing is None else pricing
+        self.metrics_dir = metrics_dir or os.getenv("STUDY_GUIDE_METRICS_DIR")
+        self._runs = {}
+        self._summaries = OrderedDict()
+
+    def summary(self, invocation_id):
+        """JSON-serialisable summary of a finished run, or None"""
+        return self._summaries.get(invocation_id)
+
+    def last_summary(self):
+        """Summary of the most recently finished run, or None"""
+        return next(reversed(self._summaries.values()), None)
+
+    def estimate_cost(self, model, input_tokens, output_tokens, cached_tokens=0):
+        """Estimated USD cost of a model call (0 for unknown models)
+
+        `cached_tokens` of the `input_tokens` were served from a context cache.
+        """
+        input_price, output_price = self.pricing.get(model, (0.0, 0.0))
+        billed_input = input_tokens - cached_tokens + cached_tokens * CACHED_INPUT_RATE
+        return (billed_input * input_price + output_tokens * output_price) / 1_000_000
+
+    # Run lifecycle
+
+    async def before_run_callback(self, *, invocation_context):
+        span = _tracer.start_span(
+            "study_guide.run",
+            attributes={"study_guide.invocation_id": invocation_context.invocation_id},
+        )
+        self._runs[invocation_context.invocation_id] = _RunState(start=time.perf_counter(), span=span)
+        return None
+
+    async def after_run_callback(self, *, invocation_context):
+        run = self._runs.pop(invocation_context.invocation_id, None)
+        if run is None:
+            return None
+
+        # Stages short-circuited by a before_agent_callback (e.g. a guide
+        # cache hit) never see after_agent_callback
+        for record, span in run.open_stages.values():
+            record.wall_time = time.perf_counter() - record.start
+            span.end()
+        run.open_stages.clear()
+
+        summary = self._summarise(invocation_context.invocation_id, run)
+        run.span.set_attributes({
+            "study_guide.wall_time_s": summary["wall_time_s"],
+            "study_guide.input_tokens": summary["totals"]["input_tokens"],
+            "study_guide.cached_tokens": summary["totals"]["cached_tokens"],
+            "study_guide.output_tokens": summary["totals"]["output_tokens"],
+            "study_guide.cost_usd": summary["totals"]["cost_usd"],
+        })
+        run.span.end()
+
+        self._summaries[invocation_context.invocation_id] = summary
+        while len(self._summaries) > MAX_SUMMARIES:
+            self._summaries.popitem(last=False)
+        if self.metrics_dir:
+            path = Path(self.metrics_dir) / f"{invocation_context.invocation_id}.json"
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_text(json.dumps(summary, indent=2))
+        return None
+
+    async def on_run_error_callback(self, *, invocation_context, error):
+        run = self._runs.pop(invocation_context.invocation_id, None)
+        if run is not None:
+            run.span.record_exception(error)
+            run.span.end()
+
+    # Agents
+
+    async def before_agent_callback(self, *, agent, callback_context):
+        run = self._runs.get(callback_context.invocation_id)
+        if run is None:
+            return None
+
+        branch = callback_context.branch
+        iteration = sum(1 for record in run.stages if record.agent == agent.name and record.branch == branch)
+        record = StageRecord(agent=agent.name, branch=branch, iteration=iteration, start=time.perf_counter())
+        run.stages.append(record)
+
+        span = _tracer.start_span(
+            f"study_guide.agent {agent.name}",
+            context=trace.set_span_in_context(self._parent_span(run, branch)),
+            attributes={"study_guide.agent": agent.name, "study_guide.iteration": iteration},
+        )
+        run.open_stages[(agent.name, branch)] = (record, span)
+        return None
+
+    async def after_agent_callback(self, *, agent, callback_context):
+        self._close_stage(callback_context, agent.name)
+        return None
+
+    async def on_agent_error_callback(self, *, agent, callback_context, error):
+        self._close_stage(callback_context, agent.name, error)
+
+    # Model calls
+
+    async def before_model_callback(self, *, callback_context, llm_request):
+        run, stage = self._stage(callback_context)
+        if stage is None:
+            return None
+
+        record, agent_span = stage
+        span = _tracer.start_span(
+            "study_guide.model_call",
+            context=trace.set_span_in_context(agent_span),
+            attributes={"study_guide.model": llm_request.model or ""},
+        )
+        run.open_models[(record.agent, record.branch)] = {
+            "start": time.perf_counter(),
+            "first_token": None,
+            "model": llm_request.model or "",
+            "span": span,
+        }
+        return None
+
+    async def after_model_callback(self, *, callback_context, llm_response):
+        run, stage = self._stage(callback_context)
+        if stage is None:
+            return None
+
+        record, _ = stage
+        call = run.open_models.get((record.agent, record.branch))
+        if call is None:
+            return None
+        if call["first_token"] is None:
+            call["first_token"] = time.perf_counter() - call["start"]
+        if llm_response.partial:
+            return None
+
+        run.open_models.pop((record.agent, record.branch))
+        usage = llm_response.usage_metadata
+        input_tokens = (usage.prompt_token_count or 0) if usage else 0
+        output_tokens = (usage.candidates_token_count or 0) if usage else 0
+        cached_tokens = (usage.cached_content_token_count or 0) if usage else 0
+        cost = self.estimate_cost(call["model"], input_tokens, output_tokens, cached_tokens)
+
+        record.model_calls += 1
+        if record.time_to_first_token is None:
+            record.time_to_first_token = call["first_token"]
+        record.input_tokens += input_tokens
+        record.cached_tokens += cached_tokens
+        record.output_tokens += output_tokens
+        record.cost_usd += cost
+
+        call["span"].set_attributes({
+            "study_guide.time_to_first_token_s": call["first_token"],
+            "study_guide.input_tokens": input_tokens,
+            "study_guide.cached_tokens": cached_tokens,
+            "study_guide.output_tokens": output_tokens,
+            "study_guide.cost_usd": cost,
+        })
+        call["span"].end()
+        return None
+
+    async def on_model_error_callback(self, *, callback_context, llm_request, error):
+        run, stage = self._stage(callback_context)
+        if stage is not None:
+            record, _ = stage
+            call = run.open_models.pop((record.agent, record.branch), None)
+            if call is not None:
+                call["span"].record_exception(error)
+                call["span"].end()
+        return None
+
+    # Tool calls
+
+    async def before_tool_callback(self, *, tool, tool_args, tool_context):
+        run, stage = self._stage(tool_context)
+        if stage is None:
+            return None
+
+        _, agent_span = stage
+        span = _tracer.start_span(
+            f"study_guide.tool {tool.name}",
+            context=trace.set_span_in_context(agent_span),
+            attributes={"study_guide.tool": tool.name},
+        )
+        run.open_tools[tool_context.function_call_id] = (time.perf_counter(), span)
+        return None
+
+    async def after_tool_callback(self, *, tool, tool_args, tool_context, result):
+        self._close_tool(tool, tool_context)
+        return None
+
+    async def on_tool_error_callback(self, *, tool, tool_args, tool_context, error):
+        self._close_tool(tool, tool_context, error)
+        return None
+
+    # Helpers
+
+    def _stage(self, callback_context):
+        run = self._runs.get(callback_context.invocation_id)
+        if run is None:
+            return None, None
+        return run, run.open_stages.get((callback_context.agent_name, callback_context.branch))
+
+    def _parent_span(self, run, branch):
+        # Most recently started open stage that encloses this branch
+        for record, span in reversed(list(run.open_stages.values())):
+            if _on_branch(record.branch, branch):
+                return span
+        return run.span
+
+    def _close_stage(self, callback_context, agent_name, error=None):
+        run = self._runs.get(callback_context.invocation_id)
+        if run is None:
+            return
+        stage = run.open_stages.pop((agent_name, callback_context.branch), None)
+        if stage is None:
+            return
+
+        record, span = stage
+        record.wall_time = time.perf_counter() - record.start
+        span.set_attributes({
+            "study_guide.wall_time_s": record.wall_time,
+            "study_guide.input_tokens": record.input_tokens,
+            "study_guide.cached_tokens": record.cached_tokens,
+            "study_guide.output_tokens": record.output_tokens,
+            "study_guide.tool_time_s": record.tool_time,
+        })
+        if error is not None:
+            span.record_exception(error)
+        span.end()
+
+    def _close_tool(self, tool, tool_context, error=None):
+        run, stage = self._stage(tool_context)
+        if run is None:
+            return
+        opened = run.open_tools.pop(tool_context.function_call_id, None)
+        if opened is None:
+            return
+
+        start, span = opened
+        elapsed = time.perf_counter() - start
+        if stage is not None:
+            record, _ = stage
+            record.tool_calls += 1
+            record.tool_time += elapsed
+
+        stats = run.tools.setdefault(tool.name, {"calls": 0, "total_s": 0.0, "max_s": 0.0})
+        stats["calls"] += 1
+        stats["total_s"] += elapsed
+        stats["max_s"] = max(stats["max_s"], elapsed)
+
+        span.set_attribute("study_guide.latency_s", elapsed)
+        if error is not None:
+            span.record_exception(error)
+        span.end()
+
+    def _summarise(self, invocation_id, run):
+        stages = [
+            {
+                "agent": record.agent,
+                "branch": record.branch,
+                "iteration": record.iteration,
+                "start_offset_s": round(record.start - run.start, 4),
+                "wall_time_s": round(record.wall_time, 4),
+                "time_to_first_token_s": (
+                    None if record.time_to_first_token is None else round(record.time_to_first_token, 4)
+                ),
+                "model_calls": record.model_calls,
+                "input_tokens": record.input_tokens,
+                "cached_tokens": record.cached_tokens,
+                "output_tokens": record.output_tokens,
+                "cost_usd": round(record.cost_usd, 6),
+                "tool_calls": record.tool_calls,
+                "tool_time_s": round(record.tool_time, 4),
+            }
+            for record in run.stages
+        ]
+
+        return {
+            "invocation_id": invocation_id,
+            "wall_time_s": round(time.perf_counter() - run.start, 4),
+            "totals": {
+                "input_tokens": sum(r.input_tokens for r in run.stages),
+                "cached_tokens": sum(r.cached_tokens for r in run.stages),
+                "output_tokens": sum(r.output_tokens for r in run.stages),
+                "cost_usd": round(sum(r.cost_usd for r in run.stages), 6),
+                "model_calls": sum(r.model_calls for r in run.stages),
+                "tool_calls": sum(r.tool_calls for r in run.stages),
+                "tool_time_s": round(sum(r.tool_time for r in run.stages), 4),
+            },
+            "stages": stages,
+            "tools": {
+                name: {key: round(value, 4) if isinstance(value, float) else value for key, value in stats.items()}
+                for name, stats in run.tools.items()
+            },
+        }
@@ -0,0 +1,25 @@
+# Guide generation jobs: a bounded worker pool with per-tenant fairness
+# Exports are imported on first access (see study_guide_agent.lazy)
+from ..lazy import lazy_exports
+
+__all__ = [
+    "Job",
+    "InMemoryJobStore",
+    "SqliteJobStore",
+    "JobStoreLocked",
+    "JobQueue",
+    "QueueFull",
+    "get_job_queue",
+    "set_job_queue",
+]
+
+__getattr__, __dir__ = lazy_exports(__name__, {
+    "Job": ".job_store",
+    "InMemoryJobStore": ".job_store",
+    "SqliteJobStore": ".job_store",
+    "JobStoreLocked": ".job_store",
+    "JobQueue": ".job_queue",
+    "QueueFull": ".job_queue",
+    "get_job_queue": ".job_queue",
+    "set_job_queue": ".job_queue",
+})
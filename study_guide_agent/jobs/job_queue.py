@@ -0,0 +1,422 @@
+"""
+Job queue that runs guide generations on a bounded pool of workers.
+
+Every guide runs the whole multi-minute pipeline. When each request runs its
+own guide, a burst starts them all at once. They share the Vertex AI quota,
+so they all slow down together and start failing on 429s. JobQueue accepts
+guide requests as jobs instead, and runs at most `workers` of them at a time:
+
+- submit() returns a job ID immediately. If the queue already holds
+  `max_queued` waiting jobs, or the tenant holds `max_queued_per_tenant`,
+  it raises QueueFull with a Retry-After estimate instead.
+- Waiting jobs are started round-robin across tenants, so one tenant's
+  burst does not hold up everyone else's requests.
+- get() returns a job's status, progress and result for polling, and
+  position() its place in the queue. wait() returns once the job has
+  finished, and stream() yields each SectionFinalized as the pipeline
+  emits it (see study_guide_agent.events).
+
+Usage:
+    queue = get_job_queue()
+    try:
+        job_id = queue.submit("Create a study guide from this material: ...", tenant="team-a")
+    except QueueFull as e:
+        ...  # respond 429 with a Retry-After of e.retry_after seconds
+    async for section in queue.stream(job_id):
+        print(f"Section {section.index + 1}/{section.total}: {section.title}")
+    print((await queue.wait(job_id)).result)
+
+The queue is driven by one event loop: call its methods from the loop the
+workers run on (they start on the first call made from a running loop).
+
+Configuration (environment variables, for get_job_queue()):
+    JOB_QUEUE_WORKERS: Guides generated at once (default: 2)
+    JOB_QUEUE_MAX_QUEUED: Waiting jobs before submissions are rejected (default: 50)
+    JOB_QUEUE_MAX_PER_TENANT: Waiting jobs allowed per tenant (default: 10)
+    JOB_QUEUE_TIMEOUT: Seconds a job may run before it fails (default: 1800)
+    JOB_QUEUE_PATH: SQLite file that keeps jobs across restarts, owned by
+        one process at a time (default: jobs are kept in memory only)
+    JOB_QUEUE_RETENTION: Seconds finished jobs are kept (default: 86400)
+"""
+
+import asyncio
+import logging
+import math
+import os
+import threading
+import time
+import uuid
+from collections import Counter, OrderedDict, deque
+from typing import AsyncGenerator, Optional
+
+from google.genai import types
+
+from ..events import GuideReassembler, SectionFinalized
+from .job_store import InMemoryJobStore, Job, SqliteJobStore
+
+
+DEFAULT_WORKERS = 2
+DEFAULT_MAX_QUEUED = 50
+DEFAULT_MAX_PER_TENANT = 10
+DEFAULT_TIMEOUT_SECONDS = 30 * 60
+DEFAULT_RETENTION_SECONDS = 24 * 60 * 60
+# Guide duration assumed for Retry-After until a job has succeeded
+DEFAULT_JOB_SECONDS = 120
+# Weight of the latest job in the running average job duration
+DURATION_SMOOTHING = 0.2
+
+logger = logging.getLogger(__name__)
+
+
+class QueueFull(Exception):
+    """Raised by JobQueue.submit() when a job can't be queued now
+
+    Attributes:
+        retry_after: Seconds after which the submission is likely to be accepted
+    """
+
+    def __init__(self, message, retry_after):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class JobQueue:
+    """Bounded pool of workers draining a queue of guide generation jobs
+
+    Args:
+        runner: ADK Runner for the study guide pipeline; each job runs in a
+            new session of its app
+        store: Where jobs are kept (default: InMemoryJobStore). Unfinished
+            jobs already in the store are queued again; a SqliteJobStore
+            guarantees no other process is running them.
+        workers: Jobs run at once
+        max_queued: Waiting jobs before submit() raises QueueFull
+        max_queued_per_tenant: Waiting jobs per tenant before submit()
+            raises QueueFull
+        timeout: Seconds a job may run before it fails (None for no limit)
+        retention: Seconds finished jobs are kept in the store
+    """
+
+    def __init__(
+        self,
+        runner,
+        store=None,
+        workers=DEFAULT_WORKERS,
+        max_queued=DEFAULT_MAX_QUEUED,
+        max_queued_per_tenant=DEFAULT_MAX_PER_TENANT,
+        timeout=DEFAULT_TIMEOUT_SECONDS,
+        retention=DEFAULT_RETENTION_SECONDS,
+    ):
+        self.runner = runner
+        self.store = store or InMemoryJobStore()
+        self.workers = workers
+        self.max_queued = max_queued
+        self.max_queued_per_tenant = max_queued_per_tenant
+        self.timeout = timeout
+        self.retention = retention
+        self.loop = None
+        self.counts = Counter()
+        self._jobs = {}  # unfinished jobs by ID
+        self._waiting = OrderedDict()  # tenant -> deque of job IDs, in round-robin order
+        self._ready = asyncio.Semaphore(0)
+        self._running = {}  # job ID -> task running it
+        self._progress = {}  # job ID -> GuideReassembler
+        self._listeners = {}  # job ID -> set of stream() queues
+        self._workers = []
+        self._avg_duration = None
+
+        for job in self.store.unfinished():
+            # Waiting, or interrupted when the process stopped
+            job.status, job.started_at = "queued", None
+            self.store.save(job)
+            self._enqueue(job)
+
+    def submit(self, message: str, tenant: str = "default", user_id: Optional[str] = None, state=None) -> str:
+        """Queue a guide request and return its job ID
+
+        Args:
+            message: The user message, as it would be sent to the pipeline
+            tenant: Whose quota share the job uses; tenants take turns
+            user_id: Session user ID (default: the tenant)
+            state: Initial session state (e.g. {"model_budget": "economy"})
+
+        Raises:
+            QueueFull: If the queue or the tenant's share of it is full
+        """
+        queued = self.queued()
+        if queued >= self.max_queued:
+            raise QueueFull(f"{queued} jobs are already queued", self._retry_after(1))
+        waiting = len(self._waiting.get(tenant, ()))
+        if waiting >= self.max_queued_per_tenant:
+            # The tenant gets one start per turn of every waiting tenant
+            raise QueueFull(
+                f"Tenant {tenant!r} already has {waiting} jobs queued", self._retry_after(len(self._waiting))
+            )
+
+        self.store.prune(time.time() - self.retention)
+        job = Job(
+            id=uuid.uuid4().hex,
+            tenant=tenant,
+            user_id=user_id or tenant,
+            message=message,
+            state=state,
+            created_at=time.time(),
+        )
+        self.store.save(job)
+        self._enqueue(job)
+        self.counts["submitted"] += 1
+        self.start()
+        return job.id
+
+    def get(self, job_id: str) -> Optional[Job]:
+        """A snapshot of the job's status, progress and result, or None if unknown"""
+        job = self._jobs.get(job_id)
+        return job.model_copy() if job else self.store.get(job_id)
+
+    def position(self, job_id: str) -> Optional[int]:
+        """Waiting jobs that will start before `job_id`, or None if it isn't waiting"""
+        queues = [list(ids) for ids in self._waiting.values()]
+        ahead = 0
+        for turn in range(max(map(len, queues), default=0)):
+            for ids in queues:
+                if turn < len(ids):
+                    if ids[turn] == job_id:
+                        return ahead
+                    ahead += 1
+        return None
+
+    async def wait(self, job_id: str, timeout: Optional[float] = None) -> Optional[Job]:
+        """Return the job once it has finished (or None if unknown)
+
+        Raises:
+            asyncio.TimeoutError: If it is still unfinished after `timeout` seconds
+        """
+        async def drain():
+            async for _ in self.stream(job_id):
+                pass
+
+        await asyncio.wait_for(drain(), timeout)
+        return self.get(job_id)
+
+    async def stream(self, job_id: str) -> AsyncGenerator[SectionFinalized, None]:
+        """Yield each section of the job as it is finalised, until the job finishes
+
+        Sections finalised before the call are yielded first. A later
+        section with the same index replaces the earlier one.
+        """
+        self.start()
+        if job_id not in self._jobs:
+            return
+        listener = asyncio.Queue()
+        self._listeners.setdefault(job_id, set()).add(listener)
+        try:
+            guide = self._progress.get(job_id)
+            for section in guide.ordered_sections() if guide else []:
+                yield section
+            while (section := await listener.get()) is not None:
+                yield section
+        finally:
+            self._listeners.get(job_id, set()).discard(listener)
+
+    def cancel(self, job_id: str) -> bool:
+        """Cancel a waiting or running job; returns False if it isn't unfinished"""
+        job = self._jobs.get(job_id)
+        if job is None:
+            return False
+        if job_id in self._running:
+            self._running[job_id].cancel()
+        else:
+            ids = self._waiting[job.tenant]
+            ids.remove(job_id)
+            if not ids:
+                del self._waiting[job.tenant]
+            job.status = "cancelled"
+            self._finish(job)
+        return True
+
+    def queued(self) -> int:
+        """Jobs waiting for a worker"""
+        return sum(len(ids) for ids in self._waiting.values())
+
+    def stats(self):
+        """Queue depth, running jobs and job counts by outcome"""
+        return {
+            "queued": self.queued(),
+            "running": len(self._running),
+            "tenants_waiting": len(self._waiting),
+            "avg_duration": self._avg_duration,
+            **self.counts,
+        }
+
+    def start(self):
+        """Start the workers on the running event loop (a no-op once started)
+
+        Called by submit(), wait() and stream(); outside a running event
+        loop it does nothing, and the workers start on the next such call
+        made from one.
+        """
+        if self._workers:
+            return
+        try:
+            self.loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        self._workers = [self.loop.create_task(self._work()) for _ in range(self.workers)]
+
+    async def close(self):
+        """Stop the workers
+
+        Running jobs are interrupted and queued again, at the front of
+        their tenant's queue; start() resumes them.
+        """
+        workers, self._workers = self._workers, []
+        for worker in workers:
+            worker.cancel()
+        await asyncio.gather(*workers, return_exceptions=True)
+
+    def _enqueue(self, job, first=False):
+        self._jobs[job.id] = job
+        ids = self._waiting.setdefault(job.tenant, deque())
+        if first:
+            ids.appendleft(job.id)
+        else:
+            ids.append(job.id)
+        self._ready.release()
+
+    def _next(self):
+        """Pop the next waiting job, taking tenants in turn"""
+        while self._waiting:
+            tenant, ids = next(iter(self._waiting.items()))
+            job_id = ids.popleft()
+            if ids:
+                self._waiting.move_to_end(tenant)
+            else:
+                del self._waiting[tenant]
+            job = self._jobs.get(job_id)
+            if job is not None and job.status == "queued":
+                return job
+        return None
+
+    def _retry_after(self, starts):
+        """Seconds until about `starts` more waiting jobs have started"""
+        duration = self._avg_duration or DEFAULT_JOB_SECONDS
+        return max(1, math.ceil(duration * starts / self.workers))
+
+    async def _work(self):
+        while True:
+            await self._ready.acquire()
+            job = self._next()
+            if job is None:
+                continue  # cancelled while waiting
+
+            job.status, job.started_at = "running", time.time()
+            self.store.save(job)
+            task = self._running[job.id] = asyncio.create_task(self._run(job))
+            try:
+                await asyncio.wait({task})
+            except asyncio.CancelledError:
+                # close(): put an unfinished job back for the next start()
+                if not task.done():
+                    task.cancel()
+                    self._progress.pop(job.id, None)
+                    job.status, job.started_at = "queued", None
+                    self.store.save(job)
+                    self._enqueue(job, first=True)
+                raise
+            finally:
+                del self._running[job.id]
+                if task.cancelled():
+                    job.status = "cancelled"
+                    self._finish(job)
+
+    async def _run(self, job):
+        guide = self._progress[job.id] = GuideReassembler()
+        job.sections, job.total_sections = 0, None
+        try:
+            await asyncio.wait_for(self._generate(job, guide), self.timeout)
+            job.status = "succeeded"
+        except asyncio.TimeoutError:
+            job.status, job.error = "failed", f"Timed out after {self.timeout}s"
+        except Exception as e:
+            logger.exception("Job %s failed", job.id)
+            job.status, job.error = "failed", f"{type(e).__name__}: {e}"
+        self._finish(job)
+
+    async def _generate(self, job, guide):
+        runner = self.runner
+        session = await runner.session_service.create_session(
+            app_name=runner.app_name, user_id=job.user_id, state=job.state
+        )
+        job.session_id = session.id
+        self.store.save(job)
+
+        async for event in runner.run_async(
+            user_id=job.user_id,
+            session_id=session.id,
+            new_message=types.Content(role="user", parts=[types.Part(text=job.message)]),
+        ):
+            section = guide.add(event)
+            if section:
+                job.sections, job.total_sections = len(guide.sections), section.total
+                self.store.save(job)
+                for listener in self._listeners.get(job.id, ()):
+                    listener.put_nowait(section)
+
+        session = await runner.session_service.get_session(
+            app_name=runner.app_name, user_id=job.user_id, session_id=session.id
+        )
+        job.result = (session.state.get("final_guide") if session else None) or guide.final_guide
+        if not job.result:
+            raise RuntimeError("Pipeline finished without a final_guide")
+
+    def _finish(self, job):
+        job.finished_at = time.time()
+        self.store.save(job)
+        self._jobs.pop(job.id, None)
+        self._progress.pop(job.id, None)
+        for listener in self._listeners.pop(job.id, ()):
+            listener.put_nowait(None)
+        self.counts[job.status] += 1
+
+        if job.status == "succeeded":
+            duration = job.finished_at - job.started_at
+            self._avg_duration = duration if self._avg_duration is None else (
+                (1 - DURATION_SMOOTHING) * self._avg_duration + DURATION_SMOOTHING * duration
+            )
+
+
+_queue = None
+_queue_lock = threading.Lock()
+
+
+def get_job_queue():
+    """Return the process-wide JobQueue around the default runner
+
+    Created lazily from the JOB_QUEUE_* environment variables, with the
+    runner from study_guide_agent.runner. A queue whose workers ran on an
+    event loop that has since closed is replaced.
+    """
+    global _queue
+    with _queue_lock:
+        if _queue is None or (_queue.loop is not None and _queue.loop.is_closed()):
+            from ..runner import runner
+
+            path = os.getenv("JOB_QUEUE_PATH")
+            timeout = float(os.getenv("JOB_QUEUE_TIMEOUT", DEFAULT_TIMEOUT_SECONDS))
+            _queue = JobQueue(
+                runner,
+                store=SqliteJobStore(path) if path else None,
+                workers=int(os.getenv("JOB_QUEUE_WORKERS", DEFAULT_WORKERS)),
+                max_queued=int(os.getenv("JOB_QUEUE_MAX_QUEUED", DEFAULT_MAX_QUEUED)),
+                max_queued_per_tenant=int(os.getenv("JOB_QUEUE_MAX_PER_TENANT", DEFAULT_MAX_PER_TENANT)),
+                timeout=timeout or None,
+                retention=float(os.getenv("JOB_QUEUE_RETENTION", DEFAULT_RETENTION_SECONDS)),
+            )
+    return _queue
+
+
+def set_job_queue(queue):
+    """Replace the process-wide JobQueue (None restores the default)"""
+    global _queue
+    with _queue_lock:
+        _queue = queue
@@ -0,0 +1,189 @@
+"""
+Job records for the guide generation queue, and where they are kept.
+
+A Job holds one submitted guide request and everything a client polls for:
+its status, progress, the final guide or the error. The queue keeps jobs in
+a store: InMemoryJobStore for a single process, or SqliteJobStore to keep
+them across restarts (jobs that were queued or running when the process
+stopped are queued again on start).
+
+A SqliteJobStore file belongs to one process at a time: the store holds an
+exclusive lock on it for as long as it is open, so a second process can't
+queue again the jobs the first is still running. Other processes open it
+with readonly=True to read job status and results.
+"""
+
+import json
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Literal, Optional
+
+from pydantic import BaseModel
+
+
+JobStatus = Literal["queued", "running", "succeeded", "failed", "cancelled"]
+FINISHED_STATUSES = ("succeeded", "failed", "cancelled")
+
+
+class Job(BaseModel):
+    """One guide generation request and its progress"""
+    id: str
+    tenant: str
+    user_id: str
+    message: str
+    state: Optional[dict] = None
+    status: JobStatus = "queued"
+    session_id: Optional[str] = None
+    sections: int = 0
+    total_sections: Optional[int] = None
+    result: Optional[str] = None
+    error: Optional[str] = None
+    created_at: float
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+
+    @property
+    def finished(self) -> bool:
+        return self.status in FINISHED_STATUSES
+
+
+class InMemoryJobStore:
+    """Jobs of this process only, lost when it exits"""
+
+    def __init__(self):
+        self._jobs = {}
+        self._lock = threading.Lock()
+
+    def save(self, job: Job):
+        """Insert or replace a job"""
+        with self._lock:
+            self._jobs[job.id] = job.model_copy()
+
+    def get(self, job_id: str) -> Optional[Job]:
+        with self._lock:
+            job = self._jobs.get(job_id)
+        return job.model_copy() if job else None
+
+    def unfinished(self) -> list[Job]:
+        """Queued and running jobs, oldest first"""
+        with self._lock:
+            jobs = [job.model_copy() for job in self._jobs.values() if not job.finished]
+        return sorted(jobs, key=lambda job: job.created_at)
+
+    def prune(self, finished_before: float) -> int:
+        """Delete jobs that finished before `finished_before`; returns how many"""
+        with self._lock:
+            expired = [
+                job_id for job_id, job in self._jobs.items()
+                if job.finished and job.finished_at < finished_before
+            ]
+            for job_id in expired:
+                del self._jobs[job_id]
+        return len(expired)
+
+
+class JobStoreLocked(RuntimeError):
+    """Raised when another process already owns a SqliteJobStore file"""
+
+
+def _lock_exclusively(file):
+    """Take a non-blocking exclusive lock on `file`; raises OSError if it is held"""
+    try:
+        import fcntl
+    except ImportError:  # Windows
+        import msvcrt
+        msvcrt.locking(file.fileno(), msvcrt.LK_NBLCK, 1)
+    else:
+        fcntl.flock(file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+
+
+class SqliteJobStore:
+    """Jobs kept in a SQLite file, so they survive restarts
+
+    Safe to share between threads. The store owns the file until close():
+    it holds an exclusive lock on "<path>.lock", which the OS releases if
+    the process dies, so a restarted process can take over and queue the
+    interrupted jobs again.
+
+    Args:
+        path: SQLite file
+        readonly: Open without taking ownership, e.g. to read job status
+            and results from another process; save() and prune() fail
+
+    Raises:
+        JobStoreLocked: If another process owns the file (unless readonly)
+    """
+
+    def __init__(self, path, readonly=False):
+        self.path = str(path)
+        self.readonly = readonly
+        self._lock = threading.Lock()
+        self._owner = None
+
+        if readonly:
+            self._conn = sqlite3.connect(f"{Path(self.path).as_uri()}?mode=ro", uri=True, check_same_thread=False)
+            return
+
+        if self.path != ":memory:":
+            Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+            self._owner = open(f"{self.path}.lock", "a")
+            try:
+                _lock_exclusively(self._owner)
+            except OSError as e:
+                self._owner.close()
+                raise JobStoreLocked(f"{self.path} is owned by another process") from e
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS jobs ("
+            " id TEXT PRIMARY KEY,"
+            " status TEXT NOT NULL,"
+            " created_at REAL NOT NULL,"
+            " finished_at REAL,"
+            " data TEXT NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status, created_at)")
+        self._conn.commit()
+
+    def save(self, job: Job):
+        """Insert or replace a job"""
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO jobs (id, status, created_at, finished_at, data)"
+                " VALUES (?, ?, ?, ?, ?)",
+                (job.id, job.status, job.created_at, job.finished_at, job.model_dump_json()),
+            )
+            self._conn.commit()
+
+    def get(self, job_id: str) -> Optional[Job]:
+        with self._lock:
+            row = self._conn.execute("SELECT data FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return Job.model_validate(json.loads(row[0])) if row else None
+
+    def unfinished(self) -> list[Job]:
+        """Queued and running jobs, oldest first"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT data FROM jobs WHERE status IN ('queued', 'running') ORDER BY created_at"
+            ).fetchall()
+        return [Job.model_validate(json.loads(row[0])) for row in rows]
+
+    def prune(self, finished_before: float) -> int:
+        """Delete jobs that finished before `finished_before`; returns how many"""
+        with self._lock:
+            deleted = self._conn.execute(
+                "DELETE FROM jobs WHERE finished_at IS NOT NULL AND finished_at < ?", (finished_before,)
+            ).rowcount
+            self._conn.commit()
+        return deleted
+
+    def close(self):
+        """Close the file and give up ownership of it"""
+        with self._lock:
+            self._conn.close()
+            if self._owner is not None:
+                self._owner.close()
+                self._owner = None
+
@@ -0,0 +1,44 @@
+"""
+Lazy module attributes (PEP 562) for the package's __init__ modules.
+
+A package __init__ that re-exports names from its submodules imports every
+submodule, and their dependencies (google.adk, mcp, numpy), as soon as the
+package is imported, even when the caller needs one light module. With
+lazy_exports, each name's submodule is imported on first access instead,
+and the value is then cached on the package.
+
+Usage (in a package __init__):
+    __all__ = ["create_overview_agent", ...]
+    __getattr__, __dir__ = lazy_exports(__name__, {
+        "create_overview_agent": ".sub_agents.overview_agent",
+        ...
+    })
+"""
+
+import importlib
+import sys
+
+
+def lazy_exports(package, exports):
+    """Module __getattr__ and __dir__ that import `exports` on first access
+
+    Args:
+        package: __name__ of the package
+        exports: Map of exported name to the (relative) module defining it
+
+    Returns:
+        tuple: (__getattr__, __dir__) to assign in the package
+    """
+
+    def __getattr__(name):
+        module = exports.get(name)
+        if module is None:
+            raise AttributeError(f"module {package!r} has no attribute {name!r}")
+        value = getattr(importlib.import_module(module, package), name)
+        setattr(sys.modules[package], name, value)
+        return value
+
+    def __dir__():
+        return sorted(set(vars(sys.modules[package])) | set(exports))
+
+    return __getattr__, __dir__
@@ -9,12 +9,22 @@ For local development:
 
 For production with memory bank:
     Set AGENT_ENGINE_ID environment variable before running
+
+Per-stage latency, token and tool metrics are recorded by the
+StageInstrumentation plugin; set STUDY_GUIDE_METRICS_DIR to write a JSON
+summary of each run.
+
+The default `runner` (and the root agent) and `instrumentation` are created
+on first access, so importing this module loads neither ADK nor
+OpenTelemetry.
+
+To run many guides without exceeding the model quota, submit them to the
+job queue instead (study_guide_agent.jobs.get_job_queue()), which runs
+them on a bounded pool of workers around this runner.
 """
 
 import os
-from google.adk import Runner
-from google.adk.memory import VertexAiMemoryBankService, InMemoryMemoryService
-from .agent import root_agent
+import threading
 
 
 def create_runner_with_memory():
@@ -23,6 +33,11 @@ def create_runner_with_memory():
     Returns:
         Runner instance with appropriate memory service
     """
+    from google.adk import Runner
+    from google.adk.apps import App
+    from google.adk.memory import VertexAiMemoryBankService, InMemoryMemoryService
+    from .agent import root_agent
+
     # Check if we're in a deployed environment with Agent Engine
     agent_engine_id = os.getenv("AGENT_ENGINE_ID")
     project_id = os.getenv("GOOGLE_CLOUD_PROJECT")
@@ -48,23 +63,51 @@ def create_runner_with_memory():
         memory_service = InMemoryMemoryService()
         print("✅ Using in-memory storage (data will not persist between sessions)")
 
-    # Create the runner with memory service
+    # Create the runner with memory service and per-stage instrumentation
     runner = Runner(
-        agent=root_agent,
+        app=App(
+            name="study_guide_agent",
+            root_agent=root_agent,
+            plugins=[_lazy("instrumentation", _create_instrumentation)],
+        ),
         memory_service=memory_service
     )
 
     return runner
 
 
-# Create the default runner instance
-runner = create_runner_with_memory()
+def _create_instrumentation():
+    # Per-stage metrics of recent runs: instrumentation.last_summary()
+    from .instrumentation import StageInstrumentation
+
+    return StageInstrumentation()
+
+
+# The default runner and its instrumentation, created on first access.
+# Reentrant: creating the runner creates the instrumentation
+_lazy_lock = threading.RLock()
+_LAZY_ATTRIBUTES = {"runner": create_runner_with_memory, "instrumentation": _create_instrumentation}
+
+
+def _lazy(name, create):
+    with _lazy_lock:
+        if name not in globals():
+            globals()[name] = create()
+    return globals()[name]
+
+
+def __getattr__(name):
+    if name not in _LAZY_ATTRIBUTES:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    return _lazy(name, _LAZY_ATTRIBUTES[name])
 
 
 if __name__ == "__main__":
     # Run the agent interactively
     import asyncio
 
+    runner = create_runner_with_memory()
+
     async def main():
         session = runner.start_session(user_id="local_user")
 
@@ -1,13 +1,28 @@
 import os
-import vertexai
+import threading
+
+
+_setup_done = False
+_setup_lock = threading.Lock()
 
 
 def setup_environment():
-    """Initialize environment variables and Vertex AI
+    """Initialize environment variables and Vertex AI (once per process)
 
     Note: When deployed to Agent Engine, environment variables should already be set.
     For local testing, use .env file with python-dotenv.
+    Nothing runs at import time: study_guide_agent.agent calls this when
+    root_agent is first accessed.
     """
+    global _setup_done
+    with _setup_lock:
+        if _setup_done:
+            return
+        _setup_environment()
+        _setup_done = True
+
+
+def _setup_environment():
     # Increase timeout for authentication and API calls (helps with network issues)
     os.environ.setdefault('GOOGLE_AUTH_TOKEN_URI_TIMEOUT', '300')  # 5 minutes
     os.environ.setdefault('GOOGLE_API_TIMEOUT', '300')  # 5 minutes
@@ -38,6 +53,9 @@ def setup_environment():
     if FIRECRAWL_API_KEY:
         print(f"✅ Firecrawl API key configured")
 
+    # Imported here: vertexai is slow to import and only needed for the init
+    import vertexai
+
     vertexai.init(
         project=PROJECT_ID,
         location=LOCATION,
@@ -1,6 +1,22 @@
 # Tools for agents
-from .firecrawl_mcp import get_firecrawl_toolset
+# Exports are imported on first access: the deployed pipeline only uses the
+# Firecrawl FunctionTools, so the MCP toolset (and mcp itself) is loaded on demand
+from ..lazy import lazy_exports
 
 __all__ = [
     "get_firecrawl_toolset",
+    "get_firecrawl_mcp_pool",
+    "set_firecrawl_mcp_pool",
+    "warm_up_firecrawl_mcp_pool",
+    "McpSessionPool",
+    "PooledMcpToolset",
 ]
+
+__getattr__, __dir__ = lazy_exports(__name__, {
+    "get_firecrawl_toolset": ".firecrawl_mcp",
+    "get_firecrawl_mcp_pool": ".firecrawl_mcp",
+    "set_firecrawl_mcp_pool": ".firecrawl_mcp",
+    "warm_up_firecrawl_mcp_pool": ".firecrawl_mcp",
+    "McpSessionPool": ".mcp_pool",
+    "PooledMcpToolset": ".mcp_pool",
+})
@@ -0,0 +1,145 @@
+"""
+Token-budgeted, relevance-ranked extraction of scraped markdown.
+
+Instead of cutting scraped pages at a fixed character offset (which tends to
+keep navigation boilerplate and drop the useful paragraphs), pages are split
+into paragraph chunks, scored against the query or learning objective with
+BM25 (vectorised with NumPy), and the best chunks are packed into a token
+budget. Selected chunks are returned in their original document order.
+"""
+
+import re
+
+import numpy as np
+
+
+CHARS_PER_TOKEN = 4
+TARGET_CHUNK_CHARS = 800
+OMISSION_MARKER = "[...]"
+
+_WORD_RE = re.compile(r"[a-z0-9]+")
+_LINK_RE = re.compile(r"\[[^\]]*\]\([^)]*\)|https?://\S+")
+_STOPWORDS = frozenset(
+    "a an and are as at be by for from has have in is it its of on or that the "
+    "this to was were what when where which who why will with how".split()
+)
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count for budget packing (about 4 characters per token)"""
+    return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+
+def tokenize(text: str) -> list[str]:
+    """Lower-cased alphanumeric terms with common stopwords removed"""
+    return [t for t in _WORD_RE.findall(text.lower()) if t not in _STOPWORDS]
+
+
+def chunk_markdown(markdown: str, target_chars: int = TARGET_CHUNK_CHARS) -> list[str]:
+    """Split markdown into paragraph-aligned chunks of roughly target_chars
+
+    A heading always starts a new chunk so it stays with the text under it.
+    Paragraphs longer than target_chars become chunks of their own.
+    """
+    chunks, current = [], []
+    size = 0
+    for block in re.split(r"\n\s*\n", markdown.strip()):
+        block = block.strip()
+        if not block:
+            continue
+        if current and (block.startswith("#") or size + len(block) > target_chars):
+            chunks.append("\n\n".join(current))
+            current, size = [], 0
+        current.append(block)
+        size += len(block)
+    if current:
+        chunks.append("\n\n".join(current))
+    return chunks
+
+
+def link_density(text: str) -> float:
+    """Fraction of characters inside markdown links or bare URLs"""
+    if not text:
+        return 0.0
+    return sum(len(m.group(0)) for m in _LINK_RE.finditer(text)) / len(text)
+
+
+def bm25_scores(documents: list[list[str]], query: list[str], k1: float = 1.5, b: float = 0.75) -> np.ndarray:
+    """BM25 score of each tokenised document against the query terms"""
+    vocabulary = {term: j for j, term in enumerate(dict.fromkeys(query))}
+    if not documents or not vocabulary:
+        return np.zeros(len(documents))
+
+    tf = np.zeros((len(documents), len(vocabulary)))
+    for i, terms in enumerate(documents):
+        for term in terms:
+            j = vocabulary.get(term)
+            if j is not None:
+                tf[i, j] += 1
+
+    lengths = np.array([len(terms) for terms in documents], dtype=float)
+    avg_length = lengths.mean() or 1.0
+    df = (tf > 0).sum(axis=0)
+    idf = np.log1p((len(documents) - df + 0.5) / (df + 0.5))
+    norm = k1 * (1 - b + b * lengths / avg_length)
+    return (idf * tf * (k1 + 1) / (tf + norm[:, None])).sum(axis=1)
+
+
+def _truncate_to_budget(text: str, token_budget: int) -> str:
+    limit = token_budget * CHARS_PER_TOKEN
+    if len(text) <= limit:
+        return text
+    cut = text.rfind(" ", 0, limit)
+    return text[:cut if cut > 0 else limit].rstrip() + " ..."
+
+
+def extract_relevant(markdown: str, query: str = "", token_budget: int = 500) -> str:
+    """Pack the chunks of `markdown` most relevant to `query` into a budget
+
+    Args:
+        markdown: Scraped page content
+        query: Search query or learning objective to rank chunks against.
+            Without one, chunks keep document order and only link-heavy
+            boilerplate is pushed down.
+        token_budget: Maximum estimated tokens to return
+
+    Returns:
+        The selected chunks in document order, with "[...]" marking gaps
+    """
+    if not markdown or token_budget <= 0:
+        return ""
+    if estimate_tokens(markdown) <= token_budget:
+        return markdown.strip()
+
+    chunks = chunk_markdown(markdown)
+    scores = bm25_scores([tokenize(c) for c in chunks], tokenize(query))
+    density = np.array([link_density(c) for c in chunks])
+    # Link-heavy chunks (navigation, footers) are demoted rather than
+    # dropped; position breaks ties so earlier chunks win
+    scores = scores * np.where(density > 0.5, 0.1, 1.0) - density
+    order = sorted(range(len(chunks)), key=lambda i: (-scores[i], i))
+
+    selected = {}
+    remaining = token_budget
+    for i in order:
+        cost = estimate_tokens(chunks[i])
+        if cost <= remaining:
+            selected[i] = chunks[i]
+            remaining -= cost
+        elif not selected:
+            # The single best chunk doesn't fit: keep as much of it as fits
+            selected[i] = _truncate_to_budget(chunks[i], remaining)
+            remaining = 0
+        if remaining < 16:
+            break
+
+    parts = []
+    previous = -1
+    for i in sorted(selected):
+        if i != previous + 1:
+            parts.append(OMISSION_MARKER)
+        parts.append(selected[i])
+        previous = i
+    if previous != len(chunks) - 1:
+        parts.append(OMISSION_MARKER)
+    return "\n\n".join(parts)
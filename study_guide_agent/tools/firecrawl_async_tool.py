@@ -0,0 +1,135 @@
+"""
+Async Firecrawl FunctionTools.
+
+The ADK runner is asyncio-based, so a blocking HTTP call inside a tool stalls
+every other session on the same worker. These tools run the synchronous
+implementations from firecrawl_function_tool.py (and so share its cache and
+pooled client) on a bounded thread pool, and await them with a per-call
+timeout. They keep the same tool names, so prompts don't change.
+
+Configuration (environment variables):
+    FIRECRAWL_MAX_WORKERS: Threads available to Firecrawl calls (default: 8)
+    FIRECRAWL_TOOL_TIMEOUT: Seconds before a tool call gives up (default: 120)
+"""
+
+import asyncio
+import functools
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from google.adk.tools import FunctionTool
+
+from . import firecrawl_function_tool
+
+
+DEFAULT_MAX_WORKERS = 8
+DEFAULT_TOOL_TIMEOUT = 120.0
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def _get_executor():
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(
+                    max_workers=int(os.getenv("FIRECRAWL_MAX_WORKERS", DEFAULT_MAX_WORKERS)),
+                    thread_name_prefix="firecrawl",
+                )
+    return _executor
+
+
+async def run_blocking(func, *args, timeout=None):
+    """Run a blocking Firecrawl call on the shared thread pool
+
+    Args:
+        func: Synchronous function to call
+        *args: Positional arguments for func
+        timeout: Seconds to wait (default: FIRECRAWL_TOOL_TIMEOUT)
+
+    Returns:
+        func's result
+
+    Raises:
+        asyncio.TimeoutError: If the call takes longer than `timeout`. The
+            worker thread can't be interrupted; it finishes in the background
+            (bounded by the HTTP client timeout) and its result is dropped.
+            Cancelling the awaiting task behaves the same way.
+    """
+    if timeout is None:
+        timeout = float(os.getenv("FIRECRAWL_TOOL_TIMEOUT", DEFAULT_TOOL_TIMEOUT))
+    loop = asyncio.get_running_loop()
+    future = loop.run_in_executor(_get_executor(), functools.partial(func, *args))
+    return await asyncio.wait_for(future, timeout)
+
+
+async def firecrawl_search(query: str, limit: int = 5, token_budget: int = 600) -> str:
+    """Search the web using Firecrawl and return relevant content.
+
+    Args:
+        query: Search query to find relevant educational content
+        limit: Maximum number of results to return (default: 5)
+        token_budget: Approximate tokens of content to return across all results (default: 600)
+
+    Returns:
+        Formatted string with search results including titles, URLs, and content
+    """
+    try:
+        return await run_blocking(firecrawl_function_tool.firecrawl_search, query, limit, token_budget)
+    except asyncio.TimeoutError:
+        return f"Error performing search: timed out for query: {query}"
+
+
+async def firecrawl_scrape(url: str, query: str = "", token_budget: int = 500) -> str:
+    """Scrape content from a specific URL using Firecrawl.
+
+    Args:
+        url: The URL to scrape content from
+        query: Topic or learning objective to rank the page's passages against (optional)
+        token_budget: Approximate tokens of content to return (default: 500)
+
+    Returns:
+        Scraped content in markdown format
+    """
+    try:
+        return await run_blocking(firecrawl_function_tool.firecrawl_scrape, url, query, token_budget)
+    except asyncio.TimeoutError:
+        return f"Error scraping URL: timed out for {url}"
+
+
+async def firecrawl_batch_scrape(urls: list[str], query: str = "", token_budget: int = 2000) -> str:
+    """Scrape several URLs concurrently using Firecrawl.
+
+    Args:
+        urls: The URLs to scrape (at most 10 per call)
+        query: Topic or learning objective to rank each page's passages against (optional)
+        token_budget: Approximate tokens of content to return across all URLs (default: 2000)
+
+    Returns:
+        Scraped content for each URL in the order given, separated by "---".
+        A URL that fails gets an error message in its place instead of
+        failing the whole batch.
+    """
+    if not urls:
+        return "Error: no URLs provided"
+
+    max_urls = firecrawl_function_tool.MAX_BATCH_URLS
+    batch, skipped = urls[:max_urls], urls[max_urls:]
+    per_url_budget = token_budget // len(batch)
+    semaphore = asyncio.Semaphore(firecrawl_function_tool.batch_concurrency())
+
+    async def scrape_one(url):
+        async with semaphore:
+            return await firecrawl_scrape(url, query, per_url_budget)
+
+    results = await asyncio.gather(*(scrape_one(url) for url in batch))
+    return firecrawl_function_tool.format_batch_results(results, skipped)
+
+
+# Create FunctionTool instances
+firecrawl_search_tool = FunctionTool(firecrawl_search)
+firecrawl_scrape_tool = FunctionTool(firecrawl_scrape)
+firecrawl_batch_scrape_tool = FunctionTool(firecrawl_batch_scrape)
@@ -0,0 +1,105 @@
+"""
+Persistent content-addressed cache for Firecrawl responses.
+
+Search and scrape responses are stored zlib-compressed in a SQLite file,
+keyed on a SHA-256 of the normalised query/URL and request parameters.
+Entries expire after a TTL, and the least recently used entries are evicted
+once the cache grows past its size limit.
+
+Configuration (environment variables):
+    FIRECRAWL_CACHE_PATH: SQLite file (default: ~/.cache/study_guide_agent/firecrawl.sqlite3)
+    FIRECRAWL_CACHE_TTL: Entry lifetime in seconds (default: 604800, one week)
+    FIRECRAWL_CACHE_MAX_BYTES: Maximum total compressed size (default: 268435456)
+    FIRECRAWL_CACHE_DISABLED: Set to "1" to bypass the cache
+"""
+
+import hashlib
+import json
+import os
+import threading
+from pathlib import Path
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+from ..cache.sqlite_cache import SqliteCache
+
+
+DEFAULT_CACHE_PATH = Path.home() / ".cache" / "study_guide_agent" / "firecrawl.sqlite3"
+DEFAULT_TTL_SECONDS = 7 * 24 * 60 * 60
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+
+def normalize_query(query: str) -> str:
+    """Lower-case a search query and collapse its whitespace"""
+    return " ".join(query.lower().split())
+
+
+def normalize_url(url: str) -> str:
+    """Canonicalise a URL: lower-case scheme/host, sorted query, no fragment"""
+    parts = urlsplit(url.strip())
+    path = parts.path.rstrip("/") or "/"
+    query = urlencode(sorted(parse_qsl(parts.query, keep_blank_values=True)))
+    return urlunsplit((parts.scheme.lower(), parts.netloc.lower(), path, query, ""))
+
+
+def cache_key(operation: str, request: dict) -> str:
+    """Content address of a request: SHA-256 of its canonical JSON form"""
+    canonical = json.dumps({"op": operation, **request}, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+class FirecrawlCache(SqliteCache):
+    """Firecrawl response cache with TTL and size-based LRU eviction"""
+
+    def __init__(self, path=DEFAULT_CACHE_PATH, ttl_seconds=DEFAULT_TTL_SECONDS, max_bytes=DEFAULT_MAX_BYTES):
+        super().__init__(path, ttl_seconds, max_bytes)
+
+    def get_or_fetch(self, operation, request, fetch):
+        """Return the cached response for a request, calling `fetch` on a miss
+
+        Args:
+            operation: Firecrawl operation name, e.g. "search" or "scrape"
+            request: Normalised request fields (query/URL and parameters)
+            fetch: Zero-argument callable performing the real request
+
+        Returns:
+            The cached or freshly fetched response. Empty responses and
+            exceptions from `fetch` are never cached.
+        """
+        key = cache_key(operation, request)
+        value = self.get(key)
+        if value is not None:
+            return value
+
+        value = fetch()
+        if value:
+            self.put(key, value)
+        return value
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_firecrawl_cache():
+    """Return the process-wide FirecrawlCache, or None if disabled
+
+    Created lazily from the FIRECRAWL_CACHE_* environment variables.
+    """
+    global _cache
+    if os.getenv("FIRECRAWL_CACHE_DISABLED") == "1":
+        return None
+    with _cache_lock:
+        if _cache is None:
+            _cache = FirecrawlCache(
+                path=os.getenv("FIRECRAWL_CACHE_PATH", DEFAULT_CACHE_PATH),
+                ttl_seconds=float(os.getenv("FIRECRAWL_CACHE_TTL", DEFAULT_TTL_SECONDS)),
+                max_bytes=int(os.getenv("FIRECRAWL_CACHE_MAX_BYTES", DEFAULT_MAX_BYTES)),
+            )
+    return _cache
+
+
+def set_firecrawl_cache(cache):
+    """Replace the process-wide cache, e.g. with an in-memory one for tests"""
+    global _cache
+    with _cache_lock:
+        _cache = cache
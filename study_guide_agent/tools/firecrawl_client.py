@@ -0,0 +1,130 @@
+"""
+Process-wide pooled Firecrawl client.
+
+The Firecrawl SDK sends every request through a fresh HTTP connection, so each
+tool call pays for TCP/TLS setup again. FirecrawlClient talks to the same REST
+endpoints through one shared requests.Session whose connection pool keeps
+connections (and TLS sessions) alive between calls. A single lazily created
+instance is shared by all tool calls in the process.
+
+Configuration (environment variables):
+    FIRECRAWL_API_KEY: Firecrawl API key (required)
+    FIRECRAWL_API_URL: API base URL (default: https://api.firecrawl.dev)
+    FIRECRAWL_POOL_SIZE: Maximum pooled connections (default: 10)
+    FIRECRAWL_TIMEOUT: Per-request timeout in seconds (default: 60)
+"""
+
+import os
+import threading
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+
+DEFAULT_API_URL = "https://api.firecrawl.dev"
+DEFAULT_POOL_SIZE = 10
+DEFAULT_TIMEOUT = 60.0
+
+
+class _RetryAfterRetry(Retry):
+    """Retry that only repeats a request the server has not processed
+
+    Search and scrape are POSTs and spend credits, so a request is only sent
+    again after a connection error (it never reached the server) or a 429/503
+    that asks the client to come back after Retry-After.
+    """
+
+    RETRY_AFTER_STATUS_CODES = frozenset({429, 503})
+
+
+class FirecrawlClient:
+    """Firecrawl REST client backed by a shared, pooled HTTP session
+
+    Exposes the search/scrape_url subset of FirecrawlApp used by the tools and
+    returns the same response shapes. Safe to use from multiple threads.
+    """
+
+    def __init__(
+        self,
+        api_key,
+        api_url=DEFAULT_API_URL,
+        pool_size=DEFAULT_POOL_SIZE,
+        timeout=DEFAULT_TIMEOUT,
+        max_retries=2,
+    ):
+        self.api_url = api_url.rstrip("/")
+        self.timeout = timeout
+
+        retry = _RetryAfterRetry(
+            total=max_retries,
+            connect=max_retries,
+            read=0,
+            other=0,
+            backoff_factor=0.5,
+            allowed_methods=None,  # POST, but only retried as _RetryAfterRetry allows
+        )
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+        self.session = requests.Session()
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self.session.headers.update({
+            "Authorization": f"Bearer {api_key}",
+            "Content-Type": "application/json",
+        })
+
+    def search(self, query, params=None):
+        """Search the web; returns {"data": [{"title", "url", "markdown"}, ...]}"""
+        return self._post("/v1/search", {"query": query, **(params or {})})
+
+    def scrape_url(self, url, params=None):
+        """Scrape one URL; returns the page data, e.g. {"markdown": ...}"""
+        response = self._post("/v1/scrape", {"url": url, **(params or {})})
+        return response.get("data", response)
+
+    def close(self):
+        """Close every pooled connection"""
+        self.session.close()
+
+    def _post(self, path, payload):
+        response = self.session.post(f"{self.api_url}{path}", json=payload, timeout=self.timeout)
+        response.raise_for_status()
+        return response.json()
+
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_firecrawl_client():
+    """Return the process-wide FirecrawlClient, creating it on first use
+
+    Returns:
+        FirecrawlClient, or None if FIRECRAWL_API_KEY is not set
+    """
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                api_key = os.getenv("FIRECRAWL_API_KEY")
+                if not api_key:
+                    return None
+                _client = FirecrawlClient(
+                    api_key=api_key,
+                    api_url=os.getenv("FIRECRAWL_API_URL", DEFAULT_API_URL),
+                    pool_size=int(os.getenv("FIRECRAWL_POOL_SIZE", DEFAULT_POOL_SIZE)),
+                    timeout=float(os.getenv("FIRECRAWL_TIMEOUT", DEFAULT_TIMEOUT)),
+                )
+    return _client
+
+
+def set_firecrawl_client(client):
+    """Replace the process-wide client, e.g. with a local fake for tests
+
+    The previous client's connections are closed.
+    """
+    global _client
+    with _client_lock:
+        if _client is not None and _client is not client and hasattr(_client, "close"):
+            _client.close()
+        _client = client
@@ -1,54 +1,90 @@
 """
 Firecrawl FunctionTool for deployment compatibility.
 
-This uses the Firecrawl Python SDK directly instead of MCP, which allows
-it to be serialized and deployed to Vertex AI Agent Engine.
+This calls the Firecrawl REST API directly (through the pooled client in
+firecrawl_client.py) instead of MCP, which allows it to be serialized and
+deployed to Vertex AI Agent Engine.
 """
 
 import os
+from concurrent.futures import ThreadPoolExecutor
 from google.adk.tools import FunctionTool
 from typing import Optional
 
+from .firecrawl_cache import get_firecrawl_cache, normalize_query, normalize_url
+from .content_extraction import extract_relevant
+from .firecrawl_client import get_firecrawl_client
 
-def firecrawl_search(query: str, limit: int = 5) -> str:
+
+MAX_BATCH_URLS = 10
+DEFAULT_BATCH_CONCURRENCY = 4
+
+
+def batch_concurrency():
+    """Maximum URLs a batch scrape fetches at once (FIRECRAWL_BATCH_CONCURRENCY)"""
+    return max(1, int(os.getenv("FIRECRAWL_BATCH_CONCURRENCY", DEFAULT_BATCH_CONCURRENCY)))
+
+
+def format_batch_results(results, skipped):
+    """Join per-URL scrape results (or errors) in the order the URLs were given"""
+    formatted = [f"[{idx}] {result}" for idx, result in enumerate(results, 1)]
+    if skipped:
+        formatted.append(
+            f"Skipped {len(skipped)} URL(s) beyond the batch limit of {MAX_BATCH_URLS}: " + ", ".join(skipped)
+        )
+    return "\n\n---\n\n".join(formatted)
+
+
+def _cached(operation, request, fetch):
+    """Serve a Firecrawl call from the persistent cache when enabled"""
+    cache = get_firecrawl_cache()
+    if cache is None:
+        return fetch()
+    return cache.get_or_fetch(operation, request, fetch)
+
+
+def firecrawl_search(query: str, limit: int = 5, token_budget: int = 600) -> str:
     """Search the web using Firecrawl and return relevant content.
 
     Args:
         query: Search query to find relevant educational content
         limit: Maximum number of results to return (default: 5)
+        token_budget: Approximate tokens of content to return across all results (default: 600)
 
     Returns:
         Formatted string with search results including titles, URLs, and content
     """
     try:
-        # Import here to avoid issues if firecrawl-py is not installed
-        from firecrawl import FirecrawlApp
-
-        api_key = os.getenv("FIRECRAWL_API_KEY")
-        if not api_key:
+        client = get_firecrawl_client()
+        if client is None:
             return "Error: FIRECRAWL_API_KEY environment variable not set"
 
-        app = FirecrawlApp(api_key=api_key)
-
         # Perform search with markdown format
-        results = app.search(query, params={
+        params = {
             "limit": limit,
             "scrapeOptions": {"formats": ["markdown"]}
-        })
+        }
+        results = _cached(
+            "search",
+            {"query": normalize_query(query), "params": params},
+            lambda: client.search(query, params=params),
+        )
 
         # Format results
         if not results or "data" not in results:
             return f"No results found for query: {query}"
 
+        items = results.get("data", [])[:limit]
+        per_result_budget = token_budget // max(len(items), 1)
+
         formatted_results = []
-        for idx, item in enumerate(results.get("data", [])[:limit], 1):
+        for idx, item in enumerate(items, 1):
             title = item.get("title", "No title")
             url = item.get("url", "No URL")
             content = item.get("markdown", item.get("content", "No content available"))
 
-            # Truncate content to first 500 characters
-            if len(content) > 500:
-                content = content[:500] + "..."
+            # Keep the passages most relevant to the query within budget
+            content = extract_relevant(content, query, per_result_budget)
 
             formatted_results.append(
                 f"{idx}. {title}\n"
@@ -58,61 +94,96 @@ def firecrawl_search(query: str, limit: int = 5) -> str:
 
         return "\n".join(formatted_results)
 
-    except ImportError:
-        return "Error: firecrawl-py package not installed. Install with: pip install firecrawl-py"
     except Exception as e:
         return f"Error performing search: {str(e)}"
 
 
-def firecrawl_scrape(url: str) -> str:
+def firecrawl_scrape(url: str, query: str = "", token_budget: int = 500) -> str:
     """Scrape content from a specific URL using Firecrawl.
 
     Args:
         url: The URL to scrape content from
+        query: Topic or learning objective to rank the page's passages against (optional)
+        token_budget: Approximate tokens of content to return (default: 500)
 
     Returns:
         Scraped content in markdown format
     """
     try:
-        from firecrawl import FirecrawlApp
-
-        api_key = os.getenv("FIRECRAWL_API_KEY")
-        if not api_key:
+        client = get_firecrawl_client()
+        if client is None:
             return "Error: FIRECRAWL_API_KEY environment variable not set"
 
-        app = FirecrawlApp(api_key=api_key)
-
         # Scrape the URL
-        result = app.scrape_url(url, params={
+        params = {
             "formats": ["markdown"]
-        })
+        }
+        result = _cached(
+            "scrape",
+            {"url": normalize_url(url), "params": params},
+            lambda: client.scrape_url(url, params=params),
+        )
 
         if not result:
             return f"Failed to scrape URL: {url}"
 
         content = result.get("markdown", result.get("content", "No content available"))
 
-        # Truncate if too long
-        if len(content) > 2000:
-            content = content[:2000] + "...\n\n[Content truncated]"
+        # Keep the passages most relevant to the query within budget
+        content = extract_relevant(content, query, token_budget)
 
         return f"Content from {url}:\n\n{content}"
 
-    except ImportError:
-        return "Error: firecrawl-py package not installed. Install with: pip install firecrawl-py"
     except Exception as e:
         return f"Error scraping URL: {str(e)}"
 
 
+def firecrawl_batch_scrape(urls: list[str], query: str = "", token_budget: int = 2000) -> str:
+    """Scrape several URLs concurrently using Firecrawl.
+
+    Args:
+        urls: The URLs to scrape (at most 10 per call)
+        query: Topic or learning objective to rank each page's passages against (optional)
+        token_budget: Approximate tokens of content to return across all URLs (default: 2000)
+
+    Returns:
+        Scraped content for each URL in the order given, separated by "---".
+        A URL that fails gets an error message in its place instead of
+        failing the whole batch.
+    """
+    if not urls:
+        return "Error: no URLs provided"
+
+    batch, skipped = urls[:MAX_BATCH_URLS], urls[MAX_BATCH_URLS:]
+    # firecrawl_scrape reports failures as error strings, so one bad URL
+    # never raises out of the pool
+    per_url_budget = token_budget // len(batch)
+    with ThreadPoolExecutor(max_workers=min(batch_concurrency(), len(batch))) as pool:
+        results = list(pool.map(lambda url: firecrawl_scrape(url, query, per_url_budget), batch))
+    return format_batch_results(results, skipped)
+
+
 # Create FunctionTool instances
 firecrawl_search_tool = FunctionTool(firecrawl_search)
 firecrawl_scrape_tool = FunctionTool(firecrawl_scrape)
+firecrawl_batch_scrape_tool = FunctionTool(firecrawl_batch_scrape)
 
 
-def get_firecrawl_function_tools():
+def get_firecrawl_function_tools(use_async=True):
     """Returns list of Firecrawl FunctionTools for deployment.
 
     These tools work in both local development and production deployment,
     unlike MCP tools which only work locally.
+
+    Args:
+        use_async: Return the async tools from firecrawl_async_tool.py, which
+            don't block the event loop while a request is in flight
     """
-    return [firecrawl_search_tool, firecrawl_scrape_tool]
+    if use_async:
+        from . import firecrawl_async_tool
+        return [
+            firecrawl_async_tool.firecrawl_search_tool,
+            firecrawl_async_tool.firecrawl_scrape_tool,
+            firecrawl_async_tool.firecrawl_batch_scrape_tool,
+        ]
+    return [firecrawl_search_tool, firecrawl_scrape_tool, firecrawl_batch_scrape_tool]
@@ -1,14 +1,46 @@
 import os
+import threading
+
 from google.adk.tools.mcp_tool import McpToolset
 from google.adk.tools.mcp_tool.mcp_session_manager import StdioConnectionParams
 from mcp import StdioServerParameters
 
+from .mcp_pool import DEFAULT_HEALTH_INTERVAL, DEFAULT_POOL_SIZE, McpSessionPool, PooledMcpToolset
+
+
+def firecrawl_server_params():
+    """StdioServerParameters that start the Firecrawl MCP server with npx
+
+    Raises:
+        ValueError: If FIRECRAWL_API_KEY is not set
+    """
+    # Load Firecrawl API key from environment
+    firecrawl_api_key = os.getenv("FIRECRAWL_API_KEY")
 
-def get_firecrawl_toolset():
+    if not firecrawl_api_key:
+        raise ValueError("FIRECRAWL_API_KEY environment variable is required for Firecrawl toolset")
+
+    return StdioServerParameters(
+        command="npx",
+        args=["-y", "firecrawl-mcp"],
+        env={
+            "FIRECRAWL_API_KEY": firecrawl_api_key,
+            "FIRECRAWL_RETRY_MAX_ATTEMPTS": "3",
+            "FIRECRAWL_CREDIT_WARNING_THRESHOLD": "1000"
+        }
+    )
+
+
+def get_firecrawl_toolset(pooled=True):
     """Returns configured Firecrawl MCP toolset for web search and content extraction
 
+    Args:
+        pooled: Share the process-wide pool of long-lived Firecrawl MCP
+            servers (see get_firecrawl_mcp_pool) instead of starting a
+            server for this toolset alone
+
     Returns:
-        McpToolset: Configured Firecrawl MCP tools including:
+        PooledMcpToolset or McpToolset: Configured Firecrawl MCP tools including:
             - firecrawl_search: Web search with content extraction
             - firecrawl_scrape: Extract content from URLs
             - firecrawl_batch_scrape: Process multiple URLs
@@ -18,24 +50,51 @@ def get_firecrawl_toolset():
     Raises:
         ValueError: If FIRECRAWL_API_KEY is not set
     """
-    # Load Firecrawl API key from environment
-    firecrawl_api_key = os.getenv("FIRECRAWL_API_KEY")
-
-    if not firecrawl_api_key:
-        raise ValueError("FIRECRAWL_API_KEY environment variable is required for Firecrawl toolset")
+    if pooled:
+        return PooledMcpToolset(get_firecrawl_mcp_pool())
 
     # Configure Firecrawl MCP toolset
     return McpToolset(
         connection_params=StdioConnectionParams(
-            server_params=StdioServerParameters(
-                command="npx",
-                args=["-y", "firecrawl-mcp"],
-                env={
-                    "FIRECRAWL_API_KEY": firecrawl_api_key,
-                    "FIRECRAWL_RETRY_MAX_ATTEMPTS": "3",
-                    "FIRECRAWL_CREDIT_WARNING_THRESHOLD": "1000"
-                }
-            ),
+            server_params=firecrawl_server_params(),
             timeout=30,
         ),
     )
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_firecrawl_mcp_pool():
+    """Return the process-wide pool of Firecrawl MCP servers
+
+    Created lazily from FIRECRAWL_MCP_POOL_SIZE (default: 2) and
+    FIRECRAWL_MCP_HEALTH_INTERVAL (seconds, default: 30). The servers start
+    on first use, or at process start with warm_up_firecrawl_mcp_pool().
+    A pool started on an event loop that has since closed is replaced.
+
+    Raises:
+        ValueError: If FIRECRAWL_API_KEY is not set
+    """
+    global _pool
+    with _pool_lock:
+        if _pool is None or (_pool.loop is not None and _pool.loop.is_closed()):
+            _pool = McpSessionPool(
+                firecrawl_server_params(),
+                size=int(os.getenv("FIRECRAWL_MCP_POOL_SIZE", DEFAULT_POOL_SIZE)),
+                health_interval=float(os.getenv("FIRECRAWL_MCP_HEALTH_INTERVAL", DEFAULT_HEALTH_INTERVAL)),
+            )
+    return _pool
+
+
+def set_firecrawl_mcp_pool(pool):
+    """Replace the process-wide Firecrawl MCP pool (e.g. with a local stand-in server)"""
+    global _pool
+    with _pool_lock:
+        _pool = pool
+
+
+async def warm_up_firecrawl_mcp_pool():
+    """Start the Firecrawl MCP servers now, so no session pays their cold start"""
+    await get_firecrawl_mcp_pool().start()
@@ -0,0 +1,359 @@
+"""
+Pool of long-lived MCP server sessions shared across agent runs.
+
+Each McpToolset over stdio starts its own server subprocess and pays its
+start-up cost (for `npx -y firecrawl-mcp`, Node start-up and package
+resolution: often several seconds) on the first tool call of every session.
+McpSessionPool keeps `size` servers running for the life of the process
+instead:
+
+- warm-up: start() launches every server and lists its tools up front
+- multiplexing: MCP requests carry ids, so each session serves many
+  concurrent tool calls; calls go to the healthy server with the fewest in
+  flight
+- health checks: every server is pinged every `health_interval` seconds
+- restarts: a server that fails a ping or drops its connection mid-call is
+  restarted, and the call is retried once on another server (a call that
+  merely times out is not, since it may still complete)
+
+The pool is bound to the event loop it was started on. PooledMcpToolset
+exposes the pool's tools to agents like an McpToolset, without owning (or
+closing) the servers.
+
+Usage:
+    pool = McpSessionPool(StdioServerParameters(command="npx", args=["-y", "firecrawl-mcp"]))
+    await pool.start()
+    agent = Agent(..., tools=[PooledMcpToolset(pool)])
+"""
+
+import asyncio
+import sys
+from typing import Optional
+
+import anyio
+from google.adk.tools.base_tool import BaseTool
+from google.adk.tools.base_toolset import BaseToolset
+from google.genai import types
+from mcp import ClientSession, StdioServerParameters
+from mcp.client.stdio import stdio_client
+from mcp.types import CONNECTION_CLOSED
+
+
+DEFAULT_POOL_SIZE = 2
+DEFAULT_HEALTH_INTERVAL = 30.0
+DEFAULT_START_TIMEOUT = 60.0
+DEFAULT_PING_TIMEOUT = 10.0
+
+# Errors meaning the server or its stdio transport is gone, as opposed to
+# errors the server returned for one request (see is_connection_error)
+CONNECTION_ERRORS = (
+    anyio.ClosedResourceError,
+    anyio.BrokenResourceError,
+    anyio.EndOfStream,
+    ConnectionError,
+    EOFError,
+    OSError,
+)
+
+
+def is_connection_error(error):
+    """Whether `error` means the server's connection is gone
+
+    The MCP client reports a closed connection as an MCP error with code
+    CONNECTION_CLOSED rather than as a transport exception. A timeout is
+    not one (although TimeoutError is an OSError): the server may just be
+    slow, and may still complete the call.
+    """
+    if isinstance(error, TimeoutError):
+        return False
+    if isinstance(error, CONNECTION_ERRORS):
+        return True
+    return getattr(getattr(error, "error", None), "code", None) == CONNECTION_CLOSED
+
+
+def _field(model, *names):
+    """Read a field that is camelCase in mcp 1.x and snake_case in 2.x"""
+    for name in names:
+        value = getattr(model, name, None)
+        if value is not None:
+            return value
+    return None
+
+
+class _PooledServer:
+    """One server subprocess and its ClientSession
+
+    The stdio transport and session are entered and exited inside a single
+    long-lived task, as anyio requires.
+    """
+
+    def __init__(self, pool, index):
+        self.pool = pool
+        self.index = index
+        self.session = None
+        self.in_flight = 0
+        self.calls = 0
+        self.restarts = 0
+        self.healthy = False
+        self._task = None
+        self._stop = None
+        self._lock = asyncio.Lock()
+
+    async def start(self):
+        ready = asyncio.get_running_loop().create_future()
+        self._stop = asyncio.Event()
+        self._task = asyncio.create_task(self._serve(ready))
+        try:
+            await asyncio.wait_for(asyncio.shield(ready), self.pool.start_timeout)
+        except BaseException:
+            await self.stop()
+            raise
+        self.healthy = True
+
+    async def _serve(self, ready):
+        try:
+            async with stdio_client(self.pool.server_params, errlog=self.pool.errlog) as (read, write):
+                async with ClientSession(read, write) as session:
+                    await session.initialize()
+                    self.session = session
+                    ready.set_result(None)
+                    await self._stop.wait()
+        except BaseException as e:
+            if not ready.done():
+                ready.set_exception(e if isinstance(e, Exception) else ConnectionError("MCP server stopped"))
+            if not isinstance(e, Exception):
+                raise
+        finally:
+            self.session = None
+            self.healthy = False
+
+    async def stop(self):
+        if self._stop is not None:
+            self._stop.set()
+        if self._task is not None:
+            try:
+                await asyncio.wait_for(asyncio.shield(self._task), DEFAULT_PING_TIMEOUT)
+            except BaseException:
+                self._task.cancel()
+                await asyncio.gather(self._task, return_exceptions=True)
+        self._task = None
+        self.session = None
+        self.healthy = False
+
+    @property
+    def restarting(self):
+        return self._lock.locked()
+
+    async def restart(self, session=None):
+        """Restart the server, unless it was already restarted since `session` failed"""
+        async with self._lock:
+            if session is not None and self.session is not session and self.healthy:
+                return
+            await self.stop()
+            self.restarts += 1
+            await self.start()
+
+    async def ping(self):
+        session = self.session
+        if session is None:
+            return False
+        try:
+            await asyncio.wait_for(session.send_ping(), DEFAULT_PING_TIMEOUT)
+            return True
+        except Exception:
+            return False
+
+
+class McpSessionPool:
+    """Long-lived, health-checked MCP server sessions shared across agent runs
+
+    Args:
+        server_params: StdioServerParameters of the MCP server
+        size: Number of server subprocesses kept running
+        health_interval: Seconds between pings of every server (0 disables)
+        start_timeout: Seconds allowed for a server to start and initialise
+        call_timeout: Seconds allowed for one tool call (None for no limit)
+        errlog: Where the servers' stderr goes
+    """
+
+    def __init__(
+        self,
+        server_params: StdioServerParameters,
+        size=DEFAULT_POOL_SIZE,
+        health_interval=DEFAULT_HEALTH_INTERVAL,
+        start_timeout=DEFAULT_START_TIMEOUT,
+        call_timeout=None,
+        errlog=sys.stderr,
+    ):
+        self.server_params = server_params
+        self.health_interval = health_interval
+        self.start_timeout = start_timeout
+        self.call_timeout = call_timeout
+        self.errlog = errlog
+        self.servers = [_PooledServer(self, i) for i in range(max(1, size))]
+        self.loop = None
+        self._tools = None
+        self._start_lock = None
+        self._health_task = None
+        self._restart_tasks = set()
+
+    @property
+    def started(self):
+        return self.loop is not None
+
+    async def start(self):
+        """Start every server and cache the tool list (idempotent)
+
+        Call at process start to take the servers' cold start off the first
+        tool call.
+        """
+        if self._start_lock is None:
+            self._start_lock = asyncio.Lock()
+        async with self._start_lock:
+            if self.started:
+                return
+            results = await asyncio.gather(*(server.start() for server in self.servers), return_exceptions=True)
+            if all(isinstance(result, BaseException) for result in results):
+                raise results[0]
+            self.loop = asyncio.get_running_loop()
+            if self.health_interval:
+                self._health_task = asyncio.create_task(self._check_health())
+            self._tools = await self._list_tools()
+
+    async def close(self):
+        """Stop the health checks, pending restarts and every server"""
+        if self._health_task is not None:
+            self._health_task.cancel()
+            await asyncio.gather(self._health_task, return_exceptions=True)
+            self._health_task = None
+        # A restart still under way would start a server after the others stop
+        await asyncio.gather(*self._restart_tasks, return_exceptions=True)
+        await asyncio.gather(*(server.stop() for server in self.servers))
+        self.loop = None
+        self._tools = None
+
+    async def list_tools(self):
+        """MCP tool definitions, as listed once at start-up"""
+        await self.start()
+        return self._tools
+
+    async def call_tool(self, name, arguments=None):
+        """Call a tool on the least busy healthy server
+
+        A server whose connection fails during the call is restarted and the
+        call is retried once on another server. A call that exceeds
+        call_timeout raises TimeoutError and is not retried: the tools are
+        not idempotent, and the server may still complete it.
+        """
+        await self.start()
+        tried = set()
+        while True:
+            server = await self._acquire(tried)
+            session = server.session
+            server.in_flight += 1
+            server.calls += 1
+            try:
+                return await asyncio.wait_for(session.call_tool(name, arguments or {}), self.call_timeout)
+            except Exception as e:
+                if not is_connection_error(e):
+                    raise
+                server.healthy = False
+                task = asyncio.create_task(self._restart(server, session))
+                self._restart_tasks.add(task)
+                task.add_done_callback(self._restart_tasks.discard)
+                tried.add(server.index)
+                if len(tried) > 1:
+                    raise
+            finally:
+                server.in_flight -= 1
+
+    def stats(self):
+        """Per-server health, call counts and restarts"""
+        return [
+            {
+                "server": server.index,
+                "healthy": server.healthy,
+                "in_flight": server.in_flight,
+                "calls": server.calls,
+                "restarts": server.restarts,
+            }
+            for server in self.servers
+        ]
+
+    async def _acquire(self, exclude):
+        """The healthy server with the fewest calls in flight
+
+        Servers in `exclude` are only used when no other server is healthy.
+        Waits for a restart when every server is down.
+        """
+        for _ in range(2):
+            healthy = [s for s in self.servers if s.healthy and s.session is not None]
+            preferred = [s for s in healthy if s.index not in exclude] or healthy
+            if preferred:
+                return min(preferred, key=lambda server: (server.in_flight, server.calls))
+            down = next((s for s in self.servers if s.index not in exclude), self.servers[0])
+            await self._restart(down)
+        raise ConnectionError("No healthy MCP server in the pool")
+
+    async def _restart(self, server, session=None):
+        try:
+            await server.restart(session)
+        except Exception:
+            server.healthy = False
+
+    async def _list_tools(self):
+        server = await self._acquire(set())
+        result = await server.session.list_tools()
+        return result.tools
+
+    async def _check_health(self):
+        while True:
+            await asyncio.sleep(self.health_interval)
+            for server in self.servers:
+                if server.restarting:
+                    continue
+                session = server.session
+                if not await server.ping():
+                    await self._restart(server, session)
+
+
+class PooledMcpTool(BaseTool):
+    """One MCP tool whose calls go through an McpSessionPool"""
+
+    def __init__(self, pool, mcp_tool):
+        super().__init__(name=mcp_tool.name, description=mcp_tool.description or "")
+        self.pool = pool
+        self.mcp_tool = mcp_tool
+
+    def _get_declaration(self):
+        return types.FunctionDeclaration(
+            name=self.name,
+            description=self.description,
+            parameters_json_schema=_field(self.mcp_tool, "inputSchema", "input_schema"),
+        )
+
+    async def run_async(self, *, args, tool_context):
+        result = await self.pool.call_tool(self.name, args)
+        return result.model_dump(mode="json", exclude_none=True)
+
+
+class PooledMcpToolset(BaseToolset):
+    """Toolset over an McpSessionPool; the pool outlives the toolset
+
+    Args:
+        pool: Started or unstarted McpSessionPool (started on first use)
+        tool_filter: Tool names (or a ToolPredicate) to expose
+    """
+
+    def __init__(self, pool: McpSessionPool, tool_filter: Optional[list] = None):
+        super().__init__(tool_filter=tool_filter)
+        self.pool = pool
+
+    async def get_tools(self, readonly_context=None):
+        tools = [PooledMcpTool(self.pool, tool) for tool in await self.pool.list_tools()]
+        return [tool for tool in tools if self._is_tool_selected(tool, readonly_context)]
+
+    async def close(self):
+        # The servers are shared with other toolsets; McpSessionPool.close()
+        # stops them
+        pass
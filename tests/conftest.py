@@ -0,0 +1,61 @@
+"""
+Shared fixtures: the offline stub model and fake Firecrawl client from
+py_scripts/benchmark_pipeline.py, and a helper that runs a pipeline once.
+"""
+
+import asyncio
+import sys
+from collections import Counter
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(ROOT / "py_scripts"))
+
+from benchmark_pipeline import FakeFirecrawlClient, StubStudyGuideLlm, make_source  # noqa: E402
+from google.adk.models import LLMRegistry  # noqa: E402
+from google.adk.runners import InMemoryRunner  # noqa: E402
+from google.genai import types  # noqa: E402
+
+from study_guide_agent.tools.firecrawl_client import set_firecrawl_client  # noqa: E402
+
+
+@pytest.fixture
+def stub_llm():
+    """StubStudyGuideLlm registered for every gemini-* model, with fresh counters
+
+    Update stub_llm.settings to shape its answers; they are restored afterwards.
+    """
+    settings = dict(StubStudyGuideLlm.settings)
+    LLMRegistry.register(StubStudyGuideLlm)
+    StubStudyGuideLlm.settings.update(latency=0.0)
+    StubStudyGuideLlm.calls = 0
+    StubStudyGuideLlm.calls_by_model = Counter()
+    set_firecrawl_client(FakeFirecrawlClient(latency=0.0))
+    yield StubStudyGuideLlm
+    StubStudyGuideLlm.settings.clear()
+    StubStudyGuideLlm.settings.update(settings)
+    set_firecrawl_client(None)
+
+
+def _run_pipeline(agent, state=None, words=300):
+    """Run `agent` once on stub source material; returns (final session state, events)"""
+    async def run():
+        runner = InMemoryRunner(agent=agent, app_name="tests")
+        session = await runner.session_service.create_session(app_name="tests", user_id="test", state=state)
+        message = types.Content(role="user", parts=[types.Part(text=make_source(words))])
+        events = [
+            event async for event in runner.run_async(user_id="test", session_id=session.id, new_message=message)
+        ]
+        session = await runner.session_service.get_session(app_name="tests", user_id="test", session_id=session.id)
+        return session.state, events
+
+    return asyncio.run(run())
+
+
+@pytest.fixture
+def run_pipeline(stub_llm):
+    """_run_pipeline against the stub model"""
+    return _run_pipeline
@@ -0,0 +1,88 @@
+import pytest
+
+from study_guide_agent.ingest.chunking import is_long_source, iter_chunks, iter_paragraphs
+from study_guide_agent.tools.content_extraction import CHARS_PER_TOKEN
+
+
+def _paragraphs(count, words=40):
+    return [" ".join(f"p{i}w{j}" for j in range(words)) for i in range(count)]
+
+
+def _words(text):
+    return text.split()
+
+
+def test_iter_paragraphs_skips_blank_blocks():
+    text = "\n\nFirst paragraph\nstill first\n \n\n\t\nSecond\n\n"
+    assert list(iter_paragraphs(text)) == ["First paragraph\nstill first", "Second"]
+    assert list(iter_paragraphs("")) == []
+
+
+def test_short_source_is_one_chunk():
+    text = "\n\n".join(_paragraphs(3))
+    assert list(iter_chunks(text, max_tokens=1000)) == [text]
+    assert list(iter_chunks("", max_tokens=1000)) == []
+
+
+@pytest.mark.parametrize("max_tokens", [100, 250, 1000])
+def test_chunks_are_bounded_and_paragraph_aligned(max_tokens):
+    paragraphs = _paragraphs(50)
+    chunks = list(iter_chunks("\n\n".join(paragraphs), max_tokens=max_tokens, overlap_tokens=0))
+
+    assert len(chunks) > 1
+    assert all(len(chunk) <= max_tokens * CHARS_PER_TOKEN for chunk in chunks)
+    # Without overlap the chunks are the paragraphs, regrouped
+    assert [p for chunk in chunks for p in chunk.split("\n\n")] == paragraphs
+
+
+def test_chunks_overlap_on_word_boundaries():
+    paragraphs = _paragraphs(50)
+    chunks = list(iter_chunks("\n\n".join(paragraphs), max_tokens=250, overlap_tokens=20))
+
+    assert all(len(chunk) <= 250 * CHARS_PER_TOKEN for chunk in chunks)
+    for previous, chunk in zip(chunks, chunks[1:]):
+        tail, rest = chunk.split("\n\n", 1)
+        # The overlap is whole words from the end of the previous chunk
+        assert previous.endswith(tail)
+        assert _words(previous)[-len(_words(tail)):] == _words(tail)
+        assert 0 < len(tail) <= 20 * CHARS_PER_TOKEN
+        assert rest.split("\n\n")[0] in paragraphs
+
+    # Every paragraph appears in order after the overlaps are removed
+    bodies = [chunks[0]] + [chunk.split("\n\n", 1)[1] for chunk in chunks[1:]]
+    assert [p for body in bodies for p in body.split("\n\n")] == paragraphs
+
+
+def test_oversized_paragraph_is_split_at_whitespace():
+    paragraph = _paragraphs(1, words=500)[0]
+    chunks = list(iter_chunks(paragraph, max_tokens=100, overlap_tokens=0))
+
+    assert len(chunks) > 1
+    assert all(len(chunk) <= 100 * CHARS_PER_TOKEN for chunk in chunks)
+    assert [word for chunk in chunks for word in _words(chunk)] == _words(paragraph)
+
+
+def test_pieces_are_consumed_lazily():
+    consumed = []
+
+    def pages():
+        for i, paragraph in enumerate(_paragraphs(20)):
+            consumed.append(i)
+            yield paragraph
+
+    chunks = iter_chunks(pages(), max_tokens=250, overlap_tokens=0)
+    first = next(chunks)
+    assert len(consumed) < 20
+    assert first.split("\n\n") == _paragraphs(20)[:len(first.split("\n\n"))]
+
+
+def test_pages_are_joined_paragraph_by_paragraph():
+    pages = ["Page one ends here.", "Page two\n\nhas two paragraphs."]
+    assert list(iter_chunks(pages, max_tokens=1000)) == [
+        "Page one ends here.\n\nPage two\n\nhas two paragraphs."
+    ]
+
+
+def test_is_long_source():
+    assert not is_long_source("x" * 100 * CHARS_PER_TOKEN, max_tokens=100)
+    assert is_long_source("x" * (100 * CHARS_PER_TOKEN + 1), max_tokens=100)
@@ -0,0 +1,122 @@
+import pytest
+
+from study_guide_agent.tools.content_extraction import (
+    OMISSION_MARKER,
+    bm25_scores,
+    chunk_markdown,
+    estimate_tokens,
+    extract_relevant,
+    link_density,
+    tokenize,
+)
+
+
+NAVIGATION = " | ".join(f"[Page {i}](https://example.com/page-{i})" for i in range(12))
+
+
+def _paragraph(topic, sentences=6):
+    return " ".join(f"Sentence {i} explains how {topic} works in practice." for i in range(sentences))
+
+
+def _page(*topics):
+    return "\n\n".join(f"## {topic.title()}\n\n{_paragraph(topic)}" for topic in topics)
+
+
+def _parts(extract):
+    return extract.split("\n\n")
+
+
+def test_tokenize_drops_stopwords_and_punctuation():
+    assert tokenize("What is the Calvin-cycle, and how does it work?") == ["calvin", "cycle", "does", "work"]
+
+
+def test_bm25_ranks_matching_documents_first():
+    documents = [tokenize(_paragraph(topic)) for topic in ["plate tectonics", "photosynthesis", "the water cycle"]]
+    scores = bm25_scores(documents, tokenize("photosynthesis"))
+
+    assert scores.argmax() == 1
+    assert scores[0] == scores[2] == 0
+
+
+def test_bm25_rewards_rare_terms_over_common_ones():
+    documents = [["light", "light", "reactions"], ["light", "calvin"], ["light", "water"]]
+    scores = bm25_scores(documents, ["light", "calvin"])
+
+    # Every document mentions "light", only one mentions "calvin"
+    assert scores.argmax() == 1
+    assert scores[0] > scores[2]
+
+
+def test_bm25_without_query_or_documents():
+    assert list(bm25_scores([["light"]], [])) == [0]
+    assert len(bm25_scores([], ["light"])) == 0
+
+
+def test_chunks_start_at_headings():
+    chunks = chunk_markdown("Intro\n\n# Light reactions\n\nText\n\n## Calvin cycle\n\nMore text")
+    assert chunks == ["Intro", "# Light reactions\n\nText", "## Calvin cycle\n\nMore text"]
+
+
+def test_chunks_respect_the_target_size():
+    paragraphs = [_paragraph(f"topic {i}", sentences=3) for i in range(10)]
+    chunks = chunk_markdown("\n\n".join(paragraphs), target_chars=400)
+
+    assert "\n\n".join(chunks) == "\n\n".join(paragraphs)
+    assert all(len(chunk) <= 400 or "\n\n" not in chunk for chunk in chunks)
+
+
+def test_link_density():
+    assert link_density(NAVIGATION) > 0.9
+    assert link_density(_paragraph("photosynthesis")) == 0
+    assert link_density("") == 0
+
+
+def test_short_pages_are_returned_whole():
+    page = _page("photosynthesis")
+    assert extract_relevant(page + "\n\n", "anything", token_budget=1000) == page
+    assert extract_relevant(page, "photosynthesis", token_budget=0) == ""
+    assert extract_relevant("", "photosynthesis") == ""
+
+
+def test_relevant_sections_are_kept_in_document_order():
+    page = _page("plate tectonics", "photosynthesis", "volcanoes", "the calvin cycle", "glaciers")
+    extract = extract_relevant(page, "photosynthesis and the calvin cycle", token_budget=200)
+
+    assert _parts(extract) == [
+        OMISSION_MARKER,
+        "## Photosynthesis",
+        _paragraph("photosynthesis"),
+        OMISSION_MARKER,
+        "## The Calvin Cycle",
+        _paragraph("the calvin cycle"),
+        OMISSION_MARKER,
+    ]
+
+
+@pytest.mark.parametrize("token_budget", [100, 200, 400])
+def test_packing_stays_within_the_budget(token_budget):
+    page = _page(*(f"topic {i}" for i in range(20)))
+    extract = extract_relevant(page, "topic 7 topic 12", token_budget=token_budget)
+
+    chunks = [part for part in _parts(extract) if part != OMISSION_MARKER]
+    assert sum(estimate_tokens(chunk) for chunk in chunks) <= token_budget
+    # The budget is filled up to less than one chunk
+    assert token_budget - sum(estimate_tokens(chunk) for chunk in chunks) < estimate_tokens(chunk_markdown(page)[0])
+
+
+def test_boilerplate_is_demoted_without_a_query():
+    page = NAVIGATION + "\n\n" + _page("photosynthesis", "the calvin cycle") + "\n\n" + NAVIGATION
+    extract = extract_relevant(page, token_budget=estimate_tokens(page) // 2)
+
+    assert "example.com" not in extract
+    assert _parts(extract)[:2] == [OMISSION_MARKER, "## Photosynthesis"]
+
+
+def test_oversized_best_chunk_is_truncated():
+    page = _paragraph("photosynthesis", sentences=100) + "\n\n" + _paragraph("glaciers", sentences=100)
+    extract = extract_relevant(page, "photosynthesis", token_budget=50)
+
+    text, marker = _parts(extract)
+    assert marker == OMISSION_MARKER
+    assert text.startswith("Sentence 0 explains how photosynthesis") and text.endswith(" ...")
+    assert estimate_tokens(text) <= 51
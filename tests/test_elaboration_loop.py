@@ -0,0 +1,18 @@
+from study_guide_agent.agents import create_main_study_guide_agent
+from study_guide_agent.agents.sub_agents.section_store import section_indices
+from study_guide_agent.events import section_from_event
+
+
+def test_loop_elaborates_every_objective_beyond_five(stub_llm, run_pipeline):
+    stub_llm.settings.update(objectives=7)
+    agent = create_main_study_guide_agent(
+        parallel_elaboration=False, guide_cache=False, overview_cache=False, model_routing=False
+    )
+
+    state, events = run_pipeline(agent)
+
+    assert section_indices(state) == list(range(7))
+    assert state["objective_index"] == 7
+    elaborated = [s.index for s in map(section_from_event, events) if s and s.stage == "elaborated"]
+    assert elaborated == list(range(7))
+    assert all(f"Objective {i}" in state["final_guide"] for i in range(1, 8))
@@ -0,0 +1,86 @@
+from google.adk.events import Event, EventActions
+
+from study_guide_agent.agents import create_main_study_guide_agent
+from study_guide_agent.events import SECTION_EVENT_KEY, GuideReassembler, SectionFinalized, section_from_event
+
+
+def _section(index, stage="elaborated", total=3, **fields):
+    return SectionFinalized(
+        index=index, total=total, title=f"Section {index + 1}", objective=f"Objective {index + 1}",
+        markdown=f"## Section {index + 1}\n\n{stage.title()} text", stage=stage, **fields,
+    )
+
+
+def _event(section=None, state_delta=None):
+    return Event(
+        author="ParallelElaborationAgent",
+        custom_metadata={SECTION_EVENT_KEY: section.model_dump()} if section else None,
+        actions=EventActions(state_delta=state_delta or {}),
+    )
+
+
+def test_sections_are_ordered_by_index():
+    guide = GuideReassembler()
+    for index in [2, 0, 1]:
+        assert guide.add(_event(_section(index))).index == index
+
+    assert [section.index for section in guide.ordered_sections()] == [0, 1, 2]
+    assert guide.markdown() == "\n\n".join(f"## Section {i}\n\nElaborated text" for i in [1, 2, 3])
+
+
+def test_later_stage_replaces_the_earlier_section():
+    guide = GuideReassembler()
+    guide.add(_event(_section(0)))
+    guide.add(_event(_section(1)))
+    guide.add(_event(_section(0, stage="reviewed", verdict="patched", patch="Reviewed text")))
+
+    sections = guide.ordered_sections()
+    assert [(section.index, section.stage) for section in sections] == [(0, "reviewed"), (1, "elaborated")]
+    assert sections[0].verdict == "patched"
+    assert guide.markdown().startswith("## Section 1\n\nReviewed text")
+
+
+def test_events_without_sections_are_ignored():
+    guide = GuideReassembler()
+    assert guide.add(_event(state_delta={"overview": {"main_topic": "Photosynthesis"}})) is None
+    assert guide.add({"author": "OverviewAgent", "content": {"parts": [{"text": "..."}]}}) is None
+    assert section_from_event(_event()) is None
+    assert guide.sections == {} and guide.markdown() == ""
+
+
+def test_dict_events_are_accepted():
+    guide = GuideReassembler()
+    guide.add(_event(_section(1)).model_dump(mode="json"))
+    guide.add({"custom_metadata": {SECTION_EVENT_KEY: _section(0).model_dump()}})
+
+    assert [section.title for section in guide.ordered_sections()] == ["Section 1", "Section 2"]
+
+
+def test_final_guide_takes_precedence():
+    guide = GuideReassembler()
+    guide.add(_event(_section(0)))
+    guide.add({"actions": {"state_delta": {"final_guide": "# Final guide"}}})
+
+    assert guide.markdown() == "# Final guide"
+    assert len(guide.ordered_sections()) == 1
+
+
+def test_rebuilds_the_guide_from_a_pipeline_stream(stub_llm, run_pipeline):
+    agent = create_main_study_guide_agent(guide_cache=False, overview_cache=False)
+    state, events = run_pipeline(agent)
+
+    guide, partial = GuideReassembler(), GuideReassembler()
+    for event in events:
+        guide.add(event)
+        if "final_guide" not in event.actions.state_delta:
+            partial.add(event)
+
+    sections = guide.ordered_sections()
+    assert [section.index for section in sections] == list(range(len(sections)))
+    assert {section.stage for section in sections} == {"reviewed"}
+    assert all(section.total == len(sections) for section in sections)
+    assert guide.markdown() == state["final_guide"]
+    # Before the judge finishes, the guide is rebuilt from the sections
+    assert partial.markdown() == "\n\n".join(section.markdown for section in sections)
+    for section in sections:
+        assert section.markdown in state["final_guide"]
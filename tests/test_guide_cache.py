@@ -0,0 +1,107 @@
+import os
+import time
+
+import pytest
+
+from study_guide_agent.cache.guide_cache import GuideCache
+
+
+def _material(topic, paragraphs=30):
+    return "\n\n".join(
+        f"Paragraph {i} about {topic}: the {topic} process turns input {i} into output {i * 7} step by step."
+        for i in range(paragraphs)
+    )
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return GuideCache(path=tmp_path / "guides.sqlite3", ttl_seconds=60, max_bytes=1024 * 1024, similarity=0.8)
+
+
+def _index_rows(cache):
+    return (
+        cache._conn.execute("SELECT COUNT(*) FROM guide_signatures").fetchone()[0],
+        cache._conn.execute("SELECT COUNT(DISTINCT key) FROM guide_lsh").fetchone()[0],
+    )
+
+
+def test_exact_hit_ignores_formatting(cache):
+    material = _material("photosynthesis")
+    cache.put(material, "# Photosynthesis guide")
+
+    assert cache.get(material) == ("# Photosynthesis guide", 1.0)
+    assert cache.get("  " + material.replace("\n\n", "\n").upper()) == ("# Photosynthesis guide", 1.0)
+    assert cache.stats()["exact_hits"] == 2
+
+
+def test_near_duplicate_hit(cache):
+    material = _material("photosynthesis")
+    cache.put(material, "# Photosynthesis guide")
+
+    edited = material.replace("Paragraph 29 about photosynthesis", "A rewritten closing paragraph")
+    guide, similarity = cache.get(edited)
+    assert guide == "# Photosynthesis guide"
+    assert 0.8 <= similarity < 1.0
+    assert cache.stats()["near_hits"] == 1
+
+
+def test_unrelated_material_misses(cache):
+    cache.put(_material("photosynthesis"), "# Photosynthesis guide")
+
+    assert cache.get(_material("plate tectonics")) is None
+    assert cache.stats()["misses"] == 1
+
+
+def test_exact_matches_only(tmp_path):
+    cache = GuideCache(path=tmp_path / "guides.sqlite3", similarity=1)
+    material = _material("photosynthesis")
+    cache.put(material, "# Photosynthesis guide")
+
+    assert cache.get(material.replace("Paragraph 29", "Paragraph 99")) is None
+
+
+def test_variants_are_scoped(cache):
+    material = _material("photosynthesis")
+    cache.put(material, "# Parallel guide", variant="parallel_elaboration=True")
+
+    assert cache.get(material, variant="parallel_elaboration=False") is None
+    edited = material.replace("Paragraph 29", "Paragraph 99")
+    assert cache.get(edited, variant="parallel_elaboration=False") is None
+    assert cache.get(material, variant="parallel_elaboration=True") == ("# Parallel guide", 1.0)
+
+
+def test_expired_entries_miss_and_are_removed(cache, monkeypatch):
+    material = _material("photosynthesis")
+    cache.put(material, "# Photosynthesis guide")
+
+    now = time.time()
+    monkeypatch.setattr(time, "time", lambda: now + 61)
+    assert cache.get(material.replace("Paragraph 29", "Paragraph 99")) is None  # no near hit either
+    assert cache.get(material) is None
+    assert cache.stats()["entries"] == 0
+    assert _index_rows(cache) == (0, 0)
+
+
+def test_eviction_cleans_up_the_near_duplicate_index(tmp_path):
+    cache = GuideCache(path=tmp_path / "guides.sqlite3", max_bytes=300)
+    topics = ["photosynthesis", "plate tectonics", "cell division", "the water cycle"]
+    for topic in topics:
+        cache.put(_material(topic), f"# {topic} guide {os.urandom(60).hex()}")  # Incompressible
+
+    stats = cache.stats()
+    assert stats["evictions"] > 0
+    assert _index_rows(cache) == (stats["entries"], stats["entries"])
+    assert cache.get(_material("photosynthesis")) is None
+    assert cache.get(_material("the water cycle"))[0].startswith("# the water cycle guide")
+
+
+def test_replacing_and_clearing_clean_up_the_index(cache):
+    material = _material("photosynthesis")
+    cache.put(material, "# First guide")
+    cache.put(material, "# Second guide")
+    assert _index_rows(cache) == (1, 1)
+    assert cache.get(material) == ("# Second guide", 1.0)
+
+    cache.clear()
+    assert _index_rows(cache) == (0, 0)
+    assert cache.stats()["entries"] == 0
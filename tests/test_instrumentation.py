@@ -0,0 +1,38 @@
+import asyncio
+
+from google.adk.runners import InMemoryRunner
+from google.genai import types
+
+from benchmark_pipeline import make_source
+from study_guide_agent.agents import create_main_study_guide_agent
+from study_guide_agent.instrumentation import StageInstrumentation
+
+
+def _run_instrumented(agent, instrumentation):
+    async def run():
+        runner = InMemoryRunner(agent=agent, app_name="tests", plugins=[instrumentation])
+        session = await runner.session_service.create_session(app_name="tests", user_id="test")
+        message = types.Content(role="user", parts=[types.Part(text=make_source(300))])
+        async for _ in runner.run_async(user_id="test", session_id=session.id, new_message=message):
+            pass
+
+    asyncio.run(run())
+
+
+def test_every_model_call_is_attributed_to_its_branch(stub_llm):
+    stub_llm.settings.update(objectives=3)
+    instrumentation = StageInstrumentation(pricing={})
+    agent = create_main_study_guide_agent(guide_cache=False, overview_cache=False)
+
+    _run_instrumented(agent, instrumentation)
+
+    summary = instrumentation.last_summary()
+    stages = summary["stages"]
+    assert summary["totals"]["model_calls"] == stub_llm.calls
+    sections = [s for s in stages if s["agent"].startswith("ObjectiveProcessorAgent_")]
+    assert len(sections) == 3
+    # Concurrent sections run on branches of their own, and each is credited
+    # with exactly its own model call
+    assert len({s["branch"] for s in sections}) == 3 and all(s["branch"] for s in sections)
+    assert all(s["model_calls"] == 1 and s["input_tokens"] > 0 for s in sections)
+    assert summary["tools"]["firecrawl_search"]["calls"] >= 1
@@ -0,0 +1,143 @@
+import asyncio
+import subprocess
+import sys
+
+import pytest
+from google.adk.runners import InMemoryRunner
+
+from benchmark_pipeline import make_source
+from study_guide_agent.agents import create_main_study_guide_agent
+from study_guide_agent.jobs import InMemoryJobStore, Job, JobQueue, JobStoreLocked, QueueFull, SqliteJobStore
+from study_guide_agent.jobs.job_queue import DEFAULT_JOB_SECONDS
+
+
+def _job(job_id, status="queued", created_at=1.0, finished_at=None, tenant="default"):
+    return Job(
+        id=job_id, tenant=tenant, user_id=tenant, message="Create a study guide", status=status,
+        created_at=created_at, finished_at=finished_at,
+    )
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def store(request, tmp_path):
+    if request.param == "memory":
+        yield InMemoryJobStore()
+        return
+    store = SqliteJobStore(tmp_path / "jobs.sqlite3")
+    yield store
+    store.close()
+
+
+def test_store_round_trip(store):
+    job = _job("a")
+    job.state = {"model_budget": "economy"}
+    store.save(job)
+    assert store.get("a") == job
+    assert store.get("missing") is None
+
+    job.status = "running"
+    store.save(job)
+    assert store.get("a").status == "running"
+
+
+def test_store_unfinished_and_prune(store):
+    store.save(_job("late", created_at=3.0))
+    store.save(_job("running", status="running", created_at=2.0))
+    store.save(_job("early", created_at=1.0))
+    store.save(_job("old", status="succeeded", finished_at=10.0))
+    store.save(_job("new", status="failed", finished_at=20.0))
+
+    assert [job.id for job in store.unfinished()] == ["early", "running", "late"]
+    assert store.prune(finished_before=15.0) == 1
+    assert store.get("old") is None and store.get("new") is not None
+
+
+def test_sqlite_store_recovers_unfinished_jobs(tmp_path):
+    path = tmp_path / "jobs.sqlite3"
+    store = SqliteJobStore(path)
+    store.save(_job("waiting", created_at=1.0, tenant="a"))
+    store.save(_job("interrupted", status="running", created_at=2.0, tenant="b"))
+    store.save(_job("done", status="succeeded", finished_at=3.0))
+    store.close()
+
+    store = SqliteJobStore(path)
+    queue = JobQueue(runner=None, store=store)
+    assert queue.queued() == 2
+    assert [queue.position("waiting"), queue.position("interrupted")] == [0, 1]
+    assert store.get("interrupted").status == "queued"
+    assert store.get("interrupted").started_at is None
+    store.close()
+
+
+def test_sqlite_store_is_owned_by_one_process(tmp_path):
+    path = tmp_path / "jobs.sqlite3"
+    store = SqliteJobStore(path)
+    store.save(_job("running", status="running"))
+
+    with pytest.raises(JobStoreLocked):
+        SqliteJobStore(path)
+    other_process = subprocess.run(
+        [sys.executable, "-c", f"from study_guide_agent.jobs import SqliteJobStore; SqliteJobStore({str(path)!r})"],
+        capture_output=True, text=True,
+    )
+    assert "JobStoreLocked" in other_process.stderr
+
+    # Readers don't take ownership, and don't requeue anything
+    reader = SqliteJobStore(path, readonly=True)
+    assert reader.get("running").status == "running"
+    reader.close()
+
+    store.close()
+    SqliteJobStore(path).close()
+
+
+def test_tenants_take_turns():
+    queue = JobQueue(runner=None, max_queued=10, max_queued_per_tenant=10)
+    bulk = [queue.submit("guide", tenant="bulk") for _ in range(3)]
+    light = [queue.submit("guide", tenant="a"), queue.submit("guide", tenant="b")]
+
+    assert [queue.position(job_id) for job_id in bulk] == [0, 3, 4]
+    assert [queue.position(job_id) for job_id in light] == [1, 2]
+    order = [queue._next().id for _ in range(5)]
+    assert order == [bulk[0], light[0], light[1], bulk[1], bulk[2]]
+
+
+def test_queue_full_retry_after():
+    queue = JobQueue(runner=None, workers=2, max_queued=5, max_queued_per_tenant=2)
+    queue.submit("guide", tenant="a")
+    queue.submit("guide", tenant="a")
+
+    # Tenant limit: one start per turn of each waiting tenant
+    with pytest.raises(QueueFull) as full:
+        queue.submit("guide", tenant="a")
+    assert full.value.retry_after == DEFAULT_JOB_SECONDS // 2
+
+    queue.submit("guide", tenant="b")
+    queue.submit("guide", tenant="b")
+    with pytest.raises(QueueFull) as full:
+        queue.submit("guide", tenant="a")
+    assert full.value.retry_after == DEFAULT_JOB_SECONDS
+
+    # Queue limit: one more start frees a place
+    queue.submit("guide", tenant="c")
+    with pytest.raises(QueueFull) as full:
+        queue.submit("guide", tenant="d")
+    assert full.value.retry_after == DEFAULT_JOB_SECONDS // 2
+
+
+def test_retry_after_follows_job_durations(stub_llm):
+    agent = create_main_study_guide_agent(guide_cache=False, overview_cache=False)
+
+    async def run():
+        queue = JobQueue(InMemoryRunner(agent=agent, app_name="tests"), workers=1, max_queued=1)
+        job = await queue.wait(queue.submit(make_source(300)))
+        queue.submit(make_source(300))
+        with pytest.raises(QueueFull) as full:
+            queue.submit(make_source(300))
+        await queue.close()
+        return job, queue.stats(), full.value.retry_after
+
+    job, stats, retry_after = asyncio.run(run())
+    assert job.status == "succeeded" and job.result
+    assert stats["avg_duration"] == pytest.approx(job.finished_at - job.started_at)
+    assert retry_after == 1  # The stub's guides take well under a second
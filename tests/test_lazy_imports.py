@@ -0,0 +1,29 @@
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+
+ROOT = Path(__file__).parent.parent
+HEAVY_MODULES = ("google.adk", "opentelemetry")
+
+
+def _heavy_modules_loaded_by(statement):
+    """Which of HEAVY_MODULES a fresh interpreter has loaded after `statement`"""
+    check = f"{statement}; import sys; print(' '.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))"
+    result = subprocess.run([sys.executable, "-c", check], cwd=ROOT, capture_output=True, text=True, check=True)
+    return result.stdout.split()
+
+
+@pytest.mark.parametrize("module", ["study_guide_agent.runner", "study_guide_agent.jobs", "study_guide_agent.cache"])
+def test_import_does_not_load_adk_or_opentelemetry(module):
+    assert _heavy_modules_loaded_by(f"import {module}") == []
+
+
+def test_runner_instrumentation_is_created_on_first_access():
+    from study_guide_agent import runner
+    from study_guide_agent.instrumentation import StageInstrumentation
+
+    assert isinstance(runner.instrumentation, StageInstrumentation)
+    assert runner.instrumentation is runner.instrumentation
@@ -0,0 +1,59 @@
+import asyncio
+import sys
+from pathlib import Path
+
+import pytest
+from mcp import StdioServerParameters
+
+from study_guide_agent.tools.mcp_pool import McpSessionPool, is_connection_error
+
+
+FAKE_SERVER = Path(__file__).parent.parent / "py_scripts" / "fake_mcp_server.py"
+
+
+def _pool(latency, call_timeout):
+    params = StdioServerParameters(
+        command=sys.executable,
+        args=[str(FAKE_SERVER), "--startup-delay", "0", "--latency", str(latency)],
+    )
+    return McpSessionPool(params, size=2, health_interval=0, call_timeout=call_timeout)
+
+
+def test_slow_call_is_not_retried_on_another_server():
+    async def run():
+        pool = _pool(latency=2.0, call_timeout=0.5)
+        try:
+            await pool.start()
+            with pytest.raises(TimeoutError):
+                await pool.call_tool("firecrawl_search", {"query": "photosynthesis"})
+            await asyncio.sleep(0.1)  # Let a wrongly scheduled restart start
+            return pool.stats()
+        finally:
+            await pool.close()
+
+    stats = asyncio.run(run())
+    assert sum(server["calls"] for server in stats) == 1
+    assert all(server["healthy"] and server["restarts"] == 0 for server in stats)
+
+
+def test_lost_connection_is_retried_on_another_server():
+    async def run():
+        pool = _pool(latency=0.0, call_timeout=5)
+        try:
+            await pool.start()
+            # crash exits whichever server runs it, so the retry fails too
+            with pytest.raises(Exception) as error:
+                await pool.call_tool("crash")
+            assert is_connection_error(error.value)
+            return pool.stats()
+        finally:
+            await pool.close()
+
+    stats = asyncio.run(run())
+    assert [server["calls"] for server in stats] == [1, 1]
+
+
+def test_timeouts_are_not_connection_errors():
+    assert not is_connection_error(TimeoutError())
+    assert is_connection_error(ConnectionResetError())
+    assert is_connection_error(EOFError())
@@ -0,0 +1,27 @@
+from study_guide_agent.agents import create_main_study_guide_agent
+from study_guide_agent.agents.sub_agents.model_router import section_is_valid
+from study_guide_agent.agents.sub_agents.objective_processor_agent import section_state_key
+from study_guide_agent.events import section_from_event
+
+
+def test_escalated_sections_are_announced_once(stub_llm, run_pipeline):
+    # Beginner sections start on flash, whose sections are too short to keep
+    stub_llm.settings.update(objectives=3, difficulty="beginner", weak_models=("gemini-2.5-flash",))
+    agent = create_main_study_guide_agent(guide_cache=False, overview_cache=False)
+
+    state, events = run_pipeline(agent)
+
+    assert stub_llm.calls_by_model["gemini-2.5-flash"] >= 3
+    elaborated = [s for s in map(section_from_event, events) if s and s.stage == "elaborated"]
+    assert sorted(s.index for s in elaborated) == [0, 1, 2]
+    assert all(section_is_valid(s.markdown) for s in elaborated)
+
+    # The rejected attempts never reached the session, so no retry saw them
+    written = [
+        event.actions.state_delta[section_state_key(i)]
+        for event in events for i in range(3)
+        if section_state_key(i) in event.actions.state_delta
+    ]
+    assert len(written) == 3 and all(section_is_valid(markdown) for markdown in written)
+    assert not [e for e in events if e.author.startswith("ObjectiveProcessorAgent") and e.content
+                and "## Stub Section" == (e.content.parts[0].text or "").strip()]
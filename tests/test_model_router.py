@@ -0,0 +1,142 @@
+import asyncio
+
+import pytest
+from google.adk.events import Event, EventActions
+from google.adk.sessions import Session
+from google.genai import types
+from pydantic import BaseModel, ValidationError
+
+from study_guide_agent.agents.sub_agents.model_router import ModelRouter, request_budget, run_with_escalation
+
+
+LITE, FLASH, PRO = "gemini-2.5-flash-lite", "gemini-2.5-flash", "gemini-2.5-pro"
+
+
+@pytest.mark.parametrize(
+    "stage, difficulty, input_tokens, budget, expected",
+    [
+        # Stage baselines
+        ("section", None, 0, None, PRO),
+        ("review", None, 0, None, LITE),
+        ("chunk_outline", None, 0, None, FLASH),
+        ("unknown stage", None, 0, None, PRO),
+        # Difficulty offsets, clamped to the tiers
+        ("section", "beginner", 0, None, FLASH),
+        ("section", "Advanced", 0, None, PRO),
+        ("review", "beginner", 0, None, LITE),
+        ("review", "advanced", 0, None, FLASH),
+        ("review", "unknown", 0, None, LITE),
+        # Budget offsets
+        ("section", None, 0, "economy", FLASH),
+        ("framing", None, 0, "quality", FLASH),
+        ("section", "beginner", 0, "quality", PRO),
+        ("section", None, 0, "unknown", PRO),
+        # Small input only lowers the stages that read the source
+        ("overview", None, 1000, None, FLASH),
+        ("section", None, 1000, None, PRO),
+        ("overview", None, 5000, None, PRO),
+        ("overview", "beginner", 1000, "economy", LITE),
+        # Large input never goes to the lowest tier
+        ("review", None, 50000, None, FLASH),
+        ("review", "beginner", 50000, "economy", FLASH),
+        ("section", None, 50000, None, PRO),
+        ("review", None, 32000, None, LITE),
+    ],
+)
+def test_route(stage, difficulty, input_tokens, budget, expected):
+    router = ModelRouter()
+    assert router.route(stage, difficulty=difficulty, input_tokens=input_tokens, budget=budget) == expected
+
+
+def test_route_uses_the_default_budget():
+    assert ModelRouter(default_budget="economy").route("section") == FLASH
+    assert ModelRouter(default_budget="economy").route("section", budget="balanced") == PRO
+
+
+def test_route_clamps_to_fewer_tiers():
+    router = ModelRouter(tiers=("small", "large"))
+    assert router.route("section", difficulty="advanced") == "large"
+    assert router.route("review", difficulty="beginner") == "small"
+    assert router.route("review", input_tokens=50000) == "large"
+
+
+def test_escalate():
+    router = ModelRouter()
+    assert router.escalate(LITE) == FLASH
+    assert router.escalate(FLASH) == PRO
+    assert router.escalate(PRO) is None
+    assert router.escalate("custom-model") is None
+
+
+def test_request_budget():
+    assert request_budget({"model_budget": "quality"}) == "quality"
+    assert request_budget({"model_budget": "lavish"}) is None
+    assert request_budget({}) is None
+
+
+class _Context:
+    """The parts of an InvocationContext run_with_escalation uses"""
+
+    def __init__(self, session):
+        self.session = session
+
+    def model_copy(self, update):
+        return _Context(update["session"])
+
+
+class _Answer(BaseModel):
+    text: str
+
+
+class _Agent:
+    """Streams two partial chunks and a final answer, waiting on `gate` in between"""
+
+    def __init__(self, model, answers, gate=None):
+        self.model, self.answers, self.gate = model, answers, gate
+
+    async def run_async(self, ctx):
+        for chunk in ("Part", "ial"):
+            yield Event(author=self.model, partial=True, content=types.Content(parts=[types.Part(text=chunk)]))
+            if self.gate:
+                await self.gate.wait()
+        answer = self.answers[self.model]
+        if answer is None:
+            _Answer.model_validate({})  # Raises ValidationError, like a rejected output_schema
+        yield Event(author=self.model, actions=EventActions(state_delta={"out": answer}))
+
+
+async def _collect(model, answers, gate=None, is_valid=None):
+    ctx = _Context(Session(id="s", app_name="tests", user_id="u"))
+    events = []
+    async for event in run_with_escalation(
+        ctx, lambda m: _Agent(m, answers, gate), model, "out", is_valid=is_valid, router=ModelRouter()
+    ):
+        events.append(event)
+        if gate and event.partial:
+            gate.set()
+    return events
+
+
+def _run(model, answers, is_valid=None):
+    return asyncio.run(_collect(model, answers, is_valid=is_valid))
+
+
+def test_escalation_keeps_only_the_accepted_answer():
+    events = _run(LITE, {LITE: None, FLASH: "short", PRO: "long enough"}, is_valid=lambda out: len(out) > 5)
+
+    complete = [e for e in events if not e.partial]
+    assert [(e.author, e.actions.state_delta["out"]) for e in complete] == [(PRO, "long enough")]
+    # Partial chunks of every attempt were streamed as they arrived
+    assert [e.author for e in events if e.partial] == [LITE, LITE, FLASH, FLASH, PRO, PRO]
+
+
+def test_partial_events_are_forwarded_before_the_attempt_finishes():
+    # The agent only finishes once the caller has seen its first chunk, so
+    # buffering the attempt would never return
+    events = asyncio.run(asyncio.wait_for(_collect(LITE, {LITE: "answer"}, asyncio.Event()), timeout=5))
+    assert [e.partial for e in events] == [True, True, None]
+
+
+def test_top_tier_schema_error_is_raised():
+    with pytest.raises(ValidationError):
+        _run(PRO, {PRO: None})
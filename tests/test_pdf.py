@@ -0,0 +1,98 @@
+import pytest
+
+pytest.importorskip("PyPDF2")
+
+from study_guide_agent.ingest import pdf  # noqa: E402
+from study_guide_agent.ingest.pdf import iter_pdf_pages, read_pdf_text  # noqa: E402
+
+
+def _make_pdf(path, pages):
+    """Write a minimal PDF whose page i reads "Page i line j ..." """
+    objects = ["<< /Type /Catalog /Pages 2 0 R >>", None, "<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"]
+    kids = []
+    for i in range(pages):
+        lines = "".join(f"(Page {i} line {j} about photosynthesis) Tj T* " for j in range(5))
+        stream = f"BT /F1 10 Tf 12 TL 40 780 Td {lines}ET"
+        objects.append(f"<< /Length {len(stream)} >>\nstream\n{stream}\nendstream")
+        objects.append(
+            "<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+            f"/Resources << /Font << /F1 3 0 R >> >> /Contents {len(objects)} 0 R >>"
+        )
+        kids.append(f"{len(objects)} 0 R")
+    objects[1] = f"<< /Type /Pages /Kids [{' '.join(kids)}] /Count {pages} >>"
+
+    out, offsets = "%PDF-1.4\n", []
+    for number, body in enumerate(objects, 1):
+        offsets.append(len(out))
+        out += f"{number} 0 obj\n{body}\nendobj\n"
+    xref = len(out)
+    out += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n" + "".join(f"{o:010d} 00000 n \n" for o in offsets)
+    out += f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n"
+    path.write_text(out)
+    return path
+
+
+@pytest.fixture
+def document(tmp_path):
+    return _make_pdf(tmp_path / "notes.pdf", pages=7)
+
+
+@pytest.fixture
+def cache_dir(tmp_path, monkeypatch):
+    monkeypatch.delenv("PDF_TEXT_CACHE_DISABLED", raising=False)
+    return tmp_path / "cache"
+
+
+def _page_numbers(pages):
+    return [int(page.split()[1]) for page in pages]
+
+
+@pytest.mark.parametrize("max_workers", [1, 2])
+def test_pages_come_in_order(document, cache_dir, max_workers):
+    pages = list(iter_pdf_pages(document, max_workers=max_workers, batch_pages=2, cache_dir=cache_dir))
+
+    assert _page_numbers(pages) == list(range(7))
+    assert "Page 3 line 4 about photosynthesis" in pages[3]
+
+
+def test_cache_hit_skips_extraction(document, cache_dir, monkeypatch):
+    pages = list(iter_pdf_pages(document, max_workers=1, cache_dir=cache_dir))
+    assert [path.name for path in cache_dir.iterdir()] == [f"{pdf.file_sha256(document)}.jsonl.gz"]
+
+    def fail(*args):
+        raise AssertionError("extracted again")
+
+    monkeypatch.setattr(pdf, "_iter_extracted", fail)
+    assert list(iter_pdf_pages(document, cache_dir=cache_dir)) == pages
+
+    # The cache is keyed by content, not by path
+    copy = document.with_name("copy.pdf")
+    copy.write_bytes(document.read_bytes())
+    assert read_pdf_text(copy, cache_dir=cache_dir) == "\n".join(pages)
+
+
+def test_abandoned_extraction_leaves_no_cache_entry(document, cache_dir):
+    pages = iter_pdf_pages(document, max_workers=2, batch_pages=2, cache_dir=cache_dir)
+    assert _page_numbers([next(pages), next(pages)]) == [0, 1]
+    assert any(path.suffix == ".tmp" for path in cache_dir.iterdir())
+
+    pages.close()
+    assert list(cache_dir.iterdir()) == []
+
+
+def test_failed_extraction_leaves_no_cache_entry(document, cache_dir, monkeypatch):
+    def extract(*args):
+        yield "Page 0"
+        raise RuntimeError("corrupt page")
+
+    monkeypatch.setattr(pdf, "_iter_extracted", extract)
+    with pytest.raises(RuntimeError, match="corrupt page"):
+        list(iter_pdf_pages(document, cache_dir=cache_dir))
+    assert list(cache_dir.iterdir()) == []
+
+
+def test_disabled_cache_is_not_written(document, cache_dir, monkeypatch):
+    monkeypatch.setenv("PDF_TEXT_CACHE_DISABLED", "1")
+
+    assert _page_numbers(iter_pdf_pages(document, max_workers=1, cache_dir=cache_dir)) == list(range(7))
+    assert not cache_dir.exists()
@@ -0,0 +1,92 @@
+import asyncio
+from types import SimpleNamespace
+from typing import ClassVar
+
+import pytest
+from google.adk.models.llm_request import LlmRequest
+from google.genai import types
+
+from benchmark_pipeline import StubStudyGuideLlm, make_source
+from study_guide_agent.agents.sub_agents.prompt_prefix import shared_prefix
+from study_guide_agent.cache.prompt_cache import PromptCache, set_prompt_cache
+from study_guide_agent.tools.content_extraction import estimate_tokens
+
+
+OVERVIEW = {
+    "main_topic": "Photosynthesis",
+    "key_sections": ["Light reactions"],
+    "learning_objectives": ["Explain the light reactions"],
+    "difficulty_level": "intermediate",
+}
+SOURCE = make_source(40000)
+
+
+class NoClientLlm(StubStudyGuideLlm):
+    """A model without a genai client, which can't use the explicit cache"""
+    api_client: ClassVar = None
+
+
+@pytest.fixture
+def prompt_cache():
+    cache = PromptCache(min_tokens=0)
+    set_prompt_cache(cache)
+    yield cache
+    set_prompt_cache(None)
+
+
+def _request(callback, source=SOURCE):
+    context = SimpleNamespace(
+        state={"overview": OVERVIEW},
+        user_content=types.Content(role="user", parts=[types.Part(text=source)]),
+    )
+    request = LlmRequest(
+        contents=[types.Content(role="user", parts=[types.Part(text="history")])],
+        config=types.GenerateContentConfig(system_instruction="Write the section on the light reactions"),
+    )
+    asyncio.run(callback(context, request))
+    return request
+
+
+def _text(request):
+    return "".join(part.text or "" for content in request.contents for part in content.parts)
+
+
+def test_cached_prefix_carries_the_whole_source(prompt_cache):
+    request = _request(shared_prefix(StubStudyGuideLlm(model="gemini-2.5-pro")))
+
+    assert request.config.cached_content
+    assert _text(request) == "Write the section on the light reactions"
+    assert StubStudyGuideLlm.caches.tokens[request.config.cached_content] >= estimate_tokens(SOURCE)
+
+
+def test_uncached_prefix_sends_a_bounded_excerpt(monkeypatch):
+    monkeypatch.setenv("PROMPT_CACHE_DISABLED", "1")
+    request = _request(shared_prefix(StubStudyGuideLlm(model="gemini-2.5-pro")))
+
+    assert request.config.cached_content is None
+    excerpt, task = (content.parts[0].text for content in request.contents)
+    assert task == "Write the section on the light reactions"
+    assert "photosynthesis" in excerpt
+    assert estimate_tokens(excerpt) <= 8000 < estimate_tokens(SOURCE)
+
+
+def test_prefix_without_cache_client_sends_a_bounded_excerpt(prompt_cache):
+    request = _request(shared_prefix(NoClientLlm(model="gemini-2.5-pro")))
+
+    assert request.config.cached_content is None
+    assert estimate_tokens(_text(request)) <= 8100
+
+
+def test_short_source_is_sent_whole_when_uncached(monkeypatch):
+    monkeypatch.setenv("PROMPT_CACHE_DISABLED", "1")
+    source = make_source(300)
+    request = _request(shared_prefix(StubStudyGuideLlm(model="gemini-2.5-pro")), source)
+
+    assert request.contents[0].parts[0].text == source.strip()
+
+
+def test_stages_without_source_get_only_their_task(prompt_cache):
+    request = _request(shared_prefix(StubStudyGuideLlm(model="gemini-2.5-flash-lite"), include_source=False))
+
+    assert "photosynthesis" not in _text(request).lower()
+    assert _text(request) == "Write the section on the light reactions"
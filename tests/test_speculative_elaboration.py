@@ -0,0 +1,154 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from study_guide_agent.agents.sub_agents.schemas import StudyGuideOverview
+from study_guide_agent.agents.sub_agents.speculative_elaboration_agent import (
+    _Speculation,
+    match_objectives,
+    objective_similarity,
+)
+
+
+SECTION = "## Section\n\n" + "Explained step by step with a worked example. " * 10
+
+
+def _overview(objectives):
+    return StudyGuideOverview(
+        main_topic="Photosynthesis", key_sections=[], learning_objectives=objectives, difficulty_level="intermediate"
+    )
+
+
+@pytest.mark.parametrize(
+    "a, b, expected",
+    [
+        ("Explain the light reactions", "explain the Light reactions.", 1.0),
+        ("Explain the light reactions", "Explain the Calvin cycle", 2 / 6),
+        ("Explain the light reactions", "Describe plate tectonics", 0.0),
+        ("", "Explain the light reactions", 0.0),
+        ("!!", "??", 0.0),
+    ],
+)
+def test_objective_similarity(a, b, expected):
+    assert objective_similarity(a, b) == pytest.approx(expected)
+    assert objective_similarity(b, a) == pytest.approx(expected)
+
+
+def test_match_objectives_threshold():
+    drafted = ["Explain the light reactions", "Describe the Calvin cycle"]
+    final = ["Explain the light reactions in plants", "Describe the Calvin cycle and its enzymes"]
+
+    # 4/6 and 4/7 similar
+    assert match_objectives(drafted, final, threshold=0.6) == {0: 0}
+    assert match_objectives(drafted, final, threshold=4 / 7) == {0: 0, 1: 1}
+    assert match_objectives(drafted, final, threshold=0.7) == {}
+    assert match_objectives([], final) == {} and match_objectives(drafted, []) == {}
+
+
+def test_match_objectives_uses_each_draft_once():
+    drafted = ["Explain the light reactions"]
+    final = ["Explain the light reactions", "Explain the light reactions of plants"]
+
+    assert match_objectives(drafted, final, threshold=0.5) == {0: 0}
+
+
+def test_match_objectives_prefers_the_closest_pair():
+    drafted = ["Explain the light reactions of plants", "Explain the light reactions"]
+    final = ["Explain the light reactions"]
+
+    assert match_objectives(drafted, final, threshold=0.5) == {0: 1}
+
+
+def test_match_objectives_ties():
+    # Equally similar pairs go to the earlier final, then drafted, objective
+    drafted = ["Explain the light reactions", "Explain the light reactions"]
+    final = ["Explain the light reactions", "Explain the light reactions"]
+
+    assert match_objectives(drafted, final) == {0: 0, 1: 1}
+    assert match_objectives(drafted[:1], final) == {0: 0}
+    assert match_objectives(drafted, final[:1]) == {0: 0}
+
+
+def _speculation(draft, written=None, writing=None):
+    """A _Speculation in the given state that makes no model calls
+
+    `written` maps drafted index -> section markdown already written;
+    `writing` maps drafted index -> seconds until its section is written.
+    """
+    written, writing = written or {}, writing or {}
+    speculation = _Speculation.__new__(_Speculation)
+    speculation.agent = SimpleNamespace(match_threshold=0.6)
+    speculation.draft = draft
+    speculation.draft_tokens = (100, 10) if draft else (0, 0)
+    speculation.sections = {index: (markdown, None, (50, 5), "gemini-2.5-pro") for index, markdown in written.items()}
+    speculation.started = set(written) | set(writing)
+
+    async def write(index, delay):
+        await asyncio.sleep(delay)
+        speculation.sections[index] = (SECTION, None, (50, 5), "gemini-2.5-pro")
+
+    speculation.tasks = {index: asyncio.create_task(write(index, delay)) for index, delay in writing.items()}
+    for index in written:
+        speculation.tasks[index] = asyncio.get_running_loop().create_future()
+        speculation.tasks[index].set_result(None)
+
+    async def run():
+        if draft is None:
+            await asyncio.sleep(3600)
+        await asyncio.gather(*speculation.tasks.values(), return_exceptions=True)
+
+    speculation.task = asyncio.create_task(run())
+    return speculation
+
+
+def test_settle_keeps_sections_when_the_draft_wins():
+    draft = _overview(["Explain the light reactions", "Describe the Calvin cycle", "Compare C3 and C4 plants"])
+    final = _overview(["Describe the Calvin cycle", "Explain the light reactions", "Name the pigments"])
+
+    async def run():
+        # Section 1 is matched and still being written, so it is awaited;
+        # section 2 has no final objective and is cancelled
+        speculation = _speculation(draft, written={0: SECTION}, writing={1: 0.01, 2: 3600})
+        kept, metrics = await speculation.settle(final)
+        return speculation, kept, metrics
+
+    speculation, kept, metrics = asyncio.run(run())
+    assert sorted(kept) == ["0", "1"]
+    assert kept["0"]["objective"] == "Describe the Calvin cycle"
+    assert kept["1"]["objective"] == "Explain the light reactions"
+    assert kept["1"]["markdown"] == SECTION.strip()
+    assert speculation.tasks[2].cancelled() and speculation.task.done()
+    assert metrics["kept"] == 2 and metrics["cancelled"] == 1
+    assert metrics["hit_rate"] == round(2 / 3, 4)
+    assert metrics["draft_input_tokens"] == 100
+    assert metrics["wasted_input_tokens"] == 0
+
+
+def test_settle_discards_short_and_unmatched_sections():
+    draft = _overview(["Explain the light reactions", "Describe plate tectonics"])
+    final = _overview(["Explain the light reactions"])
+
+    async def run():
+        speculation = _speculation(draft, written={0: "Too short", 1: SECTION})
+        return await speculation.settle(final)
+
+    kept, metrics = asyncio.run(run())
+    assert kept == {}
+    assert metrics["kept"] == 0 and metrics["discarded"] == 2 and metrics["cancelled"] == 0
+    assert metrics["wasted_input_tokens"] == 100 and metrics["wasted_output_tokens"] == 10
+
+
+def test_settle_cancels_everything_when_the_final_overview_wins():
+    final = _overview(["Explain the light reactions"])
+
+    async def run():
+        speculation = _speculation(None)
+        kept, metrics = await speculation.settle(final)
+        return speculation, kept, metrics
+
+    speculation, kept, metrics = asyncio.run(run())
+    assert kept == {}
+    assert speculation.task.cancelled()
+    assert metrics["draft_objectives"] == 0 and metrics["final_objectives"] == 1
+    assert metrics["hit_rate"] == 0.0 and metrics["draft_input_tokens"] == 0
@@ -0,0 +1,29 @@
+from study_guide_agent.agents import create_main_study_guide_agent
+
+
+def _guides_streamed(events):
+    """Events whose content is a whole assembled guide"""
+    return [
+        event for event in events
+        if event.content and event.content.parts and "## Table of Contents" in (event.content.parts[0].text or "")
+    ]
+
+
+def test_default_pipeline_streams_the_final_guide_once(stub_llm, run_pipeline):
+    agent = create_main_study_guide_agent(guide_cache=False, overview_cache=False)
+
+    state, events = run_pipeline(agent)
+
+    streamed = _guides_streamed(events)
+    assert len(streamed) == 1
+    assert streamed[0].content.parts[0].text == state["final_guide"]
+    assert "elaborated_guide" not in state
+
+
+def test_full_guide_judge_still_gets_the_assembled_draft(stub_llm, run_pipeline):
+    agent = create_main_study_guide_agent(guide_cache=False, overview_cache=False, streaming_judge=False)
+
+    state, events = run_pipeline(agent)
+
+    assert "## Table of Contents" in state["elaborated_guide"]
+    assert "final_guide" in state